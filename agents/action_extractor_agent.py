@@ -1,9 +1,12 @@
 from crewai import Agent
-from langchain_ollama import ChatOllama
+from core import registry
 
 class ActionExtractorAgent:
     def __init__(self):
-        self.agent = Agent(
+        self.agent = registry.get_agent("ActionExtractorAgent", self._build)
+
+    def _build(self):
+        return Agent(
             role="Customer Support Action Item Extractor",
             goal=(
                 """Identify all actionable items (e.g., tasks, escalations, follow-ups, or clarifications) from a summary which you will mostly recieve from summarizer agent. 
@@ -18,7 +21,7 @@ class ActionExtractorAgent:
             allow_delegation=False,
             output_json=True,
             tools=[],
-            llm=ChatOllama(model="ollama/mistral", temperature=0.3)
+            llm=registry.get_llm("ollama/mistral", 0.3)
         )
 
     def get(self):
@@ -1,9 +1,12 @@
 from crewai import Agent
-from langchain_ollama import ChatOllama
+from core import registry
 
 class DispatcherAgent:
     def __init__(self):
-        self.agent = Agent(
+        self.agent = registry.get_agent("DispatcherAgent", self._build)
+
+    def _build(self):
+        return Agent(
             role="Final Output Dispatcher",
             goal=(
                 """Take in all the processed inputs (summary, actions, resolution, eta) and craft a response.
@@ -25,7 +28,7 @@ class DispatcherAgent:
             allow_delegation=False,
             output_json=True,
             tools=[],
-            llm=ChatOllama(model="ollama/mistral", temperature=0.2)
+            llm=registry.get_llm("ollama/mistral", 0.2)
         )
 
     def get(self):
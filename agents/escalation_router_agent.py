@@ -1,12 +1,13 @@
 from crewai import Agent
-from langchain_ollama import ChatOllama
-from tools.team_routing_map import TeamRoutingMap
-
-routing_map = TeamRoutingMap()
+from core import registry
 
 class EscalationRouterAgent:
     def __init__(self):
-        self.agent = Agent(
+        self.agent = registry.get_agent("EscalationRouterAgent", self._build)
+
+    def _build(self):
+        routing_map = registry.get_routing_map()
+        return Agent(
             role="Escalation Routing Specialist",
             goal=(
                 """Examine the nature of action items or unresolved complexities in a customer ticket to determine if escalation is warranted and, if so, identify precisely which internal team or department should own it next. 
@@ -21,7 +22,7 @@ class EscalationRouterAgent:
             allow_delegation=False,
             output_json=True,
             tools=[routing_map.route],  # ✅ Using the method decorated with @tool
-            llm=ChatOllama(model="ollama/mistral", temperature=0.2)
+            llm=registry.get_llm("ollama/mistral", 0.2)
         )
 
     def get(self):
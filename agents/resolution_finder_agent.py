@@ -1,11 +1,21 @@
 from crewai import Agent
-from langchain_ollama import ChatOllama
-from tools.vector_search_tool import VectorSearchTool
+from core import registry
 
 class ResolutionFinderAgent:
-    def __init__(self):
-        self.vector_tool = VectorSearchTool()
-        self.agent = Agent(
+    def __init__(self, use_tools: bool = True):
+        """
+        Args:
+            use_tools: Give the agent VectorSearchTool to call itself. Without it the
+                workflow retrieves the passages and injects them into the task.
+        """
+        self.use_tools = use_tools
+        self.vector_tool = registry.get_vector_tool() if use_tools else None
+        name = "ResolutionFinderAgent" if use_tools else "ResolutionFinderAgent:context"
+        # Rebuilt with the new tool once the knowledge base is rebuilt
+        self.agent = registry.get_agent(name, self._build, version=self.vector_tool)
+
+    def _build(self):
+        return Agent(
             role="Customer Support Resolution Recommender",
             goal=(
                 """Provide targeted resolution recommendations for a customer’s issue by looking at domain-specific knowledge bases, historical tickets, and best practices. 
@@ -22,8 +32,8 @@ class ResolutionFinderAgent:
             verbose=True,
             allow_delegation=False,
             output_json=True,
-            tools=[self.vector_tool.retrieve],
-            llm=ChatOllama(model="ollama/mistral", temperature=0.3)
+            tools=[self.vector_tool.retrieve] if self.use_tools else [],
+            llm=registry.get_llm("ollama/mistral", 0.3)
         )
 
     def get(self):
@@ -1,9 +1,12 @@
 from crewai import Agent
-from langchain_ollama import ChatOllama
+from core import registry
 
 class SummarizerAgent:
     def __init__(self):
-        self.agent = Agent(
+        self.agent = registry.get_agent("SummarizerAgent", self._build)
+
+    def _build(self):
+        return Agent(
             role="Customer Support Conversation Summarizer",
             goal=(
                 """Parse multi-channel customer support interactions (e.g., past ticket data and knowledge base documentation) and produce a succinct narrative that captures the problem, context, user sentiment, and any existing troubleshooting steps. 
@@ -18,7 +21,7 @@ class SummarizerAgent:
             allow_delegation=False,
             output_json=True,
             tools=[],
-            llm=ChatOllama(model="ollama/mistral", temperature=0.3)
+            llm=registry.get_llm("ollama/mistral", 0.3)
         )
 
     def get(self):
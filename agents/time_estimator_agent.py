@@ -1,9 +1,12 @@
 from crewai import Agent
-from langchain_ollama import ChatOllama
+from core import registry
 
 class TimeEstimatorAgent:
     def __init__(self):
-        self.agent = Agent(
+        self.agent = registry.get_agent("TimeEstimatorAgent", self._build)
+
+    def _build(self):
+        return Agent(
             role="Support Ticket Time Estimator",
             goal=(
                 """Combine historical resolution data, complexity analysis, and real-time factors (e.g., queue lengths, team capacity, severity) to predict how long it will take before an issue is fully resolved(ETAs). 
@@ -19,7 +22,7 @@ class TimeEstimatorAgent:
             allow_delegation=False,
             output_json=True,
             tools=[],
-            llm=ChatOllama(model="ollama/mistral", temperature=0.4)
+            llm=registry.get_llm("ollama/mistral", 0.4)
         )
 
     def get(self):
@@ -0,0 +1,261 @@
+# api/conversation_store.py
+
+import asyncio
+import heapq
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+from core.conversation_state import ConversationState
+from workflows.support_workflow import SupportWorkflow
+
+
+class ConversationBackend:
+    """
+    Durable storage for serialized conversation states.
+    Subclass this to plug in a different database.
+    """
+
+    def save(self, conversation_id: str, state: dict, last_activity: float):
+        raise NotImplementedError
+
+    def load(self, conversation_id: str) -> Optional[Tuple[dict, float]]:
+        """Return ``(state, last_activity)`` or None if the conversation is unknown"""
+        raise NotImplementedError
+
+    def delete(self, conversation_id: str) -> bool:
+        raise NotImplementedError
+
+    def delete_expired(self, cutoff: float) -> int:
+        """Delete every conversation last active before ``cutoff``; return how many"""
+        raise NotImplementedError
+
+
+class InMemoryConversationBackend(ConversationBackend):
+    """Non-durable backend, useful for tests and local development"""
+
+    def __init__(self):
+        self._rows: Dict[str, Tuple[dict, float]] = {}
+        self._lock = threading.Lock()
+
+    def save(self, conversation_id, state, last_activity):
+        with self._lock:
+            self._rows[conversation_id] = (state, last_activity)
+
+    def load(self, conversation_id):
+        return self._rows.get(conversation_id)
+
+    def delete(self, conversation_id):
+        with self._lock:
+            return self._rows.pop(conversation_id, None) is not None
+
+    def delete_expired(self, cutoff):
+        with self._lock:
+            expired = [cid for cid, (_, ts) in self._rows.items() if ts < cutoff]
+            for cid in expired:
+                del self._rows[cid]
+        return len(expired)
+
+
+class SQLiteConversationBackend(ConversationBackend):
+    """
+    SQLite backend. Conversations survive restarts; expiry is an indexed range
+    delete on last_activity, so it only touches expired rows.
+    """
+
+    def __init__(self, path: str = "data/conversation_store.db"):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS conversations ("
+                "id TEXT PRIMARY KEY, state TEXT NOT NULL, last_activity REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_conversations_last_activity "
+                "ON conversations (last_activity)"
+            )
+
+    def save(self, conversation_id, state, last_activity):
+        payload = json.dumps(state, default=str, separators=(",", ":"))
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO conversations (id, state, last_activity) VALUES (?, ?, ?)",
+                (conversation_id, payload, last_activity)
+            )
+
+    def load(self, conversation_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state, last_activity FROM conversations WHERE id = ?", (conversation_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def delete(self, conversation_id):
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM conversations WHERE id = ?", (conversation_id,))
+        return cursor.rowcount > 0
+
+    def delete_expired(self, cutoff):
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM conversations WHERE last_activity < ?", (cutoff,))
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ConversationStore:
+    """
+    Bounded LRU of hot SupportWorkflow objects in front of a durable backend.
+
+    Every save writes through to the backend, so evicting a hot entry only
+    drops the in-memory copy; it is rehydrated on the next access. Expiry uses
+    a min-heap of last-activity times for hot entries (stale heap entries are
+    skipped lazily), so a cleanup pass costs O(expired) rather than O(all).
+
+    Conversations with a turn in flight are pinned and never evicted: a
+    reload would create a second workflow for the same conversation, and
+    whichever copy saved last would silently drop the other's turn. Pinned
+    entries may push the store past ``capacity`` until they are released.
+    """
+
+    def __init__(self, backend: Optional[ConversationBackend] = None,
+                 capacity: int = 1024, ttl: float = 3600,
+                 clock: Callable[[], float] = time.time):
+        self.backend = backend or InMemoryConversationBackend()
+        self.capacity = capacity
+        self.ttl = ttl
+        self.clock = clock
+        self._hot: "OrderedDict[str, SupportWorkflow]" = OrderedDict()
+        self._last_activity: Dict[str, float] = {}
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._pins: Counter = Counter()
+        self._lock = threading.RLock()
+
+    def __contains__(self, conversation_id: str) -> bool:
+        return self.get(conversation_id) is not None
+
+    def __len__(self) -> int:
+        """Number of hot (in-memory) conversations"""
+        return len(self._hot)
+
+    def get(self, conversation_id: str) -> Optional[SupportWorkflow]:
+        """Return the workflow for a conversation, loading it from the backend if needed"""
+        now = self.clock()
+        with self._lock:
+            workflow = self._hot.get(conversation_id)
+            if workflow is not None:
+                if self._is_expired(self._last_activity[conversation_id], now):
+                    self.delete(conversation_id)
+                    return None
+                self._hot.move_to_end(conversation_id)
+                return workflow
+
+        row = self.backend.load(conversation_id)
+        if row is None:
+            return None
+        data, last_activity = row
+        if self._is_expired(last_activity, now):
+            self.backend.delete(conversation_id)
+            return None
+
+        workflow = SupportWorkflow(conversation_id=conversation_id)
+        workflow.workflow_manager.state = ConversationState.from_dict(data)
+        with self._lock:
+            # Another request may have loaded it meanwhile; keep the first copy
+            if conversation_id in self._hot:
+                self._hot.move_to_end(conversation_id)
+                return self._hot[conversation_id]
+            self._insert(conversation_id, workflow, last_activity)
+        return workflow
+
+    def save(self, conversation_id: str, workflow: SupportWorkflow):
+        """Persist a workflow's state and mark the conversation as active now"""
+        state = workflow.get_conversation_state()
+        last_activity = max(state.last_activity or 0, self.clock())
+        self.backend.save(conversation_id, state.to_dict(), last_activity)
+        with self._lock:
+            self._insert(conversation_id, workflow, last_activity)
+
+    def delete(self, conversation_id: str) -> bool:
+        """Remove a conversation from memory and the backend"""
+        with self._lock:
+            was_hot = self._hot.pop(conversation_id, None) is not None
+            self._last_activity.pop(conversation_id, None)
+        return self.backend.delete(conversation_id) or was_hot
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Drop conversations idle for longer than the TTL; return how many backend rows were removed"""
+        now = self.clock() if now is None else now
+        cutoff = now - self.ttl
+        with self._lock:
+            while self._expiry_heap and self._expiry_heap[0][0] < cutoff:
+                last_activity, conversation_id = heapq.heappop(self._expiry_heap)
+                if (self._last_activity.get(conversation_id) == last_activity
+                        and conversation_id not in self._pins):
+                    del self._hot[conversation_id]
+                    del self._last_activity[conversation_id]
+        return self.backend.delete_expired(cutoff)
+
+    @contextmanager
+    def pinned(self, conversation_id: str):
+        """Keep a conversation in memory while a turn is running on it"""
+        with self._lock:
+            self._pins[conversation_id] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._pins[conversation_id] -= 1
+                if not self._pins[conversation_id]:
+                    del self._pins[conversation_id]
+
+    # Async variants for request handlers: backend I/O runs in the loop's
+    # default executor instead of blocking the event loop
+
+    async def aget(self, conversation_id: str) -> Optional[SupportWorkflow]:
+        return await asyncio.get_running_loop().run_in_executor(None, self.get, conversation_id)
+
+    async def asave(self, conversation_id: str, workflow: SupportWorkflow):
+        await asyncio.get_running_loop().run_in_executor(None, self.save, conversation_id, workflow)
+
+    async def adelete(self, conversation_id: str) -> bool:
+        return await asyncio.get_running_loop().run_in_executor(None, self.delete, conversation_id)
+
+    def _is_expired(self, last_activity: float, now: float) -> bool:
+        return now - last_activity > self.ttl
+
+    def _insert(self, conversation_id: str, workflow: SupportWorkflow, last_activity: float):
+        self._hot[conversation_id] = workflow
+        self._hot.move_to_end(conversation_id)
+        if self._last_activity.get(conversation_id) != last_activity:
+            self._last_activity[conversation_id] = last_activity
+            heapq.heappush(self._expiry_heap, (last_activity, conversation_id))
+        excess = len(self._hot) - self.capacity
+        if excess > 0:
+            evicted = []
+            for cid in self._hot:
+                if cid not in self._pins:
+                    evicted.append(cid)
+                    if len(evicted) == excess:
+                        break
+            for cid in evicted:
+                del self._hot[cid]
+                del self._last_activity[cid]
+        # Heap entries for evicted or re-touched conversations are skipped
+        # lazily; rebuild once they dominate so memory stays bounded
+        if len(self._expiry_heap) > 2 * self.capacity + 64:
+            self._expiry_heap = [(ts, cid) for cid, ts in self._last_activity.items()]
+            heapq.heapify(self._expiry_heap)
@@ -0,0 +1,27 @@
+# api/dependencies.py
+
+import os
+from typing import AsyncIterator
+
+from fastapi import HTTPException
+
+from api.conversation_store import ConversationStore, SQLiteConversationBackend
+from workflows.support_workflow import SupportWorkflow
+
+# Hot conversations are kept in a bounded LRU in front of a SQLite database,
+# so memory stays flat and conversations survive restarts
+conversation_store = ConversationStore(
+    SQLiteConversationBackend(os.getenv("CONVERSATION_DB", "data/conversation_store.db")),
+    capacity=int(os.getenv("CONVERSATION_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("CONVERSATION_TTL_SECONDS", "3600")),
+)
+
+# Dependency to get a conversation by ID. The conversation stays pinned in
+# memory until the response has been sent, so a turn running on it cannot be
+# lost to an eviction and reload
+async def get_conversation(conversation_id: str) -> AsyncIterator[SupportWorkflow]:
+    with conversation_store.pinned(conversation_id):
+        workflow = await conversation_store.aget(conversation_id)
+        if workflow is None:
+            raise HTTPException(status_code=404, detail=f"Conversation {conversation_id} not found")
+        yield workflow
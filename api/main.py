@@ -1,21 +1,20 @@
 # api/main.py
 
-import os
-import time
+import asyncio
+import json
 import uuid
 from datetime import datetime
-from typing import Dict, List, Optional
 
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 
+from api.dependencies import conversation_store, get_conversation
+from api.routes import predict
+from core import metrics, tracing
 from api.models import CustomerMessage, SupportResponse, ConversationState, HealthCheck
 from workflows.support_workflow import SupportWorkflow
 
-# Store active conversations in memory
-# In a production environment, this would be a database
-active_conversations: Dict[str, SupportWorkflow] = {}
-
 # Create FastAPI app
 app = FastAPI(
     title="Customer Support AI API",
@@ -32,32 +31,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Dependency to get a conversation by ID
-async def get_conversation(conversation_id: str) -> SupportWorkflow:
-    if conversation_id not in active_conversations:
-        raise HTTPException(status_code=404, detail=f"Conversation {conversation_id} not found")
-    return active_conversations[conversation_id]
+app.include_router(predict.router)
 
-# Clean up old conversations periodically (in a background task)
+# Clean up expired conversations (in a background task)
 def cleanup_old_conversations():
-    # In a real implementation, this would be more sophisticated
-    # For now, just keep it simple
-    current_time = time.time()
-    expired_ids = []
-    
-    for conv_id, workflow in active_conversations.items():
-        # If the conversation is older than 1 hour, remove it
-        # This is a simple example - real implementation would be more sophisticated
-        last_message_time = 0
-        if workflow.workflow_manager.state.conversation_history:
-            # This is just a placeholder - in reality we'd store timestamps
-            last_message_time = current_time - 3600  # Assume 1 hour ago
-            
-        if current_time - last_message_time > 3600:  # 1 hour
-            expired_ids.append(conv_id)
-    
-    for conv_id in expired_ids:
-        del active_conversations[conv_id]
+    conversation_store.expire()
 
 @app.get("/", response_model=HealthCheck)
 async def root():
@@ -68,6 +46,11 @@ async def root():
         "models_loaded": True
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Stage, retrieval and cache metrics in Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 @app.post("/conversations", response_model=SupportResponse)
 async def create_conversation(message: CustomerMessage, background_tasks: BackgroundTasks):
     """Create a new conversation and process the first message"""
@@ -75,14 +58,16 @@ async def create_conversation(message: CustomerMessage, background_tasks: Backgr
     conversation_id = message.conversation_id or str(uuid.uuid4())
     
     # Create a new workflow for this conversation
-    workflow = SupportWorkflow()
-    active_conversations[conversation_id] = workflow
-    
-    # Schedule cleanup of old conversations
-    background_tasks.add_task(cleanup_old_conversations)
-    
-    # Process the message
-    result = workflow.process_message(message.message)
+    workflow = SupportWorkflow(conversation_id=conversation_id)
+    with conversation_store.pinned(conversation_id):
+        await conversation_store.asave(conversation_id, workflow)
+        
+        # Schedule cleanup of old conversations
+        background_tasks.add_task(cleanup_old_conversations)
+        
+        # Process the message
+        result = await workflow.aprocess_message(message.message)
+        await conversation_store.asave(conversation_id, workflow)
     
     # Add conversation ID to the response
     result["conversation_id"] = conversation_id
@@ -91,36 +76,104 @@ async def create_conversation(message: CustomerMessage, background_tasks: Backgr
 
 @app.post("/conversations/{conversation_id}/messages", response_model=SupportResponse)
 async def add_message(
+    conversation_id: str,
     message: CustomerMessage,
     conversation: SupportWorkflow = Depends(get_conversation)
 ):
     """Add a message to an existing conversation"""
     # Process the message
-    result = conversation.process_message(message.message)
+    result = await conversation.aprocess_message(message.message)
+    await conversation_store.asave(conversation_id, conversation)
     
     # Add conversation ID to the response
-    result["conversation_id"] = message.conversation_id
+    result["conversation_id"] = conversation_id
     
     return result
 
+def _sse_event(event: str, data) -> str:
+    """Format a single Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@app.post("/conversations/{conversation_id}/messages/stream")
+async def add_message_stream(
+    conversation_id: str,
+    message: CustomerMessage,
+    conversation: SupportWorkflow = Depends(get_conversation)
+):
+    """
+    Add a message to an existing conversation, streaming progress as Server-Sent Events.
+    
+    One event is emitted per stage as it completes (summary, actions,
+    resolution, eta, routing), followed by a final ``reply`` event carrying the
+    full SupportResponse (or an ``error`` event if processing failed).
+    """
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+    
+    def on_stage(stage, value):
+        loop.call_soon_threadsafe(events.put_nowait, (stage, {"stage": stage, "value": value}))
+    
+    async def run_turn():
+        try:
+            result = await conversation.aprocess_message(message.message, on_stage=on_stage)
+            await conversation_store.asave(conversation_id, conversation)
+            result["conversation_id"] = conversation_id
+            event = "error" if result.get("status") == "error" else "reply"
+            events.put_nowait((event, result))
+        except Exception as e:
+            events.put_nowait(("error", {"status": "error", "error": str(e), "conversation_id": conversation_id}))
+        finally:
+            events.put_nowait(None)
+    
+    async def stream():
+        turn = asyncio.create_task(run_turn())
+        while True:
+            item = await events.get()
+            if item is None:
+                break
+            yield _sse_event(*item)
+        await turn
+    
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
 @app.get("/conversations/{conversation_id}", response_model=ConversationState)
-async def get_conversation_state(conversation: SupportWorkflow = Depends(get_conversation)):
+async def get_conversation_state(
+    conversation_id: str,
+    conversation: SupportWorkflow = Depends(get_conversation)
+):
     """Get the current state of a conversation"""
     state = conversation.get_conversation_state()
+    last_update = datetime.fromtimestamp(state.last_activity) if state.last_activity else datetime.now()
     
     return {
-        "conversation_id": conversation.workflow_manager.state.conversation_history[0]["content"] if conversation.workflow_manager.state.conversation_history else "",
+        "conversation_id": conversation_id,
         "status": state.status,
         "message_count": len(state.conversation_history),
-        "last_update": datetime.now().isoformat(),
+        "last_update": last_update.isoformat(),
         "metadata": {}
     }
 
+@app.get("/conversations/{conversation_id}/traces")
+async def get_conversation_traces(
+    conversation_id: str,
+    limit: int = Query(20, ge=1),
+    format: str = Query("json", pattern="^(json|chrome)$"),
+    conversation: SupportWorkflow = Depends(get_conversation)
+):
+    """
+    Recent turn traces of a conversation, newest first, as span trees.
+    ``format=chrome`` returns the Chrome trace event format instead, which
+    chrome://tracing and Perfetto can open.
+    """
+    traces = tracing.recent_traces(conversation_id, limit)
+    if format == "chrome":
+        return {"traceEvents": [event for trace in traces for event in trace.chrome_events()]}
+    return {"conversation_id": conversation_id, "traces": [trace.to_dict() for trace in traces]}
+
 @app.delete("/conversations/{conversation_id}")
 async def delete_conversation(conversation_id: str):
     """Delete a conversation"""
-    if conversation_id in active_conversations:
-        del active_conversations[conversation_id]
+    if await conversation_store.adelete(conversation_id):
         return {"status": "deleted", "conversation_id": conversation_id}
     else:
         raise HTTPException(status_code=404, detail=f"Conversation {conversation_id} not found")
@@ -1,11 +1,17 @@
 # api/routes/predict.py
 
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict, Any
+import asyncio
+import json
+import os
+from typing import Dict, Any, AsyncIterator, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
 
 from api.models import CustomerMessage, SupportResponse
+from core import registry
 from workflows.support_workflow import SupportWorkflow
-from api.main import get_conversation, active_conversations
+from api.dependencies import get_conversation, conversation_store
 
 router = APIRouter(
     prefix="/predict",
@@ -13,6 +19,101 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+DEFAULT_BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+DEFAULT_BATCH_ITEM_TIMEOUT = float(os.getenv("BATCH_ITEM_TIMEOUT_SECONDS", "300"))
+
+
+async def _process_batch(
+    messages: Dict[str, CustomerMessage],
+    concurrency: int,
+    timeout: Optional[float]
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Process batch items with bounded parallelism, yielding ``(msg_id, result)``
+    in completion order. A failed or timed-out item yields an error result
+    instead of failing the batch.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    loop = asyncio.get_running_loop()
+    executor = registry.get_pipeline_executor()
+    texts = [message.message for message in messages.values()]
+    try:
+        embedding_cache = registry.get_query_embedding_cache()
+    except Exception:
+        # Items still embed their own queries (or report why they cannot)
+        embedding_cache = None
+    # Queries are embedded one chunk at a time, just ahead of the items that
+    # need them: the first results do not wait for the whole batch, and a
+    # batch larger than the cache does not evict its own embeddings
+    chunk_size = max(1, min(concurrency, embedding_cache.max_entries // 2 if embedding_cache else concurrency))
+    chunks: Dict[int, asyncio.Future] = {}
+
+    def embed_chunk(index: int) -> Optional[asyncio.Future]:
+        if embedding_cache is not None and index not in chunks and index * chunk_size < len(texts):
+            chunk = chunks[index] = loop.run_in_executor(
+                executor, embedding_cache.embed_many, texts[index * chunk_size:(index + 1) * chunk_size]
+            )
+            # A prefetched chunk nobody awaits must not log an unretrieved error
+            chunk.add_done_callback(lambda f: f.cancelled() or f.exception())
+        return chunks.get(index)
+
+    async def run_one(position: int, msg_id: str, message: CustomerMessage):
+        await semaphore.acquire()
+        chunk = position // chunk_size
+        embedded = embed_chunk(chunk)
+        embed_chunk(chunk + 1)
+        try:
+            # One forward pass per chunk, so the item's speculative retrieval
+            # finds its query embedding in the shared cache
+            if embedded is not None:
+                await asyncio.shield(embedded)
+        except asyncio.CancelledError:
+            semaphore.release()
+            raise
+        except Exception:
+            # The item still embeds its own query
+            pass
+        started = loop.create_future()
+        workflow = SupportWorkflow()
+
+        def run():
+            loop.call_soon_threadsafe(lambda: started.done() or started.set_result(None))
+            return workflow.process_message(message.message)
+
+        future = loop.run_in_executor(executor, run)
+        # The slot is held until the worker thread returns, even after a
+        # timeout, so at most ``concurrency`` turns of the batch really run
+        future.add_done_callback(lambda _: semaphore.release())
+        try:
+            # The timeout covers the turn's own run, not its wait in the executor queue
+            await asyncio.wait({started, future}, return_when=asyncio.FIRST_COMPLETED)
+            result = await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            result = {
+                "reply": "",
+                "status": "error",
+                "error": f"Timed out after {timeout} seconds"
+            }
+        except asyncio.CancelledError:
+            # Batch aborted: drop the turn if it has not started yet
+            future.cancel()
+            raise
+        except Exception as e:
+            result = {"reply": "", "status": "error", "error": str(e)}
+        return msg_id, result
+
+    tasks = [
+        asyncio.create_task(run_one(position, msg_id, message))
+        for position, (msg_id, message) in enumerate(messages.items())
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # The client went away or the batch was aborted: drop queued items
+        for task in tasks:
+            task.cancel()
+
 @router.post("/", response_model=SupportResponse)
 async def predict(message: CustomerMessage):
     """
@@ -24,36 +125,56 @@ async def predict(message: CustomerMessage):
     workflow = SupportWorkflow()
     
     # Process the message
-    result = workflow.process_message(message.message)
+    result = await workflow.aprocess_message(message.message)
     
     # Return the response
     return result
 
 @router.post("/batch", response_model=Dict[str, SupportResponse])
-async def batch_predict(messages: Dict[str, CustomerMessage]):
+async def batch_predict(
+    messages: Dict[str, CustomerMessage],
+    concurrency: int = Query(DEFAULT_BATCH_CONCURRENCY, ge=1),
+    timeout: float = Query(DEFAULT_BATCH_ITEM_TIMEOUT, gt=0)
+):
     """
     Process multiple customer messages in a batch.
     Each message is processed independently (stateless).
     
     The input should be a dictionary with message IDs as keys and CustomerMessage objects as values.
     The output will be a dictionary with the same keys and SupportResponse objects as values.
+    Up to ``concurrency`` messages are processed at once; an item that fails or
+    exceeds ``timeout`` seconds gets a response with status 'error'.
     """
     results = {}
     
-    for msg_id, message in messages.items():
-        # Create a temporary workflow for this prediction
-        workflow = SupportWorkflow()
-        
-        # Process the message
-        result = workflow.process_message(message.message)
-        
-        # Add to results
+    async for msg_id, result in _process_batch(messages, concurrency, timeout):
         results[msg_id] = result
     
-    return results
+    # Keep the input order in the response
+    return {msg_id: results[msg_id] for msg_id in messages}
+
+@router.post("/batch/stream")
+async def batch_predict_stream(
+    messages: Dict[str, CustomerMessage],
+    concurrency: int = Query(DEFAULT_BATCH_CONCURRENCY, ge=1),
+    timeout: float = Query(DEFAULT_BATCH_ITEM_TIMEOUT, gt=0)
+):
+    """
+    Process multiple customer messages in a batch, streaming results back as
+    newline-delimited JSON as each item completes.
+    
+    Each line is ``{"id": <message ID>, "result": <SupportResponse>}``. Items are
+    emitted in completion order; failed or timed-out items have status 'error'.
+    """
+    async def lines():
+        async for msg_id, result in _process_batch(messages, concurrency, timeout):
+            yield json.dumps({"id": msg_id, "result": result}, default=str) + "\n"
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
 @router.post("/conversation/{conversation_id}", response_model=SupportResponse)
 async def predict_with_conversation(
+    conversation_id: str,
     message: CustomerMessage,
     conversation: SupportWorkflow = Depends(get_conversation)
 ):
@@ -62,9 +183,10 @@ async def predict_with_conversation(
     This is an alternative to using the /conversations/{conversation_id}/messages endpoint.
     """
     # Process the message
-    result = conversation.process_message(message.message)
+    result = await conversation.aprocess_message(message.message)
+    await conversation_store.asave(conversation_id, conversation)
     
     # Add conversation ID to the response
-    result["conversation_id"] = message.conversation_id
+    result["conversation_id"] = conversation_id
     
     return result
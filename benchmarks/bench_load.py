@@ -0,0 +1,296 @@
+# benchmarks/bench_load.py
+"""
+Open-loop HTTP load test of the API.
+
+Starts a fake Ollama-compatible server (benchmarks/fake_ollama.py) and the
+API (api/main.py) pointed at it, then replays the multi-turn sample
+conversations from data/conversations/*.txt: new conversations arrive as a
+Poisson process at ``--rate`` per second, and each sends its customer turns
+one after the other. Reports throughput, p50/p95/p99 latency, error rate and
+the API process's memory over time.
+
+The API still loads the sentence-transformers embedding model, which must be
+available locally. Pass ``--url`` to load an already running API instead.
+
+Usage:
+    python -m benchmarks.bench_load --rate 2 --duration 60 --llm-latency 0.3
+    python -m benchmarks.bench_load --url http://localhost:8000 --rate 5 --output load.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.workload import load_conversations
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _rss_mb(pid: int) -> Optional[float]:
+    """Resident memory of a process in MiB (Linux /proc, else psutil if installed)"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss / (1024 * 1024)
+    except Exception:
+        return None
+
+
+async def _wait_until_up(client: httpx.AsyncClient, url: str, process: Optional[subprocess.Popen], timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode} during startup")
+        try:
+            await client.get(url, timeout=2.0)
+            return
+        except httpx.HTTPError:
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+class LoadTest:
+    def __init__(self, base_url: str, conversations: List[List[str]], rate: float, duration: float,
+                 think_time: float, request_timeout: float, pid: Optional[int] = None, seed: int = 0):
+        self.base_url = base_url.rstrip("/")
+        self.conversations = conversations
+        self.rate = rate
+        self.duration = duration
+        self.think_time = think_time
+        self.request_timeout = request_timeout
+        self.pid = pid
+        self.random = random.Random(seed)
+        self.samples: List[Dict] = []
+        self.timeline: List[Dict] = []
+        self.in_flight = 0
+        self.started = 0.0
+
+    async def _request(self, client: httpx.AsyncClient, url: str, payload: dict, endpoint: str) -> Optional[dict]:
+        start = time.perf_counter()
+        error, body = None, None
+        try:
+            response = await client.post(url, json=payload, timeout=self.request_timeout)
+            if response.status_code != 200:
+                error = f"HTTP {response.status_code}"
+            else:
+                body = response.json()
+                if body.get("status") == "error":
+                    error = body.get("error") or "workflow error"
+        except (httpx.HTTPError, ValueError) as e:
+            error = f"{type(e).__name__}: {e}"
+        self.samples.append({
+            "endpoint": endpoint,
+            "at": start - self.started,
+            "latency": time.perf_counter() - start,
+            "error": error,
+        })
+        return body
+
+    async def _conversation(self, client: httpx.AsyncClient, turns: List[str]):
+        self.in_flight += 1
+        try:
+            body = await self._request(client, f"{self.base_url}/conversations", {"message": turns[0]}, "create")
+            conversation_id = body and body.get("conversation_id")
+            if not conversation_id:
+                return
+            for message in turns[1:]:
+                await asyncio.sleep(self.think_time)
+                await self._request(
+                    client, f"{self.base_url}/conversations/{conversation_id}/messages",
+                    {"message": message}, "message"
+                )
+        finally:
+            self.in_flight -= 1
+
+    async def _sample_memory(self, stop: asyncio.Event, interval: float):
+        while True:
+            self.timeline.append({
+                "t": round(time.perf_counter() - self.started, 2),
+                "rss_mb": _rss_mb(self.pid) if self.pid else None,
+                "in_flight_conversations": self.in_flight,
+                "completed_requests": len(self.samples),
+            })
+            if stop.is_set():
+                return
+            try:
+                await asyncio.wait_for(stop.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self, sample_interval: float = 1.0) -> Dict:
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=100)
+        async with httpx.AsyncClient(limits=limits) as client:
+            self.started = time.perf_counter()
+            stop = asyncio.Event()
+            sampler = asyncio.create_task(self._sample_memory(stop, sample_interval))
+            conversations = []
+            # Open loop: arrivals do not wait for earlier conversations to finish
+            while time.perf_counter() - self.started < self.duration:
+                turns = self.conversations[len(conversations) % len(self.conversations)]
+                conversations.append(asyncio.create_task(self._conversation(client, turns)))
+                await asyncio.sleep(self.random.expovariate(self.rate))
+            await asyncio.gather(*conversations)
+            elapsed = time.perf_counter() - self.started
+            stop.set()
+            await sampler
+        return self.report(len(conversations), elapsed)
+
+    def report(self, conversations: int, elapsed: float) -> Dict:
+        def latency_summary(samples):
+            latencies = [s["latency"] for s in samples if s["error"] is None]
+            return {
+                "requests": len(samples),
+                "errors": sum(1 for s in samples if s["error"] is not None),
+                "p50_s": _percentile(latencies, 0.50),
+                "p95_s": _percentile(latencies, 0.95),
+                "p99_s": _percentile(latencies, 0.99),
+                "max_s": max(latencies) if latencies else None,
+            }
+
+        memory = [point["rss_mb"] for point in self.timeline if point["rss_mb"] is not None]
+        errors = [s["error"] for s in self.samples if s["error"] is not None]
+        return {
+            "config": {"rate": self.rate, "duration": self.duration, "think_time": self.think_time},
+            "conversations": conversations,
+            "elapsed_s": elapsed,
+            "throughput_rps": len(self.samples) / elapsed if elapsed else 0.0,
+            "successful_rps": (len(self.samples) - len(errors)) / elapsed if elapsed else 0.0,
+            "error_rate": len(errors) / len(self.samples) if self.samples else 0.0,
+            "latency": latency_summary(self.samples),
+            "by_endpoint": {
+                endpoint: latency_summary([s for s in self.samples if s["endpoint"] == endpoint])
+                for endpoint in ("create", "message")
+            },
+            "memory_mb": {
+                "start": memory[0] if memory else None,
+                "peak": max(memory) if memory else None,
+                "end": memory[-1] if memory else None,
+                "growth": memory[-1] - memory[0] if memory else None,
+            },
+            "sample_errors": sorted(set(errors))[:10],
+            "timeline": self.timeline,
+        }
+
+
+def _print_report(report: Dict):
+    latency = report["latency"]
+    fmt = lambda value: f"{value * 1000:.0f} ms" if value is not None else "-"
+    print(f"\nconversations: {report['conversations']}   requests: {latency['requests']}   "
+          f"elapsed: {report['elapsed_s']:.1f}s")
+    print(f"throughput: {report['throughput_rps']:.2f} req/s ({report['successful_rps']:.2f} successful)")
+    print(f"error rate: {report['error_rate'] * 100:.1f}%")
+    print(f"latency: p50 {fmt(latency['p50_s'])}   p95 {fmt(latency['p95_s'])}   "
+          f"p99 {fmt(latency['p99_s'])}   max {fmt(latency['max_s'])}")
+    memory = report["memory_mb"]
+    if memory["start"] is not None:
+        print(f"memory: start {memory['start']:.0f} MiB   peak {memory['peak']:.0f} MiB   "
+              f"end {memory['end']:.0f} MiB   growth {memory['growth']:+.0f} MiB")
+    for error in report["sample_errors"]:
+        print(f"  ⚠️ {error}")
+
+
+async def _main(args) -> Dict:
+    processes: List[subprocess.Popen] = []
+    pid = None
+    base_url = args.url
+    try:
+        async with httpx.AsyncClient() as client:
+            if base_url is None:
+                ollama_port, api_port = _free_port(), _free_port()
+                processes.append(subprocess.Popen([
+                    sys.executable, "-m", "benchmarks.fake_ollama", "--port", str(ollama_port),
+                    "--latency", str(args.llm_latency), "--jitter", str(args.llm_jitter),
+                ]))
+                ollama_url = f"http://127.0.0.1:{ollama_port}"
+                await _wait_until_up(client, f"{ollama_url}/api/version", processes[-1], 30)
+
+                workdir = tempfile.mkdtemp(prefix="load_test_")
+                env = dict(
+                    os.environ,
+                    OLLAMA_HOST=ollama_url,
+                    OLLAMA_API_BASE=ollama_url,
+                    CONVERSATION_DB=os.path.join(workdir, "conversations.db"),
+                    LLM_CACHE_PATH=os.path.join(workdir, "llm_cache.db"),
+                )
+                if args.keep_caches:
+                    env.update(LLM_CACHE_ENABLED="1", SEMANTIC_CACHE_ENABLED="1")
+                else:
+                    env.update(LLM_CACHE_ENABLED="0", SEMANTIC_CACHE_ENABLED="0")
+                processes.append(subprocess.Popen([
+                    sys.executable, "-m", "uvicorn", "api.main:app",
+                    "--host", "127.0.0.1", "--port", str(api_port), "--log-level", "warning",
+                ], env=env))
+                pid = processes[-1].pid
+                base_url = f"http://127.0.0.1:{api_port}"
+                await _wait_until_up(client, f"{base_url}/", processes[-1], args.startup_timeout)
+
+        load_test = LoadTest(
+            base_url, load_conversations(args.conversations_dir), rate=args.rate, duration=args.duration,
+            think_time=args.think_time, request_timeout=args.request_timeout, pid=args.pid or pid,
+        )
+        print(f"🚀 Loading {base_url} with {args.rate} new conversations/s for {args.duration:.0f}s")
+        return await load_test.run(args.sample_interval)
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Async HTTP load test of the support API")
+    parser.add_argument("--url", default=None, help="Target a running API instead of starting one")
+    parser.add_argument("--pid", type=int, default=None, help="API process to sample memory of (with --url)")
+    parser.add_argument("--rate", type=float, default=1.0, help="New conversations per second")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds of arrivals")
+    parser.add_argument("--think-time", type=float, default=1.0, help="Seconds between a conversation's turns")
+    parser.add_argument("--request-timeout", type=float, default=300.0)
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="Fake Ollama seconds per completion")
+    parser.add_argument("--llm-jitter", type=float, default=0.1)
+    parser.add_argument("--keep-caches", action="store_true", help="Turn the LLM and semantic caches on")
+    parser.add_argument("--startup-timeout", type=float, default=180.0)
+    parser.add_argument("--sample-interval", type=float, default=1.0)
+    parser.add_argument("--conversations-dir", default="data/conversations")
+    parser.add_argument("--output", default=None, help="Write the full report, with timeline, as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(_main(args))
+    _print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
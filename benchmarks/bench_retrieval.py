@@ -0,0 +1,96 @@
+# benchmarks/bench_retrieval.py
+"""
+Compare recall and latency of the Chroma retrieval path against FAISS index
+variants built from the same documents. Ground truth is exact float32
+inner-product search over the normalised document embeddings.
+
+Usage:
+    python -m benchmarks.bench_retrieval --k 3
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import faiss
+import numpy as np
+
+from core import registry
+from tools.faiss_index import build_faiss_index, FaissVectorStore
+from tools.knowledge_base_loader import load_split_documents
+
+QUERIES = [
+    "app says no internet connection but Wi-Fi works",
+    "payment gateway integration failure",
+    "software installation fails with antivirus enabled",
+    "account data not syncing between devices",
+    "device not compatible error after update",
+    "refund was never processed",
+    "how do I reset my password",
+    "Local Network permission is disabled",
+]
+
+VARIANTS = [("flat", "fp32"), ("flat", "fp16"), ("flat", "int8"), ("hnsw", "fp16"), ("ivf", "int8")]
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _measure(search, queries, truth, k, repeat):
+    latencies, recalls = [], []
+    for _ in range(repeat):
+        for query, expected in zip(queries, truth):
+            start = time.perf_counter()
+            texts = search(query)
+            latencies.append(time.perf_counter() - start)
+            recalls.append(len(set(texts) & expected) / max(1, len(expected)))
+    return statistics.mean(recalls), _percentile(latencies, 0.5), _percentile(latencies, 0.95)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retrieval recall/latency: Chroma vs FAISS")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--persist-directory", default=registry.DEFAULT_PERSIST_DIRECTORY)
+    args = parser.parse_args()
+
+    embeddings = registry.get_embeddings()
+    docs = load_split_documents()
+    texts = [doc.page_content for doc in docs]
+    doc_vectors = np.asarray(embeddings.embed_documents(texts), dtype="float32")
+    faiss.normalize_L2(doc_vectors)
+    query_vectors = np.asarray(embeddings.embed_documents(QUERIES), dtype="float32")
+    faiss.normalize_L2(query_vectors)
+    top = np.argsort(-(query_vectors @ doc_vectors.T), axis=1)[:, :args.k]
+    truth = [{texts[i] for i in row} for row in top]
+
+    print(f"{'backend':<14} {'recall@k':>9} {'p50 (ms)':>9} {'p95 (ms)':>9}")
+
+    if os.path.exists(args.persist_directory):
+        chroma = registry.get_vectorstore(args.persist_directory)
+        recall, p50, p95 = _measure(
+            lambda q: [d.page_content for d in chroma.similarity_search(q, k=args.k)],
+            QUERIES, truth, args.k, args.repeat
+        )
+        print(f"{'chroma':<14} {recall:>9.3f} {p50 * 1000:>9.2f} {p95 * 1000:>9.2f}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode, quantization in VARIANTS:
+            index_directory = os.path.join(tmp, f"{mode}_{quantization}")
+            build_faiss_index(index_directory=index_directory, mode=mode, quantization=quantization)
+            store = FaissVectorStore(index_directory)
+            recall, p50, p95 = _measure(
+                lambda q: [d.page_content for d in store.similarity_search(q, k=args.k)],
+                QUERIES, truth, args.k, args.repeat
+            )
+            size = os.path.getsize(os.path.join(index_directory, "index.faiss"))
+            name = f"faiss-{mode}-{quantization}"
+            print(f"{name:<14} {recall:>9.3f} {p50 * 1000:>9.2f} {p95 * 1000:>9.2f}   index {size / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
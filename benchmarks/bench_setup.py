@@ -0,0 +1,69 @@
+# benchmarks/bench_setup.py
+"""
+Measure per-turn setup cost: building the six workflow tasks (agents, LLM
+clients, embedding model and Chroma handle) with a cold registry versus a
+warm one.
+
+Usage:
+    python -m benchmarks.bench_setup --iterations 5
+"""
+
+import argparse
+import statistics
+import time
+
+from core import registry
+from tasks.summarizer_task import SummarizerTask
+from tasks.extractor_task import ActionExtractorTask
+from tasks.resolver_task import ResolutionFinderTask
+from tasks.router_task import EscalationRouterTask
+from tasks.estimator_task import TimeEstimatorTask
+from tasks.dispatcher_task import DispatcherTask
+
+SUMMARY = "Customer reports that the app says 'no internet connection' despite working Wi-Fi."
+ACTIONS = "- Check Local Network permission\n- Clear app cache"
+
+
+def build_turn_tasks():
+    """Build every task a single turn needs, without running any of them"""
+    return [
+        SummarizerTask(f"Customer: {SUMMARY}").build(),
+        ActionExtractorTask(SUMMARY).build(),
+        ResolutionFinderTask(summary=SUMMARY, actions=ACTIONS).build(),
+        TimeEstimatorTask(summary=SUMMARY, actions=ACTIONS).build(),
+        EscalationRouterTask(actions=ACTIONS).build(),
+        DispatcherTask(summary=SUMMARY, actions=ACTIONS, resolution="", routing="", eta="").build(),
+    ]
+
+
+def time_setup(iterations: int, cold: bool) -> list:
+    timings = []
+    for _ in range(iterations):
+        if cold:
+            registry.clear()
+        start = time.perf_counter()
+        build_turn_tasks()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-turn agent/task setup cost")
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+
+    cold = time_setup(args.iterations, cold=True)
+    # First warm iteration populates the registry
+    registry.clear()
+    build_turn_tasks()
+    warm = time_setup(args.iterations, cold=False)
+
+    print(f"{'mode':<6} {'mean (ms)':>12} {'median (ms)':>12} {'max (ms)':>12}")
+    for name, timings in (("cold", cold), ("warm", warm)):
+        print(f"{name:<6} {statistics.mean(timings) * 1000:>12.2f} "
+              f"{statistics.median(timings) * 1000:>12.2f} {max(timings) * 1000:>12.2f}")
+    print(f"speedup: {statistics.mean(cold) / statistics.mean(warm):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
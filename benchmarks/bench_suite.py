@@ -0,0 +1,266 @@
+# benchmarks/bench_suite.py
+"""
+Offline benchmark suite: no Ollama and no network.
+
+The LLM is replaced by a deterministic stub with configurable latency and the
+embedding model by a hashing stub (``--real-embeddings`` keeps the
+sentence-transformers model), so results measure the pipeline itself:
+
+- turn: per-turn latency of WorkflowManager.process_customer_message
+- setup: agent/task construction with a cold and a warm registry
+- retrieval: VectorSearchTool query latency, single and batched
+- routing: TeamRoutingMap throughput on a large synthetic rule table
+- ingest: build_vector_db full and incremental rebuild rate
+
+Results are written to JSON; pass ``--compare`` with an earlier results file
+to print the change of every metric.
+
+Usage:
+    python -m benchmarks.bench_suite --output benchmarks/results/$(git rev-parse --short HEAD).json
+    python -m benchmarks.bench_suite --only turn,routing --llm-latency 0.2 --compare old.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from core import registry
+from benchmarks import stubs
+from benchmarks.bench_setup import build_turn_tasks
+from benchmarks.workload import load_conversations
+
+BENCHMARKS = ("turn", "setup", "retrieval", "routing", "ingest")
+QUERIES = [
+    "app says no internet connection but Wi-Fi works",
+    "payment gateway integration failure",
+    "software installation fails with antivirus enabled",
+    "account data not syncing between devices",
+    "device not compatible error after update",
+    "refund was never processed",
+]
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _summary(seconds: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds"""
+    return {
+        "count": len(seconds),
+        "mean_ms": statistics.mean(seconds) * 1000,
+        "p50_ms": _percentile(seconds, 0.50) * 1000,
+        "p95_ms": _percentile(seconds, 0.95) * 1000,
+        "max_ms": max(seconds) * 1000,
+    }
+
+
+def _timed(func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def bench_turn(args) -> Dict[str, object]:
+    from core.workflow_manager import WorkflowManager
+
+    results = {}
+    conversations = load_conversations(args.conversations_dir)
+    for name, sequential in (("parallel", False), ("sequential", True)):
+        latencies, errors = [], []
+        for _ in range(args.repeat):
+            for turns in conversations:
+                manager = WorkflowManager(sequential=sequential)
+                for message in turns:
+                    start = time.perf_counter()
+                    result = manager.process_customer_message(message)
+                    latencies.append(time.perf_counter() - start)
+                    if result.get("status") == "error":
+                        errors.append(result.get("error"))
+        # A failed turn returns early, so its timing would pass for a fast success
+        if errors:
+            raise RuntimeError(
+                f"{len(errors)} of {len(latencies)} {name} turns failed, first error: {errors[0]}"
+            )
+        results[name] = _summary(latencies)
+    # What the stub LLM alone costs per turn on the critical path, for reference
+    results["llm_latency_ms"] = args.llm_latency * 1000
+    return results
+
+
+def bench_setup(args) -> Dict[str, object]:
+    def cold():
+        registry.clear()
+        stubs.install(args.llm_latency, stub_embeddings=not args.real_embeddings)
+        return _timed(build_turn_tasks)
+
+    cold_timings = [cold() for _ in range(args.repeat)]
+    build_turn_tasks()
+    warm_timings = [_timed(build_turn_tasks) for _ in range(args.repeat)]
+    return {"cold": _summary(cold_timings), "warm": _summary(warm_timings)}
+
+
+def bench_retrieval(args) -> Dict[str, object]:
+    tool = registry.get_vector_tool()
+    single = []
+    for _ in range(args.repeat * 10):
+        for query in QUERIES:
+            single.append(_timed(lambda: tool.search(query)))
+    # Fresh queries each round so the batch pays for embedding, as a new batch would
+    batched = []
+    for round_number in range(args.repeat * 10):
+        queries = [f"{query} #{round_number}" for query in QUERIES]
+        batched.append(_timed(lambda: tool.search_many(queries)) / len(queries))
+    return {
+        "mode": tool.mode,
+        "single": _summary(single),
+        "batched_per_query": _summary(batched),
+        "embedding_cache": registry.get_query_embedding_cache().stats(),
+    }
+
+
+def bench_routing(args) -> Dict[str, object]:
+    from tools.team_routing_map import TeamRoutingMap
+
+    rng = random.Random(0)
+    vocabulary = [f"term{i}" for i in range(args.routing_rules * 2)]
+    teams = [f"Team{i}" for i in range(50)]
+    rules = {" ".join(rng.sample(vocabulary, 2)): rng.choice(teams) for _ in range(args.routing_rules)}
+    keywords = list(rules)
+    items = [
+        f"Escalate {rng.choice(keywords)} and check {' '.join(rng.sample(vocabulary, 6))}"
+        for _ in range(args.routing_items)
+    ]
+
+    results = {"rules": len(rules), "items": len(items)}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "rules.json")
+        with open(path, "w") as f:
+            json.dump(rules, f)
+        compile_seconds = _timed(lambda: TeamRoutingMap(path))
+        routing = TeamRoutingMap(path)
+        single = _timed(lambda: [routing.get_team_for_action(item) for item in items])
+        bulk = _timed(lambda: routing.route_bulk(items))
+    results["compile_ms"] = compile_seconds * 1000
+    results["single_items_per_s"] = len(items) / single
+    results["bulk_items_per_s"] = len(items) / bulk
+    return results
+
+
+def bench_ingest(args) -> Dict[str, object]:
+    from tools.knowledge_base_loader import build_vector_db, load_split_documents
+
+    chunks = len(load_split_documents(args.conversations_dir, args.historical_csv, args.kb_file))
+    with tempfile.TemporaryDirectory() as tmp:
+        full = _timed(lambda: build_vector_db(
+            persist_directory=tmp, conversations_dir=args.conversations_dir,
+            historical_csv=args.historical_csv, kb_file=args.kb_file
+        ))
+        incremental = _timed(lambda: build_vector_db(
+            persist_directory=tmp, conversations_dir=args.conversations_dir,
+            historical_csv=args.historical_csv, kb_file=args.kb_file, incremental=True
+        ))
+    return {
+        "chunks": chunks,
+        "full_s": full,
+        "full_chunks_per_s": chunks / full,
+        "incremental_noop_s": incremental,
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _flatten(results: Dict, prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(current: Dict, baseline: Dict):
+    """Print every numeric metric next to its baseline value"""
+    now, before = _flatten(current["results"]), _flatten(baseline["results"])
+    print(f"\nvs {baseline.get('commit', '?')}:")
+    print(f"{'metric':<44} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name in sorted(now.keys() & before.keys()):
+        change = (now[name] - before[name]) / before[name] * 100 if before[name] else 0.0
+        print(f"{name:<44} {before[name]:>12.2f} {now[name]:>12.2f} {change:>+8.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline pipeline benchmark suite")
+    parser.add_argument("--only", default=",".join(BENCHMARKS),
+                        help=f"Comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Stub LLM seconds per call")
+    parser.add_argument("--llm-jitter", type=float, default=0.0)
+    parser.add_argument("--real-embeddings", action="store_true",
+                        help="Use the sentence-transformers model instead of hashing embeddings")
+    parser.add_argument("--routing-rules", type=int, default=5000)
+    parser.add_argument("--routing-items", type=int, default=2000)
+    parser.add_argument("--conversations-dir", default="data/conversations")
+    parser.add_argument("--historical-csv", default="data/historical/historical_tickets.csv")
+    parser.add_argument("--kb-file", default="data/knowledge_base/knowledge_base.txt")
+    parser.add_argument("--output", default=None, help="Results file (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", default=None, help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    selected = [name for name in args.only.split(",") if name]
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    stubs.install(args.llm_latency, args.llm_jitter, stub_embeddings=not args.real_embeddings)
+    results = {}
+    with tempfile.TemporaryDirectory() as kb_directory:
+        if {"turn", "setup", "retrieval"} & set(selected):
+            # Retrieval stages search a throwaway knowledge base built with the same embeddings
+            from tools.knowledge_base_loader import build_vector_db
+            build_vector_db(persist_directory=kb_directory, conversations_dir=args.conversations_dir,
+                            historical_csv=args.historical_csv, kb_file=args.kb_file)
+            os.environ["KB_PERSIST_DIRECTORY"] = kb_directory
+        for name in BENCHMARKS:
+            if name in selected:
+                print(f"⏱️ {name}...")
+                results[name] = globals()[f"bench_{name}"](args)
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "results": results,
+    }
+    output = args.output or os.path.join("benchmarks", "results", f"{report['commit']}.json")
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(results, indent=2))
+    print(f"✅ Results written to {output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
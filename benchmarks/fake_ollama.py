@@ -0,0 +1,116 @@
+# benchmarks/fake_ollama.py
+"""
+Minimal Ollama-compatible HTTP server for load tests.
+
+Serves /api/chat and /api/generate (streaming and not) with the deterministic
+role-aware outputs of benchmarks.stubs after a configurable latency, wrapped
+in the "Final Answer:" format CrewAI agents parse.
+
+Usage:
+    python -m benchmarks.fake_ollama --port 11435 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+from datetime import datetime, timezone
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+from benchmarks.stubs import canned_response
+
+ROLE_PATTERN = re.compile(r"You are ([^.\n]+)")
+
+app = FastAPI(title="Fake Ollama")
+app.state.latency = 0.2
+app.state.jitter = 0.0
+app.state.model = "mistral"
+
+
+def _answer(prompt: str) -> str:
+    match = ROLE_PATTERN.search(prompt)
+    role = match.group(1) if match else prompt
+    return f"Thought: I now can give a great answer\nFinal Answer: {canned_response(role, prompt)}"
+
+
+async def _respond(body: dict, prompt: str, make_chunk):
+    """Sleep for the simulated model latency, then answer in one response or an NDJSON stream"""
+    started = time.perf_counter()
+    await asyncio.sleep(app.state.latency + random.random() * app.state.jitter)
+    text = _answer(prompt)
+    created_at = datetime.now(timezone.utc).isoformat()
+    final = {
+        "model": body.get("model", app.state.model),
+        "created_at": created_at,
+        "done": True,
+        "done_reason": "stop",
+        "total_duration": int((time.perf_counter() - started) * 1e9),
+        "prompt_eval_count": len(prompt.split()),
+        "eval_count": len(text.split()),
+    }
+    if not body.get("stream", True):
+        return dict(final, **make_chunk(text))
+
+    async def chunks():
+        words = text.split(" ")
+        for i, word in enumerate(words):
+            piece = word if i == len(words) - 1 else word + " "
+            chunk = {"model": final["model"], "created_at": created_at, "done": False}
+            yield json.dumps(dict(chunk, **make_chunk(piece))) + "\n"
+        yield json.dumps(dict(final, **make_chunk(""))) + "\n"
+
+    return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+
+@app.post("/api/chat")
+async def chat(request: Request):
+    body = await request.json()
+    prompt = "\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+    return await _respond(body, prompt, lambda text: {"message": {"role": "assistant", "content": text}})
+
+
+@app.post("/api/generate")
+async def generate(request: Request):
+    body = await request.json()
+    prompt = f"{body.get('system', '')}\n{body.get('prompt', '')}"
+    return await _respond(body, prompt, lambda text: {"response": text})
+
+
+@app.get("/api/tags")
+async def tags():
+    name = f"{app.state.model}:latest"
+    return {"models": [{"name": name, "model": name, "size": 0, "details": {"family": "llama"}}]}
+
+
+@app.post("/api/show")
+async def show():
+    return {"modelfile": "", "parameters": "", "template": "{{ .Prompt }}",
+            "details": {"family": "llama", "format": "gguf"}, "model_info": {}}
+
+
+@app.get("/api/version")
+async def version():
+    return {"version": "0.0.0-fake"}
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake Ollama server for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per completion")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random seconds per completion")
+    args = parser.parse_args()
+
+    app.state.latency = args.latency
+    app.state.jitter = args.jitter
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
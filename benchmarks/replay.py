@@ -0,0 +1,61 @@
+# benchmarks/replay.py
+"""
+Replay recorded workflow turns (see core/cassette.py) with no model server.
+
+Each cassette's turn is rerun from its saved conversation state with every
+LLM and retrieval call answered from the cassette. The run reports per-turn
+latency and exits non-zero if any turn's result differs from the recorded
+one, so a directory of production cassettes doubles as a regression suite.
+
+Usage:
+    CASSETTE_DIR=data/cassettes uvicorn api.main:app      # record
+    python -m benchmarks.replay data/cassettes             # replay as fast as possible
+    python -m benchmarks.replay data/cassettes --timing    # with the recorded call latencies
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+from core import cassette
+from core.cassette import Cassette
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded workflow turns")
+    parser.add_argument("paths", nargs="+", help="Cassette files or directories of them")
+    parser.add_argument("--timing", action="store_true", help="Sleep for the recorded call durations")
+    parser.add_argument("--speed", type=float, default=1.0, help="Scale of the recorded durations")
+    args = parser.parse_args()
+
+    paths = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            paths.extend(sorted(glob.glob(os.path.join(path, f"*{cassette.CASSETTE_SUFFIX}"))))
+        else:
+            paths.append(path)
+    if not paths:
+        parser.error("No cassettes found")
+
+    latencies, mismatches = [], []
+    for path in paths:
+        start = time.perf_counter()
+        result, recorded = cassette.replay_turn(Cassette.load(path), timing=args.timing, speed=args.speed)
+        latencies.append(time.perf_counter() - start)
+        if result != recorded:
+            mismatches.append(path)
+            print(f"❌ {path}: {result.get('error') or 'result differs from the recording'}")
+
+    print(f"🔁 Replayed {len(paths)} turns: mean {statistics.mean(latencies) * 1000:.1f} ms, "
+          f"max {max(latencies) * 1000:.1f} ms")
+    if mismatches:
+        print(f"❌ {len(mismatches)} of {len(paths)} turns differ from their recording")
+        sys.exit(1)
+    print("✅ All turns match their recording")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+# benchmarks/workload.py
+"""Realistic customer turns taken from the sample conversations"""
+
+import glob
+import os
+from typing import List
+
+CUSTOMER_PREFIX = "Customer:"
+
+
+def load_conversations(conversations_dir: str = "data/conversations") -> List[List[str]]:
+    """Customer messages of every sample conversation, one list per conversation"""
+    conversations = []
+    for path in sorted(glob.glob(os.path.join(conversations_dir, "*.txt"))):
+        with open(path, "r", encoding="utf-8") as f:
+            turns = [
+                line[len(CUSTOMER_PREFIX):].strip().strip('"')
+                for line in f
+                if line.startswith(CUSTOMER_PREFIX)
+            ]
+        if turns:
+            conversations.append(turns)
+    if not conversations:
+        raise ValueError(f"No customer turns found in {conversations_dir}")
+    return conversations
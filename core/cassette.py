@@ -0,0 +1,257 @@
+# core/cassette.py
+"""
+Record/replay cassettes for the LLM and tool calls of workflow turns.
+
+While a cassette is recording, every LLM task and every instrumented tool
+call made in the current context (including stage worker threads, which run
+in a copy of it) is captured with its request, response and duration. While
+one is replaying, the same calls are answered from the cassette instead, so a
+turn reruns deterministically without Ollama, the embedding model or the
+knowledge base; pass ``timing=True`` to also sleep for the recorded durations.
+
+Cassettes are gzipped JSON. With ``CASSETTE_DIR`` set, WorkflowManager
+records every turn into its own cassette, together with the conversation
+state before the turn and the turn's result, which ``replay_turn`` reruns.
+
+Usage:
+    with cassette.recording() as tape:
+        manager.process_customer_message(message)
+    tape.save("turn.cassette.json.gz")
+
+    with cassette.replaying(Cassette.load("turn.cassette.json.gz")):
+        manager.process_customer_message(message)
+"""
+
+import contextvars
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+CASSETTE_VERSION = 1
+CASSETTE_SUFFIX = ".cassette.json.gz"
+
+
+class CassetteMiss(LookupError):
+    """A replayed call has no recorded counterpart"""
+
+
+def _key(kind: str, name: str, request: Any) -> str:
+    payload = json.dumps([kind, name, request], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def _encode(value: Any) -> Any:
+    """JSON-compatible form of a call result; LangChain documents are tagged so they decode back"""
+    if isinstance(value, (list, tuple)):
+        return [_encode(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _encode(item) for key, item in value.items()}
+    if hasattr(value, "page_content") and hasattr(value, "metadata"):
+        return {"__document__": True, "page_content": value.page_content, "metadata": dict(value.metadata)}
+    return value
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    if isinstance(value, dict):
+        if value.get("__document__"):
+            from langchain_core.documents import Document
+            return Document(page_content=value["page_content"], metadata=value["metadata"])
+        return {key: _decode(item) for key, item in value.items()}
+    return value
+
+
+class Cassette:
+    """
+    Recorded LLM and tool interactions, in call order.
+
+    Each interaction holds the call kind ("llm" or "tool"), its name (agent
+    role or tool method), a key hashing both with the request, the request
+    itself, the encoded response (or the error it raised) and its duration.
+    ``turn`` optionally describes the recorded workflow turn: the customer
+    message, the conversation state before it and the result.
+    """
+
+    def __init__(self, interactions: Optional[List[Dict[str, Any]]] = None,
+                 turn: Optional[Dict[str, Any]] = None):
+        self.interactions = interactions if interactions is not None else []
+        self.turn = turn
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.interactions)
+
+    def add(self, kind: str, name: str, request: Any, response: Any = None,
+            error: Optional[str] = None, duration: float = 0.0):
+        interaction = {
+            "kind": kind,
+            "name": name,
+            "key": _key(kind, name, request),
+            "request": request,
+            "duration": round(duration, 6),
+        }
+        if error is None:
+            interaction["response"] = _encode(response)
+        else:
+            interaction["error"] = error
+        with self._lock:
+            self.interactions.append(interaction)
+
+    def save(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = {"version": CASSETTE_VERSION, "turn": self.turn, "interactions": self.interactions}
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version in {path}: {data.get('version')}")
+        return cls(data["interactions"], data.get("turn"))
+
+
+class _Session:
+    """An active recording or replay of a cassette"""
+
+    def __init__(self, cassette: Cassette, replay: bool, timing: bool = False,
+                 speed: float = 1.0, strict: bool = True):
+        self.cassette = cassette
+        self.replay = replay
+        self.timing = timing
+        self.speed = speed
+        self.strict = strict
+        self._lock = threading.Lock()
+        # Identical requests are answered in the order they were recorded;
+        # the last answer repeats once they run out
+        self._queues: Dict[str, deque] = defaultdict(deque)
+        self._last: Dict[str, Dict[str, Any]] = {}
+        if replay:
+            for interaction in cassette.interactions:
+                self._queues[interaction["key"]].append(interaction)
+
+    def call(self, kind: str, name: str, request: Any, func: Callable[[], Any]) -> Any:
+        if self.replay:
+            return self._replay(kind, name, request, func)
+        start = time.perf_counter()
+        try:
+            response = func()
+        except Exception as e:
+            self.cassette.add(kind, name, request, error=f"{type(e).__name__}: {e}",
+                              duration=time.perf_counter() - start)
+            raise
+        self.cassette.add(kind, name, request, response, duration=time.perf_counter() - start)
+        return response
+
+    def _replay(self, kind: str, name: str, request: Any, func: Callable[[], Any]) -> Any:
+        key = _key(kind, name, request)
+        with self._lock:
+            queue = self._queues.get(key)
+            if queue:
+                interaction = self._last[key] = queue.popleft()
+            else:
+                interaction = self._last.get(key)
+        if interaction is None:
+            if self.strict:
+                raise CassetteMiss(f"No recorded {kind} call for {name} matching this request")
+            return func()
+        if self.timing and interaction["duration"] > 0:
+            time.sleep(interaction["duration"] * self.speed)
+        if "error" in interaction:
+            raise RuntimeError(f"Recorded failure of {name}: {interaction['error']}")
+        return _decode(interaction["response"])
+
+
+_session: contextvars.ContextVar[Optional[_Session]] = contextvars.ContextVar("cassette_session", default=None)
+
+
+def active() -> Optional[Cassette]:
+    """Cassette being recorded or replayed in the current context, if any"""
+    session = _session.get()
+    return session.cassette if session is not None else None
+
+
+@contextmanager
+def recording(cassette: Optional[Cassette] = None) -> Iterator[Cassette]:
+    """Record the calls made within the block into ``cassette`` (a new one by default)"""
+    cassette = cassette if cassette is not None else Cassette()
+    token = _session.set(_Session(cassette, replay=False))
+    try:
+        yield cassette
+    finally:
+        _session.reset(token)
+
+
+@contextmanager
+def replaying(cassette: Cassette, timing: bool = False, speed: float = 1.0,
+              strict: bool = True) -> Iterator[Cassette]:
+    """
+    Answer the calls made within the block from ``cassette``.
+
+    With ``timing`` each answer is delayed by its recorded duration times
+    ``speed``. Unrecorded calls raise CassetteMiss, or run for real when
+    ``strict`` is False.
+    """
+    token = _session.set(_Session(cassette, replay=True, timing=timing, speed=speed, strict=strict))
+    try:
+        yield cassette
+    finally:
+        _session.reset(token)
+
+
+def llm_call(task, runner: Callable[[Any], str]) -> str:
+    """Run ``task`` with ``runner``, through the active cassette if there is one"""
+    session = _session.get()
+    if session is None:
+        return runner(task)
+    request = {"description": task.description, "expected_output": task.expected_output}
+    return session.call("llm", task.agent.role, request, lambda: runner(task))
+
+
+def tool_call(name: str, args: List[Any], func: Callable[[], Any]) -> Any:
+    """Run ``func`` (the tool call ``name(*args)``), through the active cassette if there is one"""
+    session = _session.get()
+    if session is None:
+        return func()
+    return session.call("tool", name, {"args": list(args)}, func)
+
+
+def cassette_path(directory: str) -> str:
+    """New, unique cassette file name in ``directory``"""
+    stamp = time.strftime("%Y%m%dT%H%M%S")
+    return os.path.join(directory, f"{stamp}-{uuid.uuid4().hex[:8]}{CASSETTE_SUFFIX}")
+
+
+def replay_turn(cassette: Cassette, timing: bool = False, speed: float = 1.0,
+                manager=None) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    Rerun the workflow turn recorded in ``cassette`` from its saved state and
+    with its recorded settings. Returns the new result and the recorded one.
+    """
+    from core.conversation_state import ConversationState
+    from core.workflow_manager import WorkflowManager
+
+    if not cassette.turn:
+        raise ValueError("Cassette does not describe a workflow turn")
+    config = dict(cassette.turn.get("config") or {})
+    if manager is None:
+        manager = WorkflowManager(
+            full_summary_every=config.pop("full_summary_every", None),
+            resolution_retrieval=config.pop("resolution_retrieval", None),
+        )
+    for name, value in config.items():
+        setattr(manager, name, value)
+    manager.state = ConversationState.from_dict(cassette.turn["state"])
+    with replaying(cassette, timing=timing, speed=speed):
+        result = manager.process_customer_message(cassette.turn["message"])
+    return result, cassette.turn.get("result")
@@ -1,5 +1,33 @@
 # core/conversation_state.py
 
+import time
+from array import array
+from enum import Enum
+
+
+class Role(str, Enum):
+    """Author of a conversation message"""
+    CUSTOMER = "customer"
+    SYSTEM = "system"
+
+    @property
+    def label(self):
+        return "Customer" if self is Role.CUSTOMER else "Support"
+
+
+class Message:
+    """A single conversation message"""
+    __slots__ = ("role", "content", "timestamp")
+
+    def __init__(self, role, content, timestamp=None):
+        self.role = role
+        self.content = content
+        self.timestamp = time.time() if timestamp is None else timestamp
+
+    def __repr__(self):
+        return f"Message(role={self.role.value!r}, content={self.content!r}, timestamp={self.timestamp!r})"
+
+
 class ConversationState:
     """
     Manages the state of a customer support conversation across multiple turns.
@@ -8,28 +36,53 @@ class ConversationState:
     
     def __init__(self):
         self.conversation_history = []
+        # Formatted transcript of the first len(_offsets) messages and the
+        # offset at which each of them starts; extended when next read
+        self._transcript = ""
+        self._offsets = array("Q")
         self.current_summary = None
         self.current_actions = None
         self.current_resolution = None
         self.current_routing = None
         self.current_eta = None
         self.status = "continue"  # One of: continue, resolved, escalate
+        # Rolling summary bookkeeping: how many messages current_summary covers
+        # and how many incremental updates were applied since the last full pass
+        self.summarized_message_count = 0
+        self.incremental_summaries = 0
+        
+    def _append(self, role, content, timestamp=None):
+        self.conversation_history.append(Message(role, content, timestamp))
         
     def add_customer_message(self, message):
         """Add a customer message to the conversation history"""
-        self.conversation_history.append({"role": "customer", "content": message})
+        self._append(Role.CUSTOMER, message)
         
     def add_system_message(self, message):
         """Add a system/AI message to the conversation history"""
-        self.conversation_history.append({"role": "system", "content": message})
+        self._append(Role.SYSTEM, message)
     
-    def get_formatted_conversation(self):
-        """Get the conversation history formatted as a string"""
-        formatted = ""
-        for msg in self.conversation_history:
-            role = "Customer" if msg["role"] == "customer" else "Support"
-            formatted += f"{role}: {msg['content']}\n\n"
-        return formatted
+    @property
+    def last_activity(self):
+        """Timestamp of the most recent message, or None if there are none"""
+        return self.conversation_history[-1].timestamp if self.conversation_history else None
+    
+    def get_formatted_conversation(self, start=0):
+        """Get the conversation history (from message index ``start``) formatted as a string"""
+        if len(self._offsets) < len(self.conversation_history):
+            # Only the messages added since the last call are formatted
+            new = self.conversation_history[len(self._offsets):]
+            segments = []
+            offset = len(self._transcript)
+            for message in new:
+                self._offsets.append(offset)
+                segment = f"{message.role.label}: {message.content}\n\n"
+                segments.append(segment)
+                offset += len(segment)
+            self._transcript += "".join(segments)
+        if start >= len(self._offsets):
+            return ""
+        return self._transcript[self._offsets[start]:]
     
     def update_processing_results(self, summary=None, actions=None, resolution=None, 
                                  routing=None, eta=None, status=None):
@@ -47,6 +100,41 @@ class ConversationState:
         if status is not None:
             self.status = status
     
+    def get_unsummarized_conversation(self):
+        """Get the messages added since the current summary was produced, formatted as a string"""
+        return self.get_formatted_conversation(self.summarized_message_count)
+    
+    def record_summary_coverage(self, message_count, full):
+        """Record that the current summary covers the first ``message_count`` messages"""
+        self.summarized_message_count = message_count
+        self.incremental_summaries = 0 if full else self.incremental_summaries + 1
+    
+    def to_dict(self):
+        """Serialize the state to plain JSON-compatible data"""
+        return {
+            "messages": [[m.role.value, m.content, m.timestamp] for m in self.conversation_history],
+            "current_summary": self.current_summary,
+            "current_actions": self.current_actions,
+            "current_resolution": self.current_resolution,
+            "current_routing": self.current_routing,
+            "current_eta": self.current_eta,
+            "status": self.status,
+            "summarized_message_count": self.summarized_message_count,
+            "incremental_summaries": self.incremental_summaries,
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a state serialized with to_dict"""
+        state = cls()
+        for role, content, timestamp in data.get("messages", []):
+            state._append(Role(role), content, timestamp)
+        for key in ("current_summary", "current_actions", "current_resolution", "current_routing",
+                    "current_eta", "status", "summarized_message_count", "incremental_summaries"):
+            if key in data:
+                setattr(state, key, data[key])
+        return state
+    
     def reset_turn_state(self):
         """Reset the state for a new turn while preserving conversation history"""
         self.current_summary = None
@@ -54,4 +142,6 @@ class ConversationState:
         self.current_resolution = None
         self.current_routing = None
         self.current_eta = None
+        self.summarized_message_count = 0
+        self.incremental_summaries = 0
         # Don't reset status as it may need to persist between turns
@@ -0,0 +1,67 @@
+# core/embedding_cache.py
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Sequence
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """Queries differing only in case or spacing share one cache entry (the default MiniLM model is uncased)"""
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+class QueryEmbeddingCache:
+    """
+    In-memory LRU cache of query embeddings keyed by normalized text.
+
+    ``embed_many`` embeds every cache miss of a batch in a single forward pass
+    of the model, so batched callers pay for one model call instead of one per query.
+    """
+
+    def __init__(self, embeddings, max_entries: int = 2048):
+        self.embeddings = embeddings
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def embed(self, query: str) -> List[float]:
+        return self.embed_many([query])[0]
+
+    def embed_many(self, queries: Sequence[str]) -> List[List[float]]:
+        keys = [normalize_query(query) for query in queries]
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            for key in keys:
+                vector = self._entries.get(key)
+                if vector is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = vector
+            missing = list(dict.fromkeys(key for key in keys if key not in found))
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            # Outside the lock: concurrent callers may embed the same text twice, which is harmless
+            vectors = self.embeddings.embed_documents(missing)
+            with self._lock:
+                for key, vector in zip(missing, vectors):
+                    vector = list(vector)
+                    found[key] = vector
+                    self._entries[key] = vector
+                    self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return [found[key] for key in keys]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
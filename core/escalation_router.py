@@ -0,0 +1,85 @@
+# core/escalation_router.py
+
+import re
+import threading
+from typing import Callable, Dict, List
+
+NO_ESCALATION = "No escalation needed"
+ESCALATION_KEYWORDS = (
+    "escalate", "escalation", "supervisor", "manager",
+    "tier 2", "tier 3", "specialist", "expert"
+)
+# Bullets and numbering the action extractor puts in front of items
+_BULLET = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s*")
+
+
+def parse_action_items(actions: str) -> List[str]:
+    """Split the action extractor's bullet list into individual items"""
+    items = []
+    for line in actions.splitlines():
+        item = _BULLET.sub("", line).strip()
+        if item:
+            items.append(item)
+    return items
+
+
+def needs_escalation(item: str) -> bool:
+    lowered = item.lower()
+    return any(keyword in lowered for keyword in ESCALATION_KEYWORDS)
+
+
+class TieredEscalationRouter:
+    """
+    Routes escalations with TeamRoutingMap rules first and the LLM router second.
+
+    Each action item that asks for escalation is routed with one bulk rule
+    match; only items no rule matches, or that match with a confidence below
+    ``min_confidence``, are sent to the LLM fallback in a single call.
+    """
+
+    def __init__(self, routing_map, min_confidence: float = 0.6):
+        self.routing_map = routing_map
+        self.min_confidence = min_confidence
+        self.rule_routed = 0
+        self.llm_routed = 0
+        self.llm_calls = 0
+        self._lock = threading.Lock()
+
+    def route(self, actions: str, fallback: Callable[[str], str]) -> str:
+        """
+        Args:
+            actions: Action items as extracted by the action extractor
+            fallback: LLM router, called with a bullet list of the unresolved items
+        """
+        items = [item for item in parse_action_items(actions) if needs_escalation(item)]
+        if not items:
+            return NO_ESCALATION
+
+        routed: Dict[str, str] = {}
+        unresolved = []
+        for item, match in zip(items, self.routing_map.match_bulk(items)):
+            if match.score > 0 and match.confidence >= self.min_confidence:
+                routed[item] = match.team
+            else:
+                unresolved.append(item)
+
+        with self._lock:
+            self.rule_routed += len(routed)
+            self.llm_routed += len(unresolved)
+            self.llm_calls += bool(unresolved)
+
+        teams = set(routed.values())
+        if not unresolved and len(teams) == 1:
+            return teams.pop()
+        parts = [f"- {item}: {team}" for item, team in routed.items()]
+        if unresolved:
+            parts.append(fallback("\n".join(f"- {item}" for item in unresolved)))
+        return "\n".join(parts)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "rule_routed": self.rule_routed,
+                "llm_routed": self.llm_routed,
+                "llm_calls": self.llm_calls,
+            }
@@ -0,0 +1,121 @@
+# core/llm_cache.py
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class LLMResponseCache:
+    """
+    Disk-backed cache of LLM responses.
+
+    Entries are keyed by agent role, model name, temperature and a hash of the
+    full task prompt together with everything else the response depends on
+    (agent definition, knowledge base version). The least recently used entries are evicted once the
+    cache exceeds ``max_entries`` or ``max_bytes``.
+    """
+
+    def __init__(self, path: str = "data/llm_cache.db", max_entries: int = 10000,
+                 max_bytes: int = 256 * 1024 * 1024):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, "
+                "size INTEGER NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)"
+            )
+            self._entries, self._bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+
+    @staticmethod
+    def make_key(role: str, prompt: str, model: Any, temperature: Any, context: str = "") -> str:
+        """
+        Build the cache key for a single LLM task. ``context`` is whatever else
+        shapes the response besides the prompt, e.g. the agent's goal and backstory.
+        """
+        digest = hashlib.sha256()
+        digest.update(context.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(prompt.encode("utf-8"))
+        return f"{role}|{model}|{temperature}|{digest.hexdigest()}"
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for ``key`` or None"""
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key)
+                )
+            return row[0]
+
+    def put(self, key: str, response: str):
+        """Store a response, evicting least recently used entries if over budget"""
+        size = len(response.encode("utf-8"))
+        with self._lock, self._conn:
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if old is not None:
+                self._entries -= 1
+                self._bytes -= old[0]
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, response, size, time.time())
+            )
+            self._entries += 1
+            self._bytes += size
+            self._evict()
+
+    def _evict(self):
+        while self._entries > self.max_entries or self._bytes > self.max_bytes:
+            batch = max(1, self._entries - self.max_entries, self._entries // 100)
+            rows = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_access LIMIT ?", (batch,)
+            ).fetchall()
+            if not rows:
+                break
+            self._conn.executemany("DELETE FROM responses WHERE key = ?", [(key,) for key, _ in rows])
+            self._entries -= len(rows)
+            self._bytes -= sum(size for _, size in rows)
+            self.evictions += len(rows)
+
+    def clear(self):
+        """Remove every cached response"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+            self._entries = 0
+            self._bytes = 0
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current size"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": self._entries,
+            "bytes": self._bytes,
+        }
@@ -0,0 +1,221 @@
+# core/metrics.py
+"""
+In-process metrics with Prometheus text exposition.
+
+Recording is a dict lookup, a bisect and a few additions under a per-metric
+lock, so instrumentation stays on in production. Cache statistics are not
+recorded at all on the hot path: they are read from the caches' own
+``stats()`` when the metrics are scraped.
+"""
+
+import functools
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from core import tracing
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144)
+
+Labels = Tuple[str, ...]
+Sample = Tuple[Dict[str, str], float]
+
+_metrics: List["_Metric"] = []
+_collectors: List[Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]] = []
+_current = threading.local()
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, label_names: Labels = ()):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self._lock = threading.Lock()
+        _metrics.append(self)
+
+    def _labels(self, values: Labels) -> Dict[str, str]:
+        return dict(zip(self.label_names, values))
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        return lines + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, label_names: Labels = ()):
+        super().__init__(name, help, label_names)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self._labels(labels))} {value}" for labels, value in values]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, label_names: Labels = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, label_names)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Labels, list] = {}
+
+    def observe(self, value: float, *labels: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            snapshot = [(labels, list(counts), total, count) for labels, (counts, total, count) in self._series.items()]
+        lines = []
+        for labels, counts, total, count in snapshot:
+            label_dict = self._labels(labels)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += bucket_count
+                le = _format_labels(dict(label_dict, le=str(bound)))
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(label_dict)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(label_dict)} {count}")
+        return lines
+
+
+STAGE_DURATION = Histogram(
+    "support_stage_duration_seconds", "Workflow stage latency", ("stage",))
+STAGE_CALLS = Counter("support_stage_calls_total", "Workflow stage runs", ("stage",))
+STAGE_ERRORS = Counter("support_stage_errors_total", "Workflow stage runs that raised", ("stage",))
+LLM_PROMPT_CHARS = Histogram(
+    "support_llm_prompt_chars", "Size of LLM task prompts in characters", ("stage",), SIZE_BUCKETS)
+LLM_RESPONSE_CHARS = Histogram(
+    "support_llm_response_chars", "Size of LLM responses in characters", ("stage",), SIZE_BUCKETS)
+LLM_CACHE_REQUESTS = Counter(
+    "support_llm_cache_requests_total", "LLM response cache lookups by result", ("stage", "result"))
+RETRIEVAL_DURATION = Histogram(
+    "support_retrieval_duration_seconds", "VectorSearchTool search latency per call", ("backend", "mode"))
+RETRIEVAL_QUERIES = Counter(
+    "support_retrieval_queries_total", "Queries searched by VectorSearchTool", ("backend", "mode"))
+RETRIEVAL_ERRORS = Counter(
+    "support_retrieval_errors_total", "VectorSearchTool searches that raised", ("backend", "mode"))
+RETRIEVAL_SHORTCUTS = Counter(
+    "support_retrieval_exact_match_total", "Hybrid queries answered by exact lexical matches alone")
+
+
+def current_stage() -> str:
+    """Name of the stage running on this thread ('' outside a stage)"""
+    return getattr(_current, "stage", "")
+
+
+def instrument_stage(name: str):
+    """
+    Decorator recording latency, calls and errors of a workflow stage method,
+    and a tracing span when the stage runs inside a traced turn
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            previous = getattr(_current, "stage", "")
+            _current.stage = name
+            start = time.perf_counter()
+            try:
+                with tracing.span(name, "stage"):
+                    return func(*args, **kwargs)
+            except Exception:
+                STAGE_ERRORS.inc(name)
+                raise
+            finally:
+                STAGE_DURATION.observe(time.perf_counter() - start, name)
+                STAGE_CALLS.inc(name)
+                _current.stage = previous
+        return wrapper
+    return decorator
+
+
+def register_collector(collector: Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]):
+    """
+    Add a scrape-time collector yielding ``(name, type, help, samples)`` where
+    samples are ``(labels, value)`` pairs.
+    """
+    _collectors.append(collector)
+
+
+def render() -> str:
+    """All metrics in Prometheus text exposition format"""
+    lines: List[str] = []
+    for metric in list(_metrics):
+        lines += metric.render()
+    for collector in list(_collectors):
+        for name, kind, help, samples in collector():
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+            lines += [f"{name}{_format_labels(labels)} {value}" for labels, value in samples]
+    return "\n".join(lines) + "\n"
+
+
+def _cache_samples():
+    """Hit/miss counters of the shared caches that have been created so far"""
+    from core import registry
+    caches = {
+        "llm_response": registry.peek("llm_cache"),
+        "semantic": registry.peek(("semantic_cache", registry.DEFAULT_PERSIST_DIRECTORY)),
+        "query_embedding": registry.peek(("query_embedding_cache", registry.DEFAULT_EMBEDDING_MODEL)),
+    }
+    samples: Dict[str, List[Sample]] = {"hits": [], "misses": [], "entries": []}
+    for cache_name, cache in caches.items():
+        if cache is None:
+            continue
+        stats = cache.stats()
+        for key in samples:
+            if key in stats:
+                samples[key].append(({"cache": cache_name}, stats[key]))
+    yield "support_cache_hits_total", "counter", "Cache hits", samples["hits"]
+    yield "support_cache_misses_total", "counter", "Cache misses", samples["misses"]
+    yield "support_cache_entries", "gauge", "Entries currently cached", samples["entries"]
+
+    router = registry.peek(("escalation_router", registry.DEFAULT_ROUTING_RULES))
+    if router is not None:
+        stats = router.stats()
+        yield "support_escalation_items_total", "counter", "Escalated action items by routing tier", [
+            ({"tier": "rules"}, stats["rule_routed"]), ({"tier": "llm"}, stats["llm_routed"])
+        ]
+        yield "support_escalation_llm_calls_total", "counter", "LLM escalation router fallbacks", [
+            ({}, stats["llm_calls"])
+        ]
+
+
+register_collector(_cache_samples)
@@ -0,0 +1,323 @@
+# core/registry.py
+"""
+Process-wide registry of expensive, reusable objects.
+
+Loading the embedding model, opening Chroma and building LLM clients costs
+seconds, so every agent, task and tool fetches them from here instead of
+constructing its own. Everything is created lazily on first use.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional
+
+DEFAULT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+DEFAULT_PERSIST_DIRECTORY = "embeddings/chroma_db"
+DEFAULT_FAISS_DIRECTORY = "embeddings/faiss_index"
+DEFAULT_ROUTING_RULES = "data/team_routing_rules.json"
+KB_VERSION_FILE = ".kb_version"
+
+_shared: Dict[Hashable, Any] = {}
+_lock = threading.RLock()
+# One lock per key, so a slow first build (say, the embedding model) only
+# blocks callers of that key
+_key_locks: Dict[Hashable, threading.Lock] = {}
+_local = threading.local()
+_generation = 0
+_task_runner: Optional[Callable[[Any], str]] = None
+
+
+def get_or_create(key: Hashable, factory: Callable[[], Any]) -> Any:
+    """Return the shared object for ``key``, building it with ``factory`` on first use"""
+    try:
+        return _shared[key]
+    except KeyError:
+        pass
+    with _key_lock(key):
+        if key not in _shared:
+            _shared[key] = factory()
+        return _shared[key]
+
+
+def _key_lock(key: Hashable) -> threading.Lock:
+    with _lock:
+        return _key_locks.setdefault(key, threading.Lock())
+
+
+def _get_versioned(key: Hashable, directory: str, factory: Callable[[], Any]) -> Any:
+    """
+    get_or_create for an object built from the knowledge base in ``directory``.
+    It is rebuilt once the knowledge base version changes, which also catches
+    rebuilds done by another process. The entry is stored as ``(version, object)``.
+    """
+    version = knowledge_base_version(directory)
+    entry = _shared.get(key)
+    if entry is None or entry[0] != version:
+        with _key_lock(key):
+            entry = _shared.get(key)
+            if entry is None or entry[0] != version:
+                entry = _shared[key] = (version, factory())
+    return entry[1]
+
+
+def peek(key: Hashable) -> Optional[Any]:
+    """Return the shared object for ``key`` if it has been created, without creating it"""
+    return _shared.get(key)
+
+
+def get_embeddings(model_name: str = DEFAULT_EMBEDDING_MODEL):
+    """Shared HuggingFace sentence embedding model"""
+    def build():
+        from langchain_community.embeddings import HuggingFaceEmbeddings
+        return HuggingFaceEmbeddings(model_name=model_name)
+    return get_or_create(("embeddings", model_name), build)
+
+
+def get_query_embedding_cache(model_name: str = DEFAULT_EMBEDDING_MODEL):
+    """Shared LRU cache of query embeddings, sized with QUERY_EMBEDDING_CACHE_SIZE"""
+    def build():
+        from core.embedding_cache import QueryEmbeddingCache
+        return QueryEmbeddingCache(
+            get_embeddings(model_name),
+            max_entries=int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "2048"))
+        )
+    return get_or_create(("query_embedding_cache", model_name), build)
+
+
+def get_vectorstore(persist_directory: str = DEFAULT_PERSIST_DIRECTORY,
+                    model_name: str = DEFAULT_EMBEDDING_MODEL):
+    """Shared Chroma handle for a persisted vector DB"""
+    def build():
+        from langchain_community.vectorstores import Chroma
+        return Chroma(
+            persist_directory=persist_directory,
+            embedding_function=get_embeddings(model_name)
+        )
+    return get_or_create(("vectorstore", persist_directory, model_name), build)
+
+
+def get_faiss_store(index_directory: str = DEFAULT_FAISS_DIRECTORY):
+    """Shared memory-mapped FAISS index, reopened after every rebuild"""
+    def build():
+        from tools.faiss_index import FaissVectorStore
+        return FaissVectorStore(index_directory)
+    return _get_versioned(("faiss_store", index_directory), index_directory, build)
+
+
+def get_lexical_index(directory: str = DEFAULT_PERSIST_DIRECTORY):
+    """
+    Shared BM25 index saved next to a vector store, or None if it was never
+    built. Reloaded after every rebuild.
+    """
+    def build():
+        from tools.lexical_index import LexicalIndex
+        return LexicalIndex.load(directory)
+    return _get_versioned(("lexical_index", directory), directory, build)
+
+
+def get_llm(model: str = "ollama/mistral", temperature: float = 0.3):
+    """Shared LLM client, one per model/temperature pair"""
+    def build():
+        from langchain_ollama import ChatOllama
+        return ChatOllama(model=model, temperature=temperature)
+    return get_or_create(("llm", model, temperature), build)
+
+
+def get_vector_tool(persist_directory: Optional[str] = None, backend: Optional[str] = None):
+    """
+    Shared VectorSearchTool instance, rebuilt once its knowledge base is rebuilt.
+    Configure with KB_PERSIST_DIRECTORY, VECTOR_BACKEND, RETRIEVAL_MODE, RETRIEVAL_K,
+    RETRIEVAL_DENSE_WEIGHT, RETRIEVAL_LEXICAL_WEIGHT, and the historical ticket
+    filters RETRIEVAL_TICKET_STATUS (default Resolved; empty disables) and
+    RETRIEVAL_TICKET_MAX_AGE_DAYS.
+    """
+    persist_directory = persist_directory or os.getenv("KB_PERSIST_DIRECTORY", DEFAULT_PERSIST_DIRECTORY)
+    backend = backend or os.getenv("VECTOR_BACKEND", "chroma")
+    filters = {
+        "status": os.getenv("RETRIEVAL_TICKET_STATUS", "Resolved"),
+        "max_age_days": os.getenv("RETRIEVAL_TICKET_MAX_AGE_DAYS", ""),
+    }
+    def build():
+        from tools.vector_search_tool import VectorSearchTool
+        return VectorSearchTool(
+            persist_directory=persist_directory,
+            backend=backend,
+            mode=os.getenv("RETRIEVAL_MODE", "hybrid"),
+            k=int(os.getenv("RETRIEVAL_K", "3")),
+            dense_weight=float(os.getenv("RETRIEVAL_DENSE_WEIGHT", "1.0")),
+            lexical_weight=float(os.getenv("RETRIEVAL_LEXICAL_WEIGHT", "1.0")),
+            filters={key: value for key, value in filters.items() if value} or None
+        )
+    index_directory = DEFAULT_FAISS_DIRECTORY if backend == "faiss" else persist_directory
+    return _get_versioned(("vector_tool", persist_directory, backend), index_directory, build)
+
+
+def get_routing_map(rules_path: str = DEFAULT_ROUTING_RULES):
+    """Shared TeamRoutingMap instance"""
+    def build():
+        from tools.team_routing_map import TeamRoutingMap
+        return TeamRoutingMap(rules_path)
+    return get_or_create(("routing_map", rules_path), build)
+
+
+def get_escalation_router(rules_path: str = DEFAULT_ROUTING_RULES):
+    """
+    Shared rules-first escalation router.
+    Items routed with less than ROUTING_MIN_CONFIDENCE go to the LLM router.
+    """
+    def build():
+        from core.escalation_router import TieredEscalationRouter
+        return TieredEscalationRouter(
+            get_routing_map(rules_path),
+            min_confidence=float(os.getenv("ROUTING_MIN_CONFIDENCE", "0.6"))
+        )
+    return get_or_create(("escalation_router", rules_path), build)
+
+
+def get_llm_cache():
+    """
+    Shared persistent LLM response cache, or None unless LLM_CACHE_ENABLED=1.
+    Configure with LLM_CACHE_PATH, LLM_CACHE_MAX_ENTRIES and LLM_CACHE_MAX_BYTES.
+    """
+    if os.getenv("LLM_CACHE_ENABLED", "0").lower() not in ("1", "true", "yes"):
+        return None
+    def build():
+        from core.llm_cache import LLMResponseCache
+        return LLMResponseCache(
+            path=os.getenv("LLM_CACHE_PATH", "data/llm_cache.db"),
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000")),
+            max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+        )
+    return get_or_create("llm_cache", build)
+
+
+def knowledge_base_version(persist_directory: str = DEFAULT_PERSIST_DIRECTORY):
+    """Version marker of the knowledge base (changes whenever it is rebuilt)"""
+    try:
+        return os.path.getmtime(os.path.join(persist_directory, KB_VERSION_FILE))
+    except OSError:
+        return None
+
+
+def notify_knowledge_base_rebuilt(persist_directory: str = DEFAULT_PERSIST_DIRECTORY):
+    """
+    Invalidation hook for knowledge base rebuilds.
+
+    Bumps the on-disk version marker, which other processes pick up, and drops
+    this process's caches derived from the old knowledge base.
+    """
+    os.makedirs(persist_directory, exist_ok=True)
+    with open(os.path.join(persist_directory, KB_VERSION_FILE), "w") as f:
+        f.write(repr(time.time()))
+    with _lock:
+        for key, value in list(_shared.items()):
+            if not isinstance(key, tuple):
+                continue
+            if key[0] == "semantic_cache":
+                value.invalidate()
+            elif key[0] in ("lexical_index", "faiss_store", "vector_tool"):
+                # Reopened with the new files on next access
+                del _shared[key]
+
+
+def get_semantic_cache(persist_directory: str = DEFAULT_PERSIST_DIRECTORY):
+    """
+    Shared near-duplicate cache of first-turn results, or None unless
+    SEMANTIC_CACHE_ENABLED=1. Configure with SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_TTL_SECONDS and SEMANTIC_CACHE_MAX_ENTRIES.
+    """
+    if os.getenv("SEMANTIC_CACHE_ENABLED", "0").lower() not in ("1", "true", "yes"):
+        return None
+    def build():
+        from core.semantic_cache import SemanticCache
+        return SemanticCache(
+            embed=get_query_embedding_cache().embed,
+            threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92")),
+            ttl=float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "86400")),
+            max_entries=int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "10000")),
+            version=lambda: (knowledge_base_version(persist_directory),
+                             knowledge_base_version(DEFAULT_FAISS_DIRECTORY))
+        )
+    return get_or_create(("semantic_cache", persist_directory), build)
+
+
+def get_stage_executor() -> ThreadPoolExecutor:
+    """
+    Shared thread pool for workflow stages.
+
+    Long-lived worker threads let get_agent() reuse per-thread agents across
+    turns. Size it with WORKFLOW_STAGE_WORKERS.
+    """
+    def build():
+        workers = int(os.getenv("WORKFLOW_STAGE_WORKERS", "24"))
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="workflow-stage")
+    return get_or_create("stage_executor", build)
+
+
+def get_pipeline_executor() -> ThreadPoolExecutor:
+    """
+    Shared thread pool that async callers offload whole pipeline runs to.
+
+    Its size (MAX_CONCURRENT_PIPELINES) caps how many conversations are
+    processed at once; further requests queue instead of blocking the event loop.
+    """
+    def build():
+        workers = int(os.getenv("MAX_CONCURRENT_PIPELINES", "8"))
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="workflow-pipeline")
+    return get_or_create("pipeline_executor", build)
+
+
+def _kickoff_crew(task) -> str:
+    from crewai import Crew
+    return str(Crew(tasks=[task], verbose=True).kickoff())
+
+
+def get_task_runner() -> Callable[[Any], str]:
+    """Callable that runs a single CrewAI task and returns its raw output"""
+    return _task_runner or _kickoff_crew
+
+
+def set_task_runner(runner: Optional[Callable[[Any], str]]):
+    """
+    Replace how tasks are executed, e.g. with a stub LLM for offline
+    benchmarks. ``None`` restores CrewAI. Survives clear().
+    """
+    global _task_runner
+    _task_runner = runner
+
+
+def get_agent(name: str, factory: Callable[[], Any], version: Any = None) -> Any:
+    """
+    Reusable CrewAI agent definition.
+
+    CrewAI agents keep per-execution state while a task runs, so agents are
+    cached per thread rather than shared: workflow stages running in parallel
+    each get their own copy, and a worker thread reuses its copy across turns.
+    The agent is rebuilt when ``version`` differs from the one it was built
+    with, e.g. when the shared tool it holds has been replaced.
+    """
+    agents = getattr(_local, "agents", None)
+    if agents is None or _local.generation != _generation:
+        agents = _local.agents = {}
+        _local.generation = _generation
+    entry = agents.get(name)
+    if entry is None or entry[0] != version:
+        entry = agents[name] = (version, factory())
+    return entry[1]
+
+
+def clear():
+    """Release and drop every cached object (the next access rebuilds it)"""
+    global _generation
+    with _lock:
+        for key in ("stage_executor", "pipeline_executor"):
+            executor = _shared.get(key)
+            if executor is not None:
+                executor.shutdown(wait=False)
+        llm_cache = _shared.get("llm_cache")
+        if llm_cache is not None:
+            llm_cache.close()
+        _shared.clear()
+        _generation += 1
@@ -0,0 +1,160 @@
+# core/semantic_cache.py
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from core.embedding_cache import normalize_query
+
+try:
+    import faiss
+except ImportError:  # fall back to exact search
+    faiss = None
+
+
+class SemanticCache:
+    """
+    Near-duplicate cache of first-turn workflow results.
+
+    Messages are embedded and stored in an approximate nearest-neighbour index
+    (FAISS HNSW over normalised vectors, so inner product is cosine
+    similarity). A lookup returns the cached result of the most similar prior
+    message if it scores above ``threshold`` and is younger than ``ttl``.
+    HNSW does not support removal, so expired entries are tombstoned and the
+    index is rebuilt once they make up half of it.
+    """
+
+    def __init__(self, embed: Callable[[str], List[float]], threshold: float = 0.92,
+                 ttl: float = 86400, max_entries: int = 10000, neighbours: int = 5,
+                 version: Optional[Callable[[], Any]] = None):
+        """
+        Args:
+            embed: Function embedding a single text (e.g. ``embed`` of the shared query embedding cache)
+            threshold: Minimum cosine similarity for a hit
+            ttl: Seconds a cached result stays valid
+            max_entries: Oldest entries are dropped beyond this size
+            neighbours: Candidates inspected per lookup
+            version: Optional callable returning the knowledge base version;
+                the cache is cleared whenever it changes
+        """
+        self.embed = embed
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.neighbours = neighbours
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._known_version = version() if version else None
+        self._reset()
+
+    def _reset(self):
+        self._index = None
+        self._vectors: List[np.ndarray] = []
+        self._entries: List[Optional[Dict[str, Any]]] = []
+        self._created: List[float] = []
+        self._dead = 0
+        # Entries before this position are all tombstoned
+        self._head = 0
+
+    def _embed(self, message: str) -> np.ndarray:
+        vector = np.asarray(self.embed(normalize_query(message)), dtype="float32")
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector = vector / norm
+        return vector
+
+    def _check_version(self):
+        if self.version is None:
+            return
+        current = self.version()
+        if current != self._known_version:
+            self._known_version = current
+            self._reset()
+
+    def _build_index(self, dim: int):
+        if faiss is None:
+            self._index = None
+            return
+        self._index = faiss.IndexHNSWFlat(dim, 32, faiss.METRIC_INNER_PRODUCT)
+        if self._vectors:
+            self._index.add(np.vstack(self._vectors))
+
+    def _search(self, vector: np.ndarray):
+        """Return ``(similarity, position)`` pairs for the nearest stored messages"""
+        if not self._vectors:
+            return []
+        if self._index is None:
+            scores = np.vstack(self._vectors) @ vector
+            top = np.argsort(-scores)[:self.neighbours]
+            return [(float(scores[i]), int(i)) for i in top]
+        scores, positions = self._index.search(vector.reshape(1, -1), self.neighbours)
+        return [(float(s), int(p)) for s, p in zip(scores[0], positions[0]) if p >= 0]
+
+    def lookup(self, message: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached result for a near-identical message, or None"""
+        vector = self._embed(message)
+        now = time.time()
+        with self._lock:
+            self._check_version()
+            for similarity, position in self._search(vector):
+                entry = self._entries[position]
+                if entry is None or similarity < self.threshold:
+                    continue
+                if now - self._created[position] > self.ttl:
+                    self._entries[position] = None
+                    self._dead += 1
+                    continue
+                self.hits += 1
+                return dict(entry)
+            self.misses += 1
+            return None
+
+    def add(self, message: str, result: Dict[str, Any]):
+        """Cache the workflow result for a first-turn message"""
+        vector = self._embed(message)
+        with self._lock:
+            self._check_version()
+            self._vectors.append(vector)
+            self._entries.append(dict(result))
+            self._created.append(time.time())
+            if faiss is not None and self._index is None:
+                self._build_index(vector.shape[0])
+            elif self._index is not None:
+                self._index.add(vector.reshape(1, -1))
+            if len(self._entries) - self._dead > self.max_entries:
+                self._expire_oldest()
+            if self._dead * 2 > len(self._entries):
+                self._compact()
+
+    def _expire_oldest(self):
+        while self._entries[self._head] is None:
+            self._head += 1
+        self._entries[self._head] = None
+        self._dead += 1
+        self._head += 1
+
+    def _compact(self):
+        now = time.time()
+        keep = [
+            i for i, entry in enumerate(self._entries)
+            if entry is not None and now - self._created[i] <= self.ttl
+        ]
+        vectors = [self._vectors[i] for i in keep]
+        entries = [self._entries[i] for i in keep]
+        created = [self._created[i] for i in keep]
+        self._reset()
+        self._vectors, self._entries, self._created = vectors, entries, created
+        if vectors:
+            self._build_index(vectors[0].shape[0])
+
+    def invalidate(self):
+        """Drop every cached result (e.g. after the knowledge base is rebuilt)"""
+        with self._lock:
+            self._reset()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries) - self._dead}
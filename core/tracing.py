@@ -0,0 +1,223 @@
+# core/tracing.py
+"""
+Lightweight per-turn tracing.
+
+Each customer turn records a span tree (stages, LLM calls, tool calls,
+retrieval). Finished traces go into a bounded ring buffer and can be exported
+in the Chrome trace event format, which chrome://tracing and Perfetto open.
+
+The current span lives in a context variable, so code running on another
+thread joins the turn's trace when it is started with
+``contextvars.copy_context().run``. Outside a trace, ``span()`` is a no-op.
+
+Configure with TRACING_ENABLED, TRACE_BUFFER_SIZE and TRACE_EXPORT_PATH (a
+file every finished trace is appended to).
+"""
+
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+_ids = itertools.count(1)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class _NullSpan:
+    """Stand-in used when no trace is active"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attributes):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "start", "duration",
+                 "attributes", "thread", "_t0", "_token")
+
+    def __init__(self, trace: "Trace", parent_id: Optional[int], name: str, kind: str, attributes: dict):
+        self.trace = trace
+        self.span_id = next(_ids)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.start = 0.0
+        self.duration = 0.0
+        self.thread = 0
+        self._t0 = 0.0
+        self._token = None
+
+    def __enter__(self):
+        self.start = time.time()
+        self.thread = threading.get_ident()
+        self._t0 = time.perf_counter()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self._t0
+        if exc is not None:
+            self.attributes["error"] = repr(exc)
+        _current_span.reset(self._token)
+        self.trace._finish(self)
+        return False
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "span_id": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start": self.start,
+            "duration": self.duration,
+            "attributes": self.attributes,
+        }
+
+
+class Trace:
+    def __init__(self, name: str, conversation_id: Optional[str] = None):
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.conversation_id = conversation_id
+        self.spans: List[Span] = []
+        self.root: Optional[Span] = None
+        self._lock = threading.Lock()
+
+    def _finish(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+        if span is self.root:
+            _buffer.append(self)
+            if _export_path:
+                _append_chrome_events(_export_path, self)
+
+    @property
+    def duration(self) -> float:
+        return self.root.duration if self.root is not None else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The trace as a nested span tree"""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start)
+        nodes = {span.span_id: dict(span.to_dict(), children=[]) for span in spans}
+        roots = []
+        for span in spans:
+            parent = nodes.get(span.parent_id)
+            (parent["children"] if parent is not None else roots).append(nodes[span.span_id])
+        return {
+            "trace_id": self.trace_id,
+            "conversation_id": self.conversation_id,
+            "name": self.name,
+            "start": self.root.start if self.root is not None else None,
+            "duration": self.duration,
+            "spans": roots,
+        }
+
+    def chrome_events(self) -> List[Dict[str, Any]]:
+        """Complete ('X') events of the Chrome trace event format"""
+        with self._lock:
+            spans = list(self.spans)
+        pid = os.getpid()
+        return [
+            {
+                "name": span.name,
+                "cat": span.kind,
+                "ph": "X",
+                "ts": span.start * 1e6,
+                "dur": span.duration * 1e6,
+                "pid": pid,
+                "tid": span.thread,
+                "args": dict(span.attributes, trace_id=self.trace_id,
+                             conversation_id=self.conversation_id),
+            }
+            for span in spans
+        ]
+
+
+class TraceBuffer:
+    """Bounded ring buffer of recently finished traces"""
+
+    def __init__(self, capacity: int = 512):
+        self._traces: deque = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def append(self, trace: Trace):
+        with self._lock:
+            self._traces.append(trace)
+
+    def recent(self, conversation_id: Optional[str] = None, limit: Optional[int] = None) -> List[Trace]:
+        """Most recent traces first, optionally for one conversation only"""
+        with self._lock:
+            traces = list(self._traces)
+        traces = [t for t in reversed(traces) if conversation_id is None or t.conversation_id == conversation_id]
+        return traces[:limit] if limit else traces
+
+    def clear(self):
+        with self._lock:
+            self._traces.clear()
+
+
+_enabled = os.getenv("TRACING_ENABLED", "1").lower() not in ("0", "false", "no")
+_buffer = TraceBuffer(int(os.getenv("TRACE_BUFFER_SIZE", "512")))
+_export_path = os.getenv("TRACE_EXPORT_PATH")
+_export_lock = threading.Lock()
+
+
+def start_trace(name: str, conversation_id: Optional[str] = None, **attributes):
+    """Start a new trace; use as a context manager around one turn"""
+    if not _enabled:
+        return _NULL_SPAN
+    trace = Trace(name, conversation_id)
+    trace.root = Span(trace, None, name, "turn", attributes)
+    return trace.root
+
+
+def span(name: str, kind: str = "internal", **attributes):
+    """Child span of the current span, or a no-op outside a trace"""
+    parent = _current_span.get()
+    if parent is None:
+        return _NULL_SPAN
+    return Span(parent.trace, parent.span_id, name, kind, attributes)
+
+
+def recent_traces(conversation_id: Optional[str] = None, limit: Optional[int] = None) -> List[Trace]:
+    return _buffer.recent(conversation_id, limit)
+
+
+def _append_chrome_events(path: str, trace: Trace):
+    """
+    Append to a file in the JSON array form of the Chrome trace format, where
+    the closing bracket is optional, so the file stays valid while it grows
+    """
+    lines = "".join(json.dumps(event, default=str) + ",\n" for event in trace.chrome_events())
+    with _export_lock:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        with open(path, "a", encoding="utf-8") as f:
+            if new_file:
+                f.write("[\n")
+            f.write(lines)
+
+
+def export_chrome_trace(path: str, traces: List[Trace]):
+    """Write traces to ``path`` as a complete Chrome trace JSON file"""
+    events = [event for trace in traces for event in trace.chrome_events()]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, default=str)
@@ -1,9 +1,12 @@
 # core/workflow_manager.py
 
+import contextvars
 import json
-from typing import Dict, Any, Optional
-from crewai import Crew
+import os
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Dict, Any, Optional, Callable, Tuple, List
 
+from core import cassette, metrics, registry, tracing
 from core.conversation_state import ConversationState
 from tasks.summarizer_task import SummarizerTask
 from tasks.extractor_task import ActionExtractorTask
@@ -11,57 +14,128 @@ from tasks.resolver_task import ResolutionFinderTask
 from tasks.router_task import EscalationRouterTask
 from tasks.estimator_task import TimeEstimatorTask
 from tasks.dispatcher_task import DispatcherTask
+from tools.vector_search_tool import merge_passages
+
+
+# Stage results that are mirrored into ConversationState.update_processing_results
+STATE_FIELDS = ("summary", "actions", "resolution", "eta", "routing")
+
+
+class Stage:
+    """A single node of the workflow dependency graph"""
+
+    def __init__(self, name: str, deps: Tuple[str, ...], run: Callable[[Dict[str, Any]], Any]):
+        self.name = name
+        self.deps = deps
+        self.run = run
 
 
 class WorkflowManager:
     """
     Manages the execution of the customer support workflow.
     Handles the orchestration of tasks, error handling, and conditional paths.
+
+    Stages are scheduled as soon as their inputs are ready, so independent
+    stages (resolution, ETA and escalation routing) run concurrently. Pass
+    ``sequential=True`` or set ``WORKFLOW_SEQUENTIAL=1`` to run them one after
+    the other for debugging.
+
+    The summary is maintained incrementally: each turn the summarizer gets the
+    previous summary plus only the new messages, and the full transcript is
+    re-summarized every ``full_summary_every`` turns (``SUMMARY_FULL_EVERY``,
+    default 5; 1 disables incremental summaries).
+
+    With ``resolution_retrieval="context"`` (``RESOLUTION_RETRIEVAL``, the
+    default) the workflow retrieves knowledge base passages for the summary and
+    action items itself and injects them into the resolution task, so that step
+    is a single LLM call. ``"tool"`` lets the agent call VectorSearchTool instead.
+    In context mode a speculative search on the raw customer message starts with
+    the summarizer (``SPECULATIVE_RETRIEVAL``, default on): on a first turn its
+    hits are used as is, on follow-up turns they are merged with the
+    summary-based search.
+
+    With ``CASSETTE_DIR`` set, every turn's LLM and retrieval calls are recorded
+    into a cassette in that directory (see core.cassette) for deterministic replay.
     """
     
-    def __init__(self):
+    def __init__(self, sequential: Optional[bool] = None, full_summary_every: Optional[int] = None,
+                 resolution_retrieval: Optional[str] = None):
         self.state = ConversationState()
+        if sequential is None:
+            sequential = os.getenv("WORKFLOW_SEQUENTIAL", "").lower() in ("1", "true", "yes")
+        self.sequential = sequential
+        if full_summary_every is None:
+            full_summary_every = int(os.getenv("SUMMARY_FULL_EVERY", "5"))
+        self.full_summary_every = max(1, full_summary_every)
+        resolution_retrieval = resolution_retrieval or os.getenv("RESOLUTION_RETRIEVAL", "context")
+        if resolution_retrieval not in ("context", "tool"):
+            raise ValueError(f"Unknown resolution retrieval mode: {resolution_retrieval}")
+        self.resolution_retrieval = resolution_retrieval
+        self.context_passages = int(os.getenv("RESOLUTION_CONTEXT_PASSAGES", "5"))
+        self.context_chars = int(os.getenv("RESOLUTION_CONTEXT_CHARS", "4000"))
+        self.speculative_retrieval = (
+            resolution_retrieval == "context"
+            and os.getenv("SPECULATIVE_RETRIEVAL", "1").lower() not in ("0", "false", "no")
+        )
+        self.cassette_dir = os.getenv("CASSETTE_DIR") or None
     
-    def process_customer_message(self, message: str) -> Dict[str, Any]:
+    def process_customer_message(
+        self,
+        message: str,
+        on_stage: Optional[Callable[[str, Any], None]] = None
+    ) -> Dict[str, Any]:
         """
         Process a new customer message through the support workflow.
         
         Args:
             message: The customer's message
+            on_stage: Optional callback invoked as ``on_stage(name, result)`` as
+                soon as each of the summary, actions, resolution, eta and routing
+                stages completes. It may be called from a worker thread.
             
         Returns:
             Dict containing the response and status
         """
+        if self.cassette_dir is None or cassette.active() is not None:
+            return self._process_turn(message, on_stage)
+        
+        state = self.state.to_dict()
+        with cassette.recording() as tape:
+            result = self._process_turn(message, on_stage)
+        tape.turn = {"message": message, "state": state, "config": self.config(), "result": result}
+        try:
+            tape.save(cassette.cassette_path(self.cassette_dir))
+        except OSError as e:
+            print(f"⚠️ Could not save cassette: {e}")
+        return result
+    
+    def config(self) -> Dict[str, Any]:
+        """Settings that change which calls a turn makes, recorded with cassettes"""
+        return {
+            "full_summary_every": self.full_summary_every,
+            "resolution_retrieval": self.resolution_retrieval,
+            "speculative_retrieval": self.speculative_retrieval,
+            "context_passages": self.context_passages,
+            "context_chars": self.context_chars,
+        }
+    
+    def _process_turn(
+        self,
+        message: str,
+        on_stage: Optional[Callable[[str, Any], None]] = None
+    ) -> Dict[str, Any]:
+        """Run the stages for one customer message and update the conversation state"""
         # Update conversation state
         self.state.add_customer_message(message)
         
         try:
-            # Step 1: Summarize the conversation
-            summary = self._run_summarizer()
-            self.state.update_processing_results(summary=summary)
-            
-            # Step 2: Extract actions from summary
-            actions = self._run_action_extractor(summary)
-            self.state.update_processing_results(actions=actions)
-            
-            # Step 3: Find resolution
-            resolution = self._run_resolution_finder(summary, actions)
-            self.state.update_processing_results(resolution=resolution)
-            
-            # Step 4: Estimate time to resolve
-            eta = self._run_time_estimator(summary, actions)
-            self.state.update_processing_results(eta=eta)
-            
-            # Step 5: Check if escalation is needed based on actions
-            if self._needs_escalation(actions):
-                routing = self._run_escalation_router(actions)
-                self.state.update_processing_results(routing=routing)
-            else:
-                routing = "No escalation needed"
-                self.state.update_processing_results(routing=routing)
-            
-            # Step 6: Generate final response
-            response = self._run_dispatcher(summary, actions, resolution, routing, eta)
+            results = self._execute_stages(self._build_stages(message), on_stage)
+            summary = results["summary"]
+            actions = results["actions"]
+            resolution = results["resolution"]
+            eta = results["eta"]
+            routing = results["routing"]
+            response = results["response"]
             
             # Parse the response
             parsed_response = self._parse_agent_output(response)
@@ -91,6 +165,191 @@ class WorkflowManager:
                 "error": error_msg
             }
     
+    def apply_cached_result(
+        self,
+        message: str,
+        result: Dict[str, Any],
+        on_stage: Optional[Callable[[str, Any], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Record a turn whose result was served from a cache instead of running the stages.
+        Conversation state ends up as if the result had just been computed.
+        """
+        self.state.add_customer_message(message)
+        self.state.update_processing_results(**{name: result.get(name) for name in STATE_FIELDS})
+        self.state.record_summary_coverage(len(self.state.conversation_history), full=True)
+        if on_stage is not None:
+            for name in STATE_FIELDS:
+                on_stage(name, result.get(name))
+        self.state.update_processing_results(status=result["status"])
+        self.state.add_system_message(result["reply"])
+        return result
+    
+    def _build_stages(self, message: str) -> List[Stage]:
+        """
+        Describe the workflow as a dependency graph.
+        The list order is the canonical (sequential) execution order.
+        """
+        stages = [
+            # Step 1: Summarize the conversation
+            Stage("summary", (), lambda r: self._run_summarizer()),
+            # Step 2: Extract actions from summary
+            Stage("actions", ("summary",), lambda r: self._run_action_extractor(r["summary"])),
+            # Step 3: Find resolution
+            Stage("resolution", ("summary", "actions", "retrieval"),
+                  lambda r: self._run_resolution_finder(r["summary"], r["actions"], r["retrieval"])),
+            # Step 4: Estimate time to resolve
+            Stage("eta", ("summary", "actions"),
+                  lambda r: self._run_time_estimator(r["summary"], r["actions"])),
+            # Step 5: Check if escalation is needed based on actions
+            Stage("routing", ("actions",), lambda r: self._run_routing(r["actions"])),
+            # Step 6: Generate final response
+            Stage("response", ("summary", "actions", "resolution", "routing", "eta"),
+                  lambda r: self._run_dispatcher(
+                      r["summary"], r["actions"], r["resolution"], r["routing"], r["eta"]
+                  )),
+        ]
+        if self.speculative_retrieval:
+            # Step 0: Search on the raw message while the summarizer runs, off the critical path
+            stages.insert(0, Stage("retrieval", (), lambda r: self._run_speculative_retrieval(message)))
+        else:
+            stages.insert(0, Stage("retrieval", (), lambda r: None))
+        return stages
+    
+    def _execute_stages(
+        self,
+        stages: List[Stage],
+        on_stage: Optional[Callable[[str, Any], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Run the stages and return their results keyed by stage name.
+        
+        State updates are committed in canonical stage order regardless of the
+        order in which stages finish, so the ConversationState bookkeeping is
+        identical to the sequential path. When a stage fails, the stages before
+        it in canonical order still run to completion and are committed, and the
+        earliest failure in that order is raised, as the sequential path would.
+        """
+        results: Dict[str, Any] = {}
+        committed = 0
+        
+        def completed(name, value):
+            results[name] = value
+            if on_stage is not None and name in STATE_FIELDS:
+                on_stage(name, value)
+        
+        def commit():
+            nonlocal committed
+            while committed < len(stages) and stages[committed].name in results:
+                name = stages[committed].name
+                if name in STATE_FIELDS:
+                    self.state.update_processing_results(**{name: results[name]})
+                committed += 1
+        
+        if self.sequential:
+            for stage in stages:
+                completed(stage.name, stage.run(results))
+                commit()
+            return results
+        
+        executor = registry.get_stage_executor()
+        position = {stage.name: i for i, stage in enumerate(stages)}
+        pending = list(stages)
+        running = {}
+        failures: Dict[str, Exception] = {}
+        try:
+            while True:
+                # After a failure only the stages the sequential path would still
+                # have run before it (earlier in canonical order) are finished
+                cutoff = min((position[name] for name in failures), default=len(stages))
+                pending = [s for s in pending if position[s.name] < cutoff]
+                for stage in [s for s in pending if all(d in results for d in s.deps)]:
+                    pending.remove(stage)
+                    # Run in a copy of this context so the stage joins the turn's trace
+                    future = executor.submit(contextvars.copy_context().run, stage.run, dict(results))
+                    running[future] = stage
+                waiting = [future for future, stage in running.items() if position[stage.name] < cutoff]
+                if not waiting:
+                    if pending and not failures:
+                        missing = ", ".join(s.name for s in pending)
+                        raise RuntimeError(f"Unsatisfiable workflow stage dependencies: {missing}")
+                    break
+                done, _ = wait(waiting, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    try:
+                        value = future.result()
+                    except Exception as e:
+                        failures[stage.name] = e
+                        continue
+                    completed(stage.name, value)
+                commit()
+        finally:
+            for future in running:
+                future.cancel()
+        if failures:
+            # The error the sequential path would have raised
+            raise failures[min(failures, key=position.get)]
+        return results
+    
+    def _kickoff(self, task) -> str:
+        """
+        Run a single task through a Crew, serving repeated prompts from the LLM response cache.
+        """
+        stage = metrics.current_stage()
+        prompt = f"{task.description}\n\n{task.expected_output}"
+        metrics.LLM_PROMPT_CHARS.observe(len(prompt), stage)
+        agent = task.agent
+        with tracing.span("llm", "llm", agent=agent.role, prompt_chars=len(prompt)) as span:
+            # Cassettes must see every call, so the response cache is bypassed while one is active
+            cache = registry.get_llm_cache() if cassette.active() is None else None
+            if cache is None:
+                response = cassette.llm_call(task, registry.get_task_runner())
+                metrics.LLM_RESPONSE_CHARS.observe(len(response), stage)
+                span.set(response_chars=len(response))
+                return response
+            
+            llm = getattr(agent, "llm", None)
+            key = cache.make_key(
+                agent.role,
+                prompt,
+                getattr(llm, "model", None),
+                getattr(llm, "temperature", None),
+                self._cache_context(agent)
+            )
+            cached = cache.get(key)
+            span.set(cache_hit=cached is not None)
+            if cached is not None:
+                metrics.LLM_CACHE_REQUESTS.inc(stage, "hit")
+                return cached
+            metrics.LLM_CACHE_REQUESTS.inc(stage, "miss")
+            
+            response = cassette.llm_call(task, registry.get_task_runner())
+            metrics.LLM_RESPONSE_CHARS.observe(len(response), stage)
+            span.set(response_chars=len(response))
+            cache.put(key, response)
+            return response
+    
+    @staticmethod
+    def _cache_context(agent) -> str:
+        """
+        The parts of an agent that shape its answer besides the task prompt.
+        Agents with tools read the knowledge base themselves, so their answers
+        also depend on its version.
+        """
+        tools = [getattr(tool, "name", str(tool)) for tool in getattr(agent, "tools", None) or []]
+        context = {
+            "goal": getattr(agent, "goal", None),
+            "backstory": getattr(agent, "backstory", None),
+            "tools": tools,
+        }
+        if tools:
+            context["knowledge_base"] = [
+                registry.knowledge_base_version(os.getenv("KB_PERSIST_DIRECTORY", registry.DEFAULT_PERSIST_DIRECTORY)),
+                registry.knowledge_base_version(registry.DEFAULT_FAISS_DIRECTORY),
+            ]
+        return json.dumps(context, sort_keys=True, default=str)
+    
     def _parse_agent_output(self, output: str) -> Dict[str, Any]:
         """Safely parse agent output to extract structured data"""
         if not output:
@@ -114,45 +373,91 @@ class WorkflowManager:
         
         return {"reply": output, "status": "continue"}
     
-    def _needs_escalation(self, actions: str) -> bool:
-        """Determine if the actions require escalation"""
-        escalation_keywords = [
-            "escalate", "escalation", "supervisor", "manager", 
-            "tier 2", "tier 3", "specialist", "expert"
-        ]
-        
-        return any(keyword in actions.lower() for keyword in escalation_keywords)
+    @metrics.instrument_stage("routing")
+    def _run_routing(self, actions: str) -> str:
+        """
+        Route the action items that require escalation: by routing rules where
+        they match confidently, by the LLM escalation router otherwise
+        """
+        return registry.get_escalation_router().route(actions, fallback=self._run_escalation_router)
     
+    @metrics.instrument_stage("summary")
     def _run_summarizer(self) -> str:
-        """Run the summarizer task"""
-        task = SummarizerTask(self.state.get_formatted_conversation()).build()
-        crew = Crew(tasks=[task], verbose=True)
-        return crew.kickoff()
+        """Run the summarizer task, incrementally unless a full checkpoint is due"""
+        message_count = len(self.state.conversation_history)
+        full = (
+            not self.state.current_summary
+            or self.state.incremental_summaries + 1 >= self.full_summary_every
+        )
+        if full:
+            task = SummarizerTask(self.state.get_formatted_conversation()).build()
+        else:
+            task = SummarizerTask(
+                self.state.get_unsummarized_conversation(),
+                previous_summary=self.state.current_summary
+            ).build()
+        summary = self._kickoff(task)
+        self.state.record_summary_coverage(message_count, full)
+        return summary
     
+    @metrics.instrument_stage("actions")
     def _run_action_extractor(self, summary: str) -> str:
         """Run the action extractor task"""
         task = ActionExtractorTask(summary).build()
-        crew = Crew(tasks=[task], verbose=True)
-        return crew.kickoff()
+        return self._kickoff(task)
+    
+    @metrics.instrument_stage("speculative_retrieval")
+    def _run_speculative_retrieval(self, message: str) -> Optional[List[Any]]:
+        """Search the knowledge base for the latest customer message"""
+        try:
+            return cassette.tool_call(
+                "VectorSearchTool.search", [message], lambda: registry.get_vector_tool().search(message)
+            )
+        except Exception:
+            # Only a head start: the resolution step searches on its own without it
+            return None
+    
+    def _retrieve_context(self, summary: str, actions: str, speculative: Optional[List[Any]] = None) -> str:
+        """
+        Retrieve, dedup and trim knowledge base passages for the resolution task.
+        On a first turn the raw message is the whole conversation, so speculative
+        hits are used on their own; later they are merged with the summary-based search.
+        """
+        if speculative and len(self.state.conversation_history) == 1:
+            rankings = [speculative]
+        else:
+            queries = [summary, actions]
+            rankings = cassette.tool_call(
+                "VectorSearchTool.search_many", [queries], lambda: registry.get_vector_tool().search_many(queries)
+            )
+            if speculative:
+                rankings.append(speculative)
+        passages = merge_passages(rankings, self.context_passages, self.context_chars)
+        return "\n\n".join(f"[{i}] {passage}" for i, passage in enumerate(passages, start=1))
     
-    def _run_resolution_finder(self, summary: str, actions: str) -> str:
+    @metrics.instrument_stage("resolution")
+    def _run_resolution_finder(self, summary: str, actions: str, speculative: Optional[List[Any]] = None) -> str:
         """Run the resolution finder task"""
-        task = ResolutionFinderTask(summary=summary, actions=actions).build()
-        crew = Crew(tasks=[task], verbose=True)
-        return crew.kickoff()
+        if self.resolution_retrieval == "tool":
+            task = ResolutionFinderTask(summary=summary, actions=actions).build()
+        else:
+            context = self._retrieve_context(summary, actions, speculative)
+            task = ResolutionFinderTask(summary=summary, actions=actions, context=context).build()
+        return self._kickoff(task)
     
+    @metrics.instrument_stage("eta")
     def _run_time_estimator(self, summary: str, actions: str) -> str:
         """Run the time estimator task"""
         task = TimeEstimatorTask(summary=summary, actions=actions).build()
-        crew = Crew(tasks=[task], verbose=True)
-        return crew.kickoff()
+        return self._kickoff(task)
     
+    @metrics.instrument_stage("escalation_router")
     def _run_escalation_router(self, actions: str) -> str:
         """Run the escalation router task"""
         task = EscalationRouterTask(actions=actions).build()
-        crew = Crew(tasks=[task], verbose=True)
-        return crew.kickoff()
+        return self._kickoff(task)
     
+    @metrics.instrument_stage("response")
     def _run_dispatcher(self, summary: str, actions: str, resolution: str, routing: str, eta: str) -> str:
         """Run the dispatcher task"""
         task = DispatcherTask(
@@ -162,5 +467,4 @@ class WorkflowManager:
             routing=routing,
             eta=eta
         ).build()
-        crew = Crew(tasks=[task], verbose=True)
-        return crew.kickoff()
+        return self._kickoff(task)
@@ -45,7 +45,8 @@ Examples:
     # Set up debug mode if requested
     if args.debug:
         print("🐛 Debug mode enabled")
-        # You could set up logging configuration here
+        # Run workflow stages one after the other so output is easier to follow
+        os.environ["WORKFLOW_SEQUENTIAL"] = "1"
     
     # Run in the selected mode
     if args.interactive:
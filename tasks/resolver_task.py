@@ -1,22 +1,39 @@
 # tasks/resolver_task.py
 
+from typing import Optional
 from crewai import Task
 from agents.resolution_finder_agent import ResolutionFinderAgent
 
 class ResolutionFinderTask:
-    def __init__(self, summary: str, actions: str):
-        self.agent = ResolutionFinderAgent().get()
+    def __init__(self, summary: str, actions: str, context: Optional[str] = None):
+        """
+        Args:
+            summary: Conversation summary
+            actions: Extracted action items
+            context: Knowledge base passages retrieved by the workflow. When given,
+                they are injected into the prompt and the agent gets no search tool,
+                so the task is answered with a single LLM call.
+        """
+        self.agent = ResolutionFinderAgent(use_tools=context is None).get()
         self.summary = summary
         self.actions = actions
+        self.context = context
 
     def build(self):
+        description = (
+            "Based on the following customer issue summary and extracted action items, "
+            "identify the most likely resolution using prior knowledge, documentation, or historical cases.\n\n"
+            f"Summary:\n{self.summary}\n\n"
+            f"Actions:\n{self.actions}"
+        )
+        if self.context is not None:
+            description += (
+                "\n\nRelevant passages from the knowledge base and historical tickets "
+                "(base your resolution on these where they apply):\n"
+                f"{self.context or '[No relevant passages found]'}"
+            )
         return Task(
-            description=(
-                "Based on the following customer issue summary and extracted action items, "
-                "identify the most likely resolution using prior knowledge, documentation, or historical cases.\n\n"
-                f"Summary:\n{self.summary}\n\n"
-                f"Actions:\n{self.actions}"
-            ),
+            description=description,
             expected_output=(
                 "A well-structured resolution suggestion that support agents can use directly. "
                 "Include links or documentation references if relevant."
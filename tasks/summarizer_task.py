@@ -1,14 +1,38 @@
 # tasks/summarizer_task.py
 
+from typing import Optional
 from crewai import Task
 from agents.summarizer_agent import SummarizerAgent
 
 class SummarizerTask:
-    def __init__(self, input_conversation: str):
+    def __init__(self, input_conversation: str, previous_summary: Optional[str] = None):
+        """
+        Args:
+            input_conversation: The conversation to summarize. When
+                ``previous_summary`` is given, only the messages added since it.
+            previous_summary: Running summary to update incrementally
+        """
         self.agent = SummarizerAgent().get()
         self.input_conversation = input_conversation
+        self.previous_summary = previous_summary
 
     def build(self):
+        if self.previous_summary:
+            return Task(
+                description=(
+                    "Update the running summary of a customer support conversation with the new messages below. "
+                    "Keep the main issue and important context (e.g. account details, technical specs) from the "
+                    "previous summary, and fold in any new details, troubleshooting progress, or change in what "
+                    "the customer needs help with:\n\n"
+                    f"Previous summary:\n{self.previous_summary}\n\n"
+                    f"New messages:\n{self.input_conversation}"
+                ),
+                expected_output=(
+                    "A short summary (3-5 sentences max) capturing the customer's main issue, "
+                    "relevant details, and tone of the conversation (urgent, confused, angry, etc.)."
+                ),
+                agent=self.agent
+            )
         return Task(
             description=(
                 "Summarize the following customer support conversation. Extract the main issue, "
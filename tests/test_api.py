@@ -0,0 +1,122 @@
+# tests/test_api.py
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+import pytest
+
+os.environ.setdefault("CONVERSATION_DB", os.path.join(tempfile.mkdtemp(), "conversations.db"))
+
+from fastapi.testclient import TestClient
+
+from api.dependencies import conversation_store
+from api.main import app
+from core import registry
+from workflows.support_workflow import SupportWorkflow
+
+
+class _NoEmbeddings:
+    max_entries = 2048
+
+    def __init__(self):
+        self.calls = []
+
+    def embed_many(self, texts):
+        self.calls.append(list(texts))
+        return [[0.0] for _ in texts]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    running = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def process_message(self, message, on_stage=None):
+        with lock:
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+        try:
+            if message == "boom":
+                raise RuntimeError("pipeline failed")
+            time.sleep(0.3 if message == "slow" else 0.05)
+            return {"reply": f"Re: {message}", "status": "continue"}
+        finally:
+            with lock:
+                running["now"] -= 1
+
+    monkeypatch.setattr(SupportWorkflow, "process_message", process_message)
+    embeddings = _NoEmbeddings()
+    monkeypatch.setattr(registry, "get_query_embedding_cache", lambda *args: embeddings)
+    with TestClient(app) as test_client:
+        test_client.running = running
+        test_client.embeddings = embeddings
+        yield test_client
+
+
+def test_batch_keeps_input_order_and_isolates_failures(client):
+    payload = {"b": {"message": "refund"}, "a": {"message": "boom"}, "c": {"message": "offline"}}
+    response = client.post("/predict/batch", params={"concurrency": 2}, json=payload)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert list(body) == ["b", "a", "c"]
+    assert body["b"]["reply"] == "Re: refund"
+    assert body["a"]["status"] == "error"
+    assert "pipeline failed" in body["a"]["error"]
+    assert client.running["peak"] <= 2
+
+
+def test_batch_stream_emits_one_line_per_item(client):
+    payload = {str(i): {"message": f"question {i}"} for i in range(5)}
+    with client.stream("POST", "/predict/batch/stream", params={"concurrency": 3}, json=payload) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.iter_lines() if line]
+
+    assert sorted(line["id"] for line in lines) == sorted(payload)
+    assert all(line["result"]["reply"] == f"Re: question {line['id']}" for line in lines)
+    assert client.running["peak"] <= 3
+
+
+def test_batch_embeds_queries_in_chunks_bounded_by_concurrency_and_cache(client):
+    payload = {str(i): {"message": f"question {i}"} for i in range(5)}
+    client.post("/predict/batch", params={"concurrency": 2}, json=payload)
+
+    assert sorted(client.embeddings.calls) == [["question 0", "question 1"], ["question 2", "question 3"], ["question 4"]]
+
+    client.embeddings.calls.clear()
+    client.embeddings.max_entries = 2
+    client.post("/predict/batch", params={"concurrency": 4}, json=payload)
+    assert all(len(texts) == 1 for texts in client.embeddings.calls)
+
+
+def test_timed_out_items_keep_their_slot_until_the_turn_returns(client):
+    payload = {"slow": {"message": "slow"}, "next": {"message": "next"}}
+    response = client.post("/predict/batch", params={"concurrency": 1, "timeout": 0.1}, json=payload)
+
+    body = response.json()
+    assert body["slow"]["status"] == "error"
+    assert "Timed out" in body["slow"]["error"]
+    assert body["next"]["reply"] == "Re: next"
+    assert client.running["peak"] == 1
+
+
+def test_conversations_stay_pinned_while_a_streamed_turn_runs(client, monkeypatch):
+    pinned = []
+
+    def process_message(self, message, on_stage=None):
+        pinned.append(self.conversation_id in conversation_store._pins)
+        return {"reply": f"Re: {message}", "status": "continue"}
+
+    monkeypatch.setattr(SupportWorkflow, "process_message", process_message)
+    conversation_id = client.post("/conversations", json={"message": "hello"}).json()["conversation_id"]
+    with client.stream("POST", f"/conversations/{conversation_id}/messages/stream",
+                       json={"message": "again"}) as response:
+        events = [line for line in response.iter_lines() if line.startswith("event:")]
+
+    assert events == ["event: reply"]
+    assert pinned == [True, True]
+    assert conversation_id not in conversation_store._pins
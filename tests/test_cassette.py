@@ -0,0 +1,115 @@
+# tests/test_cassette.py
+
+import contextvars
+import glob
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.documents import Document
+
+from core import cassette
+from core.cassette import Cassette, CassetteMiss
+from core.workflow_manager import WorkflowManager
+
+
+def _task(role: str, description: str):
+    return SimpleNamespace(agent=SimpleNamespace(role=role), description=description, expected_output="text")
+
+
+class CountingRunner:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, task):
+        self.calls += 1
+        return f"{task.agent.role} answer #{self.calls}"
+
+
+def test_recorded_calls_replay_without_running(tmp_path):
+    runner = CountingRunner()
+    docs = [Document(page_content="Enable Local Network access", metadata={"source": "kb.txt"})]
+    with cassette.recording() as tape:
+        summary = cassette.llm_call(_task("Summarizer", "Summarize"), runner)
+        hits = cassette.tool_call("VectorSearchTool.search", ["offline"], lambda: docs)
+    path = str(tmp_path / "turn.cassette.json.gz")
+    tape.save(path)
+
+    with cassette.replaying(Cassette.load(path)):
+        assert cassette.llm_call(_task("Summarizer", "Summarize"), runner) == summary
+        replayed = cassette.tool_call("VectorSearchTool.search", ["offline"], lambda: [])
+    assert runner.calls == 1
+    assert [(d.page_content, d.metadata) for d in replayed] == [(d.page_content, d.metadata) for d in hits]
+    assert cassette.active() is None
+
+
+def test_repeated_requests_replay_in_recorded_order():
+    runner = CountingRunner()
+    with cassette.recording() as tape:
+        first = [cassette.llm_call(_task("Summarizer", "Same"), runner) for _ in range(2)]
+
+    with cassette.replaying(tape):
+        replayed = [cassette.llm_call(_task("Summarizer", "Same"), runner) for _ in range(3)]
+    assert replayed == first + first[-1:]
+
+
+def test_unrecorded_calls_miss_unless_not_strict():
+    runner = CountingRunner()
+    with cassette.replaying(Cassette()):
+        with pytest.raises(CassetteMiss):
+            cassette.llm_call(_task("Summarizer", "New prompt"), runner)
+    with cassette.replaying(Cassette(), strict=False):
+        assert cassette.llm_call(_task("Summarizer", "New prompt"), runner) == "Summarizer answer #1"
+
+
+def test_recorded_errors_and_timing_replay(monkeypatch):
+    def fail():
+        raise ConnectionError("index unavailable")
+
+    with cassette.recording() as tape:
+        with pytest.raises(ConnectionError):
+            cassette.tool_call("VectorSearchTool.search", ["offline"], fail)
+    tape.interactions[0]["duration"] = 0.5
+
+    sleeps = []
+    monkeypatch.setattr(cassette.time, "sleep", sleeps.append)
+    with cassette.replaying(tape, timing=True, speed=2.0):
+        with pytest.raises(RuntimeError, match="index unavailable"):
+            cassette.tool_call("VectorSearchTool.search", ["offline"], lambda: [])
+    assert sleeps == [1.0]
+
+
+def test_recording_follows_context_into_worker_threads():
+    runner = CountingRunner()
+    with ThreadPoolExecutor(max_workers=2) as pool, cassette.recording() as tape:
+        futures = [
+            pool.submit(contextvars.copy_context().run, cassette.llm_call, _task(role, "Prompt"), runner)
+            for role in ("Summarizer", "Estimator")
+        ]
+        [future.result() for future in futures]
+    assert sorted(i["name"] for i in tape.interactions) == ["Estimator", "Summarizer"]
+
+
+def test_workflow_turns_are_recorded_and_replayed(tmp_path, monkeypatch):
+    monkeypatch.setenv("CASSETTE_DIR", str(tmp_path))
+    runner = CountingRunner()
+
+    def process_turn(self, message, on_stage=None):
+        self.state.add_customer_message(message)
+        reply = cassette.llm_call(_task("Dispatcher", self.state.get_formatted_conversation()), runner)
+        self.state.add_system_message(reply)
+        return {"reply": reply, "status": "continue"}
+
+    monkeypatch.setattr(WorkflowManager, "_process_turn", process_turn)
+    manager = WorkflowManager()
+    manager.process_customer_message("My app is offline")
+    manager.process_customer_message("Still offline after a restart")
+    paths = sorted(glob.glob(str(tmp_path / f"*{cassette.CASSETTE_SUFFIX}")))
+    assert len(paths) == 2
+
+    tape = next(t for t in map(Cassette.load, paths) if t.turn["message"].startswith("Still"))
+    result, recorded = cassette.replay_turn(tape)
+    assert result == recorded == {"reply": "Dispatcher answer #2", "status": "continue"}
+    assert runner.calls == 2
+    # Replays are not themselves recorded
+    assert len(glob.glob(str(tmp_path / f"*{cassette.CASSETTE_SUFFIX}"))) == 2
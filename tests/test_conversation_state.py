@@ -0,0 +1,45 @@
+# tests/test_conversation_state.py
+
+from core.conversation_state import ConversationState
+
+
+def test_unsummarized_conversation_only_contains_new_turns():
+    state = ConversationState()
+    state.add_customer_message("My app says no internet.")
+    state.add_system_message("Please enable Local Network.")
+    state.record_summary_coverage(2, full=True)
+
+    state.add_customer_message("Still broken.")
+
+    assert state.get_unsummarized_conversation() == "Customer: Still broken.\n\n"
+    assert state.get_formatted_conversation().startswith("Customer: My app says no internet.")
+
+    state.record_summary_coverage(3, full=False)
+    assert state.incremental_summaries == 1
+    assert state.get_unsummarized_conversation() == ""
+
+    state.record_summary_coverage(3, full=True)
+    assert state.incremental_summaries == 0
+
+
+def test_formatted_transcript_starts_at_a_message():
+    state = ConversationState()
+    state.add_customer_message("Hi")
+    assert state.get_formatted_conversation() == "Customer: Hi\n\n"
+
+    state.add_system_message("Hello!")
+    assert state.get_formatted_conversation() == "Customer: Hi\n\nSupport: Hello!\n\n"
+    assert state.get_formatted_conversation(1) == "Support: Hello!\n\n"
+    assert state.conversation_history[0].role == "customer"
+    assert state.last_activity == state.conversation_history[-1].timestamp
+
+
+def test_transcript_formats_each_message_once():
+    state = ConversationState()
+    state.add_customer_message("Hi")
+    state.get_formatted_conversation()
+    # Already formatted messages are not formatted again
+    state.conversation_history[0].content = "changed"
+    state.add_system_message("Hello!")
+    assert state.get_formatted_conversation() == "Customer: Hi\n\nSupport: Hello!\n\n"
+    assert state.get_formatted_conversation(5) == ""
@@ -0,0 +1,63 @@
+# tests/test_conversation_store.py
+
+import time
+
+from api.conversation_store import ConversationStore, SQLiteConversationBackend
+from workflows.support_workflow import SupportWorkflow
+
+
+def _workflow(message: str) -> SupportWorkflow:
+    workflow = SupportWorkflow()
+    workflow.get_conversation_state().add_customer_message(message)
+    return workflow
+
+
+def test_conversations_survive_restart(tmp_path):
+    db_path = str(tmp_path / "conversations.db")
+    store = ConversationStore(SQLiteConversationBackend(db_path))
+    store.save("abc", _workflow("My payment failed"))
+
+    restarted = ConversationStore(SQLiteConversationBackend(db_path))
+    workflow = restarted.get("abc")
+
+    assert workflow is not None
+    assert workflow.get_conversation_state().conversation_history[0].content == "My payment failed"
+
+
+def test_lru_is_bounded_and_reloads_evicted_conversations():
+    store = ConversationStore(capacity=2)
+    for conversation_id in ("a", "b", "c"):
+        store.save(conversation_id, _workflow(conversation_id))
+
+    assert len(store) == 2
+    assert store.get("a").get_conversation_state().conversation_history[0].content == "a"
+
+
+def test_expire_removes_only_idle_conversations():
+    now = [time.time()]
+    store = ConversationStore(ttl=60, clock=lambda: now[0])
+    store.save("old", _workflow("old"))
+    now[0] += 120
+    store.save("new", _workflow("new"))
+
+    store.expire()
+
+    assert store.get("old") is None
+    assert store.get("new") is not None
+
+
+def test_pinned_conversations_are_not_evicted():
+    store = ConversationStore(capacity=1)
+    workflow = _workflow("in flight")
+    with store.pinned("busy"):
+        store.save("busy", workflow)
+        store.save("other", _workflow("other"))
+        store.save("newest", _workflow("newest"))
+
+        assert store.get("busy") is workflow
+    store.save("last", _workflow("last"))
+
+    # Released, it is evicted like any other conversation and reloaded on demand
+    reloaded = store.get("busy")
+    assert reloaded is not workflow
+    assert reloaded.get_conversation_state().conversation_history[0].content == "in flight"
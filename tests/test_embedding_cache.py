@@ -0,0 +1,39 @@
+# tests/test_embedding_cache.py
+
+from core.embedding_cache import QueryEmbeddingCache
+
+
+class CountingEmbeddings:
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+def test_batch_embeds_misses_once_and_normalizes_keys():
+    embeddings = CountingEmbeddings()
+    cache = QueryEmbeddingCache(embeddings)
+
+    vectors = cache.embed_many(["App  crashes", "app crashes", "Login fails"])
+    assert embeddings.calls == [["app crashes", "login fails"]]
+    assert vectors[0] == vectors[1]
+
+    assert cache.embed(" LOGIN fails ") == vectors[2]
+    assert len(embeddings.calls) == 1
+    assert cache.stats() == {"hits": 2, "misses": 2, "entries": 2}
+
+
+def test_least_recently_used_queries_are_evicted():
+    embeddings = CountingEmbeddings()
+    cache = QueryEmbeddingCache(embeddings, max_entries=2)
+    cache.embed("a")
+    cache.embed("b")
+    cache.embed("a")
+    cache.embed("c")
+
+    cache.embed("a")
+    assert len(embeddings.calls) == 3
+    cache.embed("b")
+    assert embeddings.calls[-1] == ["b"]
@@ -0,0 +1,47 @@
+# tests/test_escalation_router.py
+
+import json
+
+from core.escalation_router import NO_ESCALATION, TieredEscalationRouter, parse_action_items
+from tools.team_routing_map import TeamRoutingMap
+
+
+def _router(tmp_path) -> TieredEscalationRouter:
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"billing": "FinanceTeam", "refund": "FinanceTeam", "crash": "TechSupportTeam"}))
+    return TieredEscalationRouter(TeamRoutingMap(str(path)), min_confidence=0.6)
+
+
+def test_parse_action_items():
+    actions = "- Escalate to billing team\n* Reset user password\n\n2) Follow up in 48 hours"
+    assert parse_action_items(actions) == [
+        "Escalate to billing team", "Reset user password", "Follow up in 48 hours"
+    ]
+
+
+def test_confident_rule_matches_skip_the_llm(tmp_path):
+    router = _router(tmp_path)
+    calls = []
+
+    routing = router.route("- Escalate billing refund to supervisor\n- Reset password", fallback=calls.append)
+    assert routing == "FinanceTeam"
+    assert calls == []
+    assert router.route("- Reset password", fallback=calls.append) == NO_ESCALATION
+    assert router.stats() == {"rule_routed": 1, "llm_routed": 0, "llm_calls": 0}
+
+
+def test_unmatched_and_ambiguous_items_fall_back_to_the_llm(tmp_path):
+    router = _router(tmp_path)
+    calls = []
+
+    def fallback(items):
+        calls.append(items)
+        return "LegalTeam"
+
+    routing = router.route(
+        "- Escalate billing dispute\n- Escalate to legal specialist\n- Escalate app crash after billing change",
+        fallback=fallback
+    )
+    assert calls == ["- Escalate to legal specialist\n- Escalate app crash after billing change"]
+    assert routing == "- Escalate billing dispute: FinanceTeam\nLegalTeam"
+    assert router.stats() == {"rule_routed": 1, "llm_routed": 2, "llm_calls": 1}
@@ -0,0 +1,112 @@
+# tests/test_faiss_index.py
+
+import os
+
+import pytest
+
+from langchain_core.documents import Document
+
+from core import registry
+from tools import faiss_index
+from tools.ticket_documents import matches
+from tools.vector_search_tool import VectorSearchTool
+
+VOCABULARY = ["internet", "wi-fi", "payment", "refund", "install"]
+
+
+class _BagOfWords:
+    """Tiny deterministic embeddings so the test needs no model download"""
+
+    def _embed(self, text):
+        return [float(word in text.lower()) for word in VOCABULARY] + [0.01]
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+def _build(monkeypatch, directory, texts):
+    docs = [Document(page_content=text, metadata={"doc_type": "document"}) for text in texts]
+    monkeypatch.setattr(faiss_index, "load_split_documents", lambda *args: docs)
+    faiss_index.build_faiss_index(index_directory=directory, quantization="fp32")
+
+
+def test_rebuild_swaps_files_and_reopens_the_shared_store(tmp_path, monkeypatch):
+    registry.clear()
+    registry.get_or_create(("embeddings", registry.DEFAULT_EMBEDDING_MODEL), _BagOfWords)
+    directory = str(tmp_path / "faiss")
+
+    _build(monkeypatch, directory, ["Refund issued after payment failure", "Reset the wi-fi router"])
+    old = registry.get_faiss_store(directory)
+    assert old.similarity_search("refund", k=1)[0].page_content.startswith("Refund")
+
+    # Rebuilt by another process: only the on-disk version marker changes
+    def bump_version(directory):
+        with open(os.path.join(directory, registry.KB_VERSION_FILE), "w") as f:
+            f.write("rebuilt elsewhere")
+        os.utime(os.path.join(directory, registry.KB_VERSION_FILE), (1, 1))
+
+    monkeypatch.setattr(registry, "notify_knowledge_base_rebuilt", bump_version)
+    _build(monkeypatch, directory, ["Reinstall the app to fix the install error"])
+    new = registry.get_faiss_store(directory)
+
+    assert new is not old
+    assert new.similarity_search("install", k=1)[0].page_content.startswith("Reinstall")
+    # Readers of the previous build keep a consistent view of the replaced files
+    assert old.similarity_search("refund", k=1)[0].page_content.startswith("Refund")
+    assert not [name for name in os.listdir(directory) if ".tmp" in name]
+    registry.clear()
+
+
+def test_filtered_search_matches_the_metadata_predicate(tmp_path, monkeypatch):
+    registry.clear()
+    registry.get_or_create(("embeddings", registry.DEFAULT_EMBEDDING_MODEL), _BagOfWords)
+    directory = str(tmp_path / "faiss")
+    docs = [Document(page_content="Internet guide", metadata={"doc_type": "document"})] + [
+        Document(page_content=f"Ticket {i}: internet refund", metadata={
+            "doc_type": "ticket",
+            "resolution_status": ["Resolved", "Open"][i % 2],
+            "priority": ["High", "Low", "Medium"][i % 3],
+            **({"resolution_date": 20240101 + i} if i % 4 else {}),
+        })
+        for i in range(12)
+    ]
+    monkeypatch.setattr(faiss_index, "load_split_documents", lambda *args: docs)
+    faiss_index.build_faiss_index(index_directory=directory, quantization="fp32")
+
+    cases = [
+        {"status": "Resolved"},
+        {"status": "Resolved", "priority": "High", "tickets_only": True},
+        {"since": "2024-01-06"},
+        {"category": "Billing"},
+        {"status": "Closed", "tickets_only": True},
+    ]
+    store = faiss_index.FaissVectorStore(directory)
+    for filters in cases:
+        expected = sorted(doc.page_content for doc in docs if matches(doc.metadata, filters))
+        hits = store.similarity_search("internet refund", k=len(docs), filter=filters)
+        assert sorted(doc.page_content for doc in hits) == expected
+    # Repeated filters reuse their selector
+    assert len(store._selectors) == len(cases)
+    store.similarity_search("refund", k=1, filter={"status": "Resolved"})
+    assert len(store._selectors) == len(cases)
+
+    os.remove(os.path.join(directory, faiss_index.FILTER_COLUMNS_FILE))
+    with pytest.raises(RuntimeError, match="rebuild the index"):
+        faiss_index.FaissVectorStore(directory).similarity_search("refund", k=1, filter={"status": "Resolved"})
+    registry.clear()
+
+
+def test_hybrid_search_reads_lexical_hits_from_the_store(tmp_path, monkeypatch):
+    registry.clear()
+    registry.get_or_create(("embeddings", registry.DEFAULT_EMBEDDING_MODEL), _BagOfWords)
+    directory = str(tmp_path / "faiss")
+    _build(monkeypatch, directory, ["Error ERR_402 at checkout", "Reset the wi-fi router", "Refund the payment"])
+
+    tool = VectorSearchTool(backend="faiss", faiss_directory=directory, mode="hybrid", k=1)
+    assert tool.mode == "hybrid"
+    assert [doc.page_content for doc in tool.search("ERR_402")] == ["Error ERR_402 at checkout"]
+    assert [doc.page_content for doc in tool.search("refund payment")] == ["Refund the payment"]
+    registry.clear()
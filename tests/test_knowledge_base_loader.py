@@ -0,0 +1,93 @@
+# tests/test_knowledge_base_loader.py
+
+import json
+import os
+
+import pytest
+
+from core import registry
+from tools import knowledge_base_loader
+from tools.knowledge_base_loader import MANIFEST_FILE, _stale_chunk_ids, build_vector_db
+
+
+class FakeChroma:
+    """In-memory stand-in for the Chroma collection of a persist directory"""
+
+    collections = {}
+
+    def __init__(self, persist_directory, embedding_function=None):
+        self.rows = FakeChroma.collections.setdefault(persist_directory, {})
+
+    @classmethod
+    def from_documents(cls, documents, embedding, ids, persist_directory):
+        store = cls(persist_directory)
+        store.add_documents(documents, ids=ids)
+        return store
+
+    def add_documents(self, documents, ids):
+        self.rows.update(zip(ids, (doc.page_content for doc in documents)))
+
+    def delete(self, ids):
+        for doc_id in ids:
+            self.rows.pop(doc_id, None)
+
+    def get(self, include=None):
+        return {"ids": list(self.rows)}
+
+    def persist(self):
+        pass
+
+
+@pytest.fixture
+def sources(tmp_path, monkeypatch):
+    FakeChroma.collections.clear()
+    monkeypatch.setattr(knowledge_base_loader, "Chroma", FakeChroma)
+    monkeypatch.setattr(registry, "get_embeddings", lambda *args: None)
+    conversations = tmp_path / "conversations"
+    conversations.mkdir()
+    (conversations / "wifi.txt").write_text("Customer: my Wi-Fi drops every hour", encoding="utf-8")
+    (conversations / "refund.txt").write_text("Customer: I was charged twice", encoding="utf-8")
+    return {
+        "conversations_dir": str(conversations),
+        "historical_csv": str(tmp_path / "missing.csv"),
+        "kb_file": str(tmp_path / "missing.txt"),
+    }
+
+
+def _manifest(persist):
+    with open(os.path.join(persist, MANIFEST_FILE)) as f:
+        return json.load(f)
+
+
+def test_stale_chunk_ids_diff_manifests(tmp_path):
+    previous = {"a.txt": {"hash": "1", "chunks": ["a1", "a2"]}, "b.txt": {"hash": "2", "chunks": ["b1"]}}
+    current = {"a.txt": {"hash": "3", "chunks": ["a1", "a3"]}}
+    assert _stale_chunk_ids(str(tmp_path), previous, current) == ["a2", "b1"]
+    assert _stale_chunk_ids(str(tmp_path), {}, current) == []
+
+
+def test_full_rebuild_deletes_chunks_of_removed_sources(tmp_path, sources):
+    persist = str(tmp_path / "db")
+    build_vector_db(persist, **sources)
+    refund = os.path.join(sources["conversations_dir"], "refund.txt")
+    refund_ids = _manifest(persist)[refund]["chunks"]
+    assert set(refund_ids) <= set(FakeChroma.collections[persist])
+
+    os.remove(refund)
+    build_vector_db(persist, **sources)
+
+    rows = FakeChroma.collections[persist]
+    assert not set(refund_ids) & set(rows)
+    assert refund not in _manifest(persist)
+    assert sorted(rows) == sorted(chunk_id for entry in _manifest(persist).values() for chunk_id in entry["chunks"])
+
+
+def test_full_rebuild_replaces_stores_without_a_manifest(tmp_path, sources):
+    persist = str(tmp_path / "db")
+    FakeChroma.collections[persist] = {"3f2b-random-uuid": "Customer: my Wi-Fi drops every hour"}
+
+    build_vector_db(persist, **sources)
+
+    rows = FakeChroma.collections[persist]
+    assert "3f2b-random-uuid" not in rows
+    assert sorted(rows.values()) == ["Customer: I was charged twice", "Customer: my Wi-Fi drops every hour"]
@@ -0,0 +1,66 @@
+# tests/test_lexical_index.py
+
+from tools.lexical_index import LEXICAL_INDEX_FILE, LexicalIndex, LexicalIndexBuilder, reciprocal_rank_fusion
+
+
+def _index() -> LexicalIndex:
+    index = LexicalIndex()
+    index.add("1", "Issue Category: Payment Gateway Integration Failure\nSolution: Rotate API keys")
+    index.add("2", "Issue Category: Network Connectivity Issue\nSolution: Check Local Network permission")
+    index.add("3", "Customer: my payment failed with ERR_402 at checkout")
+    return index
+
+
+def test_exact_terms_rank_first():
+    hits = _index().search("Payment Gateway Integration Failure")
+    assert hits[0][0] == "1"
+    assert hits[0][2] == 1.0
+
+    assert _index().search("ERR_402")[0][0] == "3"
+
+
+def test_remove_and_persist(tmp_path):
+    index = _index()
+    index.remove("3")
+    assert all(doc_id != "3" for doc_id, _, _ in index.search("payment"))
+
+    index.save(str(tmp_path))
+    loaded = LexicalIndex.load(str(tmp_path))
+    assert loaded.search("network permission")[0][0] == "2"
+    assert LexicalIndex.load(str(tmp_path / "missing")) is None
+
+
+def test_reciprocal_rank_fusion_weights():
+    assert reciprocal_rank_fusion([(["a", "b"], 1.0), (["b", "c"], 1.0)])[0] == "b"
+    assert reciprocal_rank_fusion([(["a"], 2.0), (["c"], 1.0)]) == ["a", "c"]
+
+
+def test_saved_index_keeps_postings_but_not_text(tmp_path):
+    _index().save(str(tmp_path))
+    with open(tmp_path / LEXICAL_INDEX_FILE, encoding="utf-8") as f:
+        assert "Rotate API keys" not in f.read()
+
+    loaded = LexicalIndex.load(str(tmp_path))
+    loaded.remove("1")
+    loaded.add("3", "Customer: refund requested twice")
+    assert loaded.search("payment gateway") == []
+    assert loaded.search("ERR_402") == []
+    assert loaded.search("refund")[0][0] == "3"
+
+
+def test_builder_writes_the_same_index(tmp_path):
+    builder = LexicalIndexBuilder(str(tmp_path / "build.db"))
+    builder.add_index(_index())
+    builder.remove("3")
+    builder.add("4", "Customer: refund requested twice", {"doc_type": "ticket"})
+    builder.commit()
+    builder.save(str(tmp_path))
+    builder.close()
+    assert not (tmp_path / "build.db").exists()
+
+    expected = _index()
+    expected.remove("3")
+    expected.add("4", "Customer: refund requested twice", {"doc_type": "ticket"})
+    loaded = LexicalIndex.load(str(tmp_path))
+    for query in ("payment", "network permission", "refund"):
+        assert loaded.search(query) == expected.search(query)
@@ -0,0 +1,34 @@
+# tests/test_llm_cache.py
+
+from core.llm_cache import LLMResponseCache
+
+
+def test_hit_miss_and_persistence(tmp_path):
+    path = str(tmp_path / "llm_cache.db")
+    cache = LLMResponseCache(path)
+    key = cache.make_key("Summarizer", "Summarize: my app is offline", "ollama/mistral", 0.3)
+
+    assert cache.get(key) is None
+    cache.put(key, "Customer's app reports no connection.")
+    assert cache.get(key) == "Customer's app reports no connection."
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+    reopened = LLMResponseCache(path)
+    assert reopened.get(key) == "Customer's app reports no connection."
+    assert key != cache.make_key("Summarizer", "Summarize: my app is offline", "ollama/mistral", 0.4)
+    assert key != cache.make_key("Summarizer", "Summarize: my app is offline", "ollama/mistral", 0.3,
+                                 context='{"backstory": "Terse"}')
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "llm_cache.db"), max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    cache.get("a")
+    cache.put("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+    assert cache.stats()["evictions"] == 1
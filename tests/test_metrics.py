@@ -0,0 +1,38 @@
+# tests/test_metrics.py
+
+import pytest
+
+from core import metrics
+
+
+def test_instrumented_stage_records_latency_calls_and_errors():
+    @metrics.instrument_stage("test_stage")
+    def run(fail=False):
+        assert metrics.current_stage() == "test_stage"
+        if fail:
+            raise RuntimeError("LLM unavailable")
+        return "ok"
+
+    calls = metrics.STAGE_CALLS.value("test_stage")
+    errors = metrics.STAGE_ERRORS.value("test_stage")
+    assert run() == "ok"
+    with pytest.raises(RuntimeError):
+        run(fail=True)
+
+    assert metrics.STAGE_CALLS.value("test_stage") == calls + 2
+    assert metrics.STAGE_ERRORS.value("test_stage") == errors + 1
+    assert metrics.STAGE_DURATION.count("test_stage") == calls + 2
+    assert metrics.current_stage() == ""
+
+
+def test_render_prometheus_text():
+    histogram = metrics.Histogram("test_latency_seconds", "Test latency", ("stage",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, 'say "hi"')
+    histogram.observe(5.0, 'say "hi"')
+
+    text = metrics.render()
+    assert "# TYPE test_latency_seconds histogram" in text
+    assert 'test_latency_seconds_bucket{stage="say \\"hi\\"",le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{stage="say \\"hi\\"",le="+Inf"} 2' in text
+    assert 'test_latency_seconds_count{stage="say \\"hi\\""} 2' in text
+    assert "# TYPE support_cache_hits_total counter" in text
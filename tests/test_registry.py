@@ -0,0 +1,101 @@
+# tests/test_registry.py
+
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from core import registry
+from tools.lexical_index import LexicalIndex
+
+
+def test_slow_first_build_does_not_block_other_keys():
+    registry.clear()
+    building = threading.Event()
+    release = threading.Event()
+
+    def slow():
+        building.set()
+        release.wait(5)
+        return "slow"
+
+    thread = threading.Thread(target=registry.get_or_create, args=("slow", slow))
+    thread.start()
+    try:
+        assert building.wait(5)
+        # Would wait for ``slow`` under a single global lock
+        assert registry.get_or_create("fast", lambda: "fast") == "fast"
+        assert registry.peek("slow") is None
+    finally:
+        release.set()
+        thread.join()
+    assert registry.get_or_create("slow", lambda: "rebuilt") == "slow"
+    registry.clear()
+
+
+def test_concurrent_first_access_builds_once():
+    registry.clear()
+    builds = []
+
+    def factory():
+        builds.append(1)
+        return object()
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(registry.get_or_create("shared", factory)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(builds) == 1
+    assert all(result is results[0] for result in results)
+    registry.clear()
+
+
+def test_knowledge_base_objects_follow_rebuilds_by_other_processes(tmp_path):
+    registry.clear()
+    directory = str(tmp_path)
+    index = LexicalIndex()
+    index.add("1", "Reset the router")
+    index.save(directory)
+    registry.notify_knowledge_base_rebuilt(directory)
+    first = registry.get_lexical_index(directory)
+    assert registry.get_lexical_index(directory) is first
+
+    # Another process only leaves the new files and version marker behind
+    index.add("2", "Rotate the API keys")
+    index.save(directory)
+    os.utime(os.path.join(directory, registry.KB_VERSION_FILE), (1, 1))
+
+    reloaded = registry.get_lexical_index(directory)
+    assert reloaded is not first
+    assert reloaded.search("API keys")[0][0] == "2"
+    registry.clear()
+
+
+def test_agents_are_rebuilt_when_their_version_changes():
+    registry.clear()
+    first = registry.get_agent("Agent", object, version="tool-1")
+    assert registry.get_agent("Agent", object, version="tool-1") is first
+    assert registry.get_agent("Agent", object, version="tool-2") is not first
+    registry.clear()
+
+
+def test_clear_shuts_down_executors_and_closes_the_llm_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "1")
+    monkeypatch.setenv("LLM_CACHE_PATH", str(tmp_path / "llm_cache.db"))
+    registry.clear()
+    executor = registry.get_stage_executor()
+    cache = registry.get_llm_cache()
+
+    registry.clear()
+    with pytest.raises(RuntimeError):
+        executor.submit(print)
+    with pytest.raises(sqlite3.ProgrammingError):
+        cache.get("key")
+    assert registry.get_stage_executor() is not executor
+    registry.clear()
@@ -0,0 +1,45 @@
+# tests/test_semantic_cache.py
+
+from core.semantic_cache import SemanticCache
+
+VOCABULARY = ["internet", "wi-fi", "payment", "refund", "install"]
+
+
+def _bag_of_words(text: str):
+    """Tiny deterministic embedding so the test needs no model download"""
+    return [float(word in text) for word in VOCABULARY] + [0.01]
+
+
+def test_near_duplicate_first_message_hits():
+    cache = SemanticCache(_bag_of_words, threshold=0.9)
+    result = {"reply": "Enable Local Network.", "status": "continue", "summary": "No internet."}
+    cache.add("The app says no internet but my Wi-Fi works", result)
+
+    assert cache.lookup("app says no internet, but Wi-Fi works fine!") == result
+    assert cache.lookup("My refund never arrived") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+
+def test_ttl_and_version_invalidate_entries():
+    version = [1]
+    cache = SemanticCache(_bag_of_words, ttl=0, version=lambda: version[0])
+    cache.add("no internet", {"reply": "", "status": "continue"})
+    assert cache.lookup("no internet") is None
+
+    cache.ttl = 3600
+    cache.add("no internet", {"reply": "", "status": "continue"})
+    assert cache.lookup("no internet") is not None
+
+    version[0] = 2
+    assert cache.lookup("no internet") is None
+
+
+def test_oldest_entries_are_dropped_beyond_max_entries():
+    cache = SemanticCache(_bag_of_words, max_entries=2)
+    for word in ("internet", "payment", "refund"):
+        cache.add(word, {"reply": word, "status": "continue"})
+
+    assert cache.lookup("internet") is None
+    assert cache.lookup("payment")["reply"] == "payment"
+    assert cache.lookup("refund")["reply"] == "refund"
+    assert cache.stats()["entries"] == 2
@@ -0,0 +1,45 @@
+# tests/test_support_workflow.py
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core import registry
+from workflows.support_workflow import SupportWorkflow
+
+
+def test_queued_turns_of_one_conversation_do_not_hold_pipeline_threads(monkeypatch):
+    pool = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(registry, "get_pipeline_executor", lambda: pool)
+    events = []
+    lock = threading.Lock()
+
+    def process_message(self, message, on_stage=None):
+        with self._turn_lock:
+            with lock:
+                events.append(("start", message))
+            time.sleep(0.2)
+            with lock:
+                events.append(("end", message))
+            return {"reply": message, "status": "continue"}
+
+    monkeypatch.setattr(SupportWorkflow, "process_message", process_message)
+    busy, other = SupportWorkflow(), SupportWorkflow()
+
+    async def run():
+        return await asyncio.gather(
+            busy.aprocess_message("first"),
+            busy.aprocess_message("second"),
+            other.aprocess_message("other"),
+        )
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        pool.shutdown()
+
+    assert [result["reply"] for result in results] == ["first", "second", "other"]
+    # The other conversation got the second thread instead of a blocked turn
+    assert events.index(("start", "other")) < events.index(("end", "first"))
+    assert events.index(("start", "second")) > events.index(("end", "first"))
@@ -0,0 +1,98 @@
+# tests/test_team_routing_map.py
+
+import json
+import os
+import random
+
+import pytest
+
+from tools.team_routing_map import TeamRoutingMap
+
+
+def _write_rules(path, rules):
+    with open(path, "w") as f:
+        json.dump(rules, f)
+
+
+def test_legacy_rules_route_with_normalized_keywords(tmp_path):
+    path = str(tmp_path / "rules.json")
+    _write_rules(path, {"billing": "FinanceTeam", "technical_issue": "TechSupportTeam"})
+    routing = TeamRoutingMap(path)
+
+    assert routing.get_team_for_action("Escalate Billing dispute") == "FinanceTeam"
+    assert routing.get_team_for_action("Log a technical issue with the app") == "TechSupportTeam"
+    assert routing.get_team_for_action("Send a thank-you note") == "General Support"
+    assert routing.match("Send a thank-you note").confidence == 0.0
+
+
+def test_flat_rules_keep_first_match_by_file_order(tmp_path):
+    path = str(tmp_path / "rules.json")
+    rules = {"billing": "A", "payment": "B", "refund": "B"}
+    _write_rules(path, rules)
+    routing = TeamRoutingMap(path)
+
+    assert routing.get_team_for_action("billing refund payment") == "A"
+
+    def first_match(item):
+        return next((team for keyword, team in rules.items() if keyword in item.lower()), "General Support")
+
+    rng = random.Random(0)
+    words = ["billing", "payment", "refund", "crash", "login", "the"]
+    items = [" ".join(rng.choices(words, k=rng.randint(0, 5))) for _ in range(500)]
+    assert [routing.get_team_for_action(item) for item in items] == [first_match(item) for item in items]
+    assert [m.team for m in routing.match_bulk(items)] == [first_match(item) for item in items]
+
+
+def test_weights_priority_and_word_boundaries(tmp_path):
+    path = str(tmp_path / "rules.json")
+    _write_rules(path, {
+        "rules": {
+            "refund": {"team": "FinanceTeam", "weight": 1},
+            "app": {"team": "TechSupportTeam", "word_boundary": True},
+            "crash": "TechSupportTeam",
+            "legal": {"team": "LegalTeam", "priority": 1},
+        },
+        "default_team": "CustomerServiceTeam",
+    })
+    routing = TeamRoutingMap(path)
+
+    match = routing.match("Refund after the app crash")
+    assert match.team == "TechSupportTeam"
+    assert match.confidence == 2 / 3
+    assert routing.get_team_for_action("Refund the happy customer") == "FinanceTeam"
+    assert routing.get_team_for_action("Refund after app crash, involve legal") == "LegalTeam"
+    assert routing.get_team_for_action("Nothing to route") == "CustomerServiceTeam"
+
+
+def test_bulk_matches_single_item_routing(tmp_path):
+    path = str(tmp_path / "rules.json")
+    _write_rules(path, {"billing": "FinanceTeam", "crash": "TechSupportTeam", "ing c": "Nobody"})
+    routing = TeamRoutingMap(path)
+    items = ["Check billing", "crash on launch", "", "Billing and crash", "crash"]
+
+    assert routing.match_bulk(items) == [routing.match(item) for item in items]
+    assert routing.route_bulk(items)["Check billing"] == "FinanceTeam"
+
+
+def test_rules_file_is_hot_reloaded(tmp_path):
+    path = str(tmp_path / "rules.json")
+    _write_rules(path, {"billing": "FinanceTeam"})
+    routing = TeamRoutingMap(path, reload_interval=0)
+    assert routing.get_team_for_action("billing") == "FinanceTeam"
+
+    _write_rules(path, {"billing": "BillingOpsTeam"})
+    os.utime(path, (0, os.path.getmtime(path) + 10))
+    assert routing.get_team_for_action("billing") == "BillingOpsTeam"
+
+
+def test_failed_reload_warns_and_keeps_previous_rules(tmp_path):
+    path = str(tmp_path / "rules.json")
+    _write_rules(path, {"billing": "FinanceTeam"})
+    routing = TeamRoutingMap(path, reload_interval=0)
+
+    with open(path, "w") as f:
+        f.write("{not json")
+    os.utime(path, (0, os.path.getmtime(path) + 10))
+    with pytest.warns(RuntimeWarning, match="Keeping previous routing rules"):
+        assert routing.get_team_for_action("billing") == "FinanceTeam"
+    assert routing.reload_error is not None
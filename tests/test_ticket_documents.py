@@ -0,0 +1,41 @@
+# tests/test_ticket_documents.py
+
+from tools.ticket_documents import build_where, iter_ticket_documents, matches
+
+CSV = (
+    "﻿Ticket ID, Issue Category, Sentiment, Priority, Solution, Resolution Status, Date of Resolution\n"
+    "TECH_021, Software Installation Failure, Frustrated, High, Disable antivirus, Resolved, 2025-03-17\n"
+    "TECH_030, Payment Gateway Integration Failure, Angry, High, Rotate API keys, Pending, \n"
+)
+
+
+def test_one_document_per_row_with_typed_metadata(tmp_path):
+    path = tmp_path / "tickets.csv"
+    path.write_text(CSV, encoding="utf-8")
+
+    docs = list(iter_ticket_documents(str(path)))
+
+    assert len(docs) == 2
+    assert docs[0].metadata["issue_category"] == "Software Installation Failure"
+    assert docs[0].metadata["resolution_status"] == "Resolved"
+    assert docs[0].metadata["resolution_date"] == 20250317
+    assert "resolution_date" not in docs[1].metadata
+    assert "Solution: Disable antivirus" in docs[0].page_content
+
+
+def test_filters_only_constrain_tickets():
+    resolved = {"doc_type": "ticket", "resolution_status": "Resolved", "resolution_date": 20250317}
+    pending = {"doc_type": "ticket", "resolution_status": "Pending"}
+    kb = {"doc_type": "document"}
+
+    assert matches(resolved, {"status": "Resolved", "since": "2025-03-01"})
+    assert not matches(resolved, {"status": "Resolved", "since": "2025-04-01"})
+    assert not matches(pending, {"status": "Resolved"})
+    assert matches(kb, {"status": "Resolved"})
+    assert not matches(kb, {"status": "Resolved", "tickets_only": True})
+
+    assert build_where({"status": "Resolved"}) == {"$or": [
+        {"doc_type": {"$ne": "ticket"}},
+        {"$and": [{"doc_type": {"$eq": "ticket"}}, {"resolution_status": {"$eq": "Resolved"}}]},
+    ]}
+    assert build_where(None) is None
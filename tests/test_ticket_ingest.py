@@ -0,0 +1,103 @@
+# tests/test_ticket_ingest.py
+
+import json
+import os
+
+import pytest
+
+from core import registry
+from tools import ticket_ingest
+from tools.knowledge_base_loader import MANIFEST_FILE, _chunk_ids, _manifest_chunks
+from tools.lexical_index import LexicalIndex
+from tools.ticket_documents import iter_ticket_documents
+
+HEADER = "Ticket ID, Issue Category, Sentiment, Priority, Solution, Resolution Status, Date of Resolution\n"
+ROWS = [
+    "TECH_021, Software Installation Failure, Frustrated, High, Disable antivirus, Resolved, 2025-03-17\n",
+    "TECH_030, Payment Gateway Integration Failure, Angry, High, Rotate API keys, Pending, \n",
+    "TECH_041, Network Connectivity Issue, Neutral, Low, Restart the router, Resolved, 2025-04-02\n",
+]
+
+
+class FakeVectorStore:
+    def __init__(self, fail_after=None):
+        self.rows = {}
+        self.fail_after = fail_after
+
+    def add_documents(self, documents, ids):
+        if self.fail_after is not None and len(self.rows) >= self.fail_after:
+            raise ConnectionError("vector DB unavailable")
+        self.rows.update(zip(ids, (doc.page_content for doc in documents)))
+
+    def delete(self, ids):
+        for doc_id in ids:
+            self.rows.pop(doc_id, None)
+
+    def persist(self):
+        pass
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    vectorstore = FakeVectorStore()
+    monkeypatch.setattr(registry, "get_vectorstore", lambda *args: vectorstore)
+    return vectorstore
+
+
+def _write_csv(path, rows):
+    path.write_text(HEADER + "".join(rows), encoding="utf-8")
+    return str(path)
+
+
+def test_uses_loader_ids_and_updates_manifest_and_lexical_index(tmp_path, store):
+    csv_path = _write_csv(tmp_path / "tickets.csv", ROWS)
+    persist = str(tmp_path / "db")
+
+    ticket_ingest.ingest_tickets_streaming(csv_path, persist, batch_size=2, workers=2)
+
+    expected_ids = _chunk_ids(csv_path, list(iter_ticket_documents(csv_path)))
+    assert sorted(store.rows) == sorted(expected_ids)
+    with open(os.path.join(persist, MANIFEST_FILE)) as f:
+        entry = json.load(f)[csv_path]
+    assert list(_manifest_chunks(persist, entry)) == expected_ids
+    lexical = LexicalIndex.load(persist)
+    assert lexical.search("router", k=1)[0][0] == expected_ids[2]
+    # A completed run leaves no checkpoint or scratch files behind
+    assert not os.path.exists(os.path.join(persist, "ticket_ingest_checkpoint.json"))
+    assert not os.path.exists(os.path.join(persist, ticket_ingest.JOURNAL_FILE))
+    assert not os.path.exists(os.path.join(persist, ticket_ingest.LEXICAL_BUILD_FILE))
+
+
+def test_reingesting_a_changed_export_drops_removed_rows(tmp_path, store):
+    persist = str(tmp_path / "db")
+    ticket_ingest.ingest_tickets_streaming(_write_csv(tmp_path / "tickets.csv", ROWS), persist)
+    csv_path = _write_csv(tmp_path / "tickets.csv", ROWS[1:])
+
+    ticket_ingest.ingest_tickets_streaming(csv_path, persist)
+
+    assert sorted(store.rows) == sorted(_chunk_ids(csv_path, list(iter_ticket_documents(csv_path))))
+    assert not LexicalIndex.load(persist).search("antivirus")
+
+
+def test_checkpoint_resumes_only_the_same_file(tmp_path, monkeypatch):
+    csv_path = _write_csv(tmp_path / "tickets.csv", ROWS)
+    persist = str(tmp_path / "db")
+    failing = FakeVectorStore(fail_after=1)
+    monkeypatch.setattr(registry, "get_vectorstore", lambda *args: failing)
+    with pytest.raises(RuntimeError, match="rerun to resume"):
+        ticket_ingest.ingest_tickets_streaming(csv_path, persist, batch_size=1, workers=1)
+
+    resumed = FakeVectorStore()
+    monkeypatch.setattr(registry, "get_vectorstore", lambda *args: resumed)
+    assert ticket_ingest.ingest_tickets_streaming(csv_path, persist, batch_size=1)["rows"] == 2
+
+    # Same path, new contents: the old checkpoint no longer applies
+    failing.fail_after = 1
+    failing.rows.clear()
+    monkeypatch.setattr(registry, "get_vectorstore", lambda *args: failing)
+    with pytest.raises(RuntimeError):
+        ticket_ingest.ingest_tickets_streaming(csv_path, persist, batch_size=1, workers=1)
+    csv_path = _write_csv(tmp_path / "tickets.csv", list(reversed(ROWS)))
+    fresh = FakeVectorStore()
+    monkeypatch.setattr(registry, "get_vectorstore", lambda *args: fresh)
+    assert ticket_ingest.ingest_tickets_streaming(csv_path, persist, batch_size=1)["rows"] == 3
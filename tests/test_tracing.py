@@ -0,0 +1,57 @@
+# tests/test_tracing.py
+
+import contextvars
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from core import tracing
+
+
+def test_turn_records_span_tree_across_threads():
+    def stage():
+        with tracing.span("summary", "stage"):
+            with tracing.span("llm", "llm", agent="Summarizer"):
+                pass
+
+    with tracing.start_trace("turn", "conv-tree") as turn:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(contextvars.copy_context().run, stage).result()
+        turn.set(status="continue")
+
+    [trace] = tracing.recent_traces("conv-tree")
+    tree = trace.to_dict()
+    [root] = tree["spans"]
+    assert root["name"] == "turn"
+    assert root["attributes"] == {"status": "continue"}
+    [summary] = root["children"]
+    assert summary["name"] == "summary"
+    assert summary["children"][0]["attributes"] == {"agent": "Summarizer"}
+    assert tree["duration"] >= summary["duration"]
+
+
+def test_spans_outside_a_trace_are_noops():
+    with tracing.span("orphan") as span:
+        span.set(ignored=True)
+    assert tracing.recent_traces("conv-none") == []
+
+
+def test_ring_buffer_keeps_most_recent_traces():
+    buffer = tracing.TraceBuffer(capacity=2)
+    traces = [tracing.Trace("turn", "conv-ring") for _ in range(3)]
+    for trace in traces:
+        buffer.append(trace)
+
+    assert buffer.recent("conv-ring") == [traces[2], traces[1]]
+    assert buffer.recent("conv-ring", limit=1) == [traces[2]]
+
+
+def test_chrome_trace_export(tmp_path):
+    with tracing.start_trace("turn", "conv-export"):
+        with tracing.span("retrieval", "retrieval"):
+            pass
+
+    path = tmp_path / "trace.json"
+    tracing.export_chrome_trace(str(path), tracing.recent_traces("conv-export"))
+    events = json.loads(path.read_text())["traceEvents"]
+    assert {event["name"] for event in events} == {"turn", "retrieval"}
+    assert all(event["ph"] == "X" and event["dur"] >= 0 for event in events)
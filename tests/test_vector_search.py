@@ -0,0 +1,30 @@
+# tests/test_vector_search.py
+
+from langchain_core.documents import Document
+
+from tools.vector_search_tool import merge_passages
+
+
+def _docs(*texts):
+    return [Document(page_content=text) for text in texts]
+
+
+def test_merge_passages_interleaves_and_dedups():
+    by_summary = _docs("Reset network permissions.", "Clear the app cache.")
+    by_actions = _docs("reset  network permissions.", "Reinstall the app.")
+
+    assert merge_passages([by_summary, by_actions]) == [
+        "Reset network permissions.", "Clear the app cache.", "Reinstall the app."
+    ]
+    assert merge_passages([by_summary, by_actions], max_passages=2) == [
+        "Reset network permissions.", "Clear the app cache."
+    ]
+
+
+def test_merge_passages_trims_to_character_budget():
+    long_passage = "Step. " * 100
+    passages = merge_passages([_docs("Short tip.", long_passage)], max_chars=300)
+
+    assert passages[0] == "Short tip."
+    assert passages[1].endswith("...")
+    assert sum(len(p) for p in passages) <= 300 + len("...")
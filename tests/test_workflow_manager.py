@@ -0,0 +1,172 @@
+# tests/test_workflow_manager.py
+
+import threading
+import time
+from types import SimpleNamespace
+
+from langchain_core.documents import Document
+
+from core import registry
+from core.llm_cache import LLMResponseCache
+from core.workflow_manager import WorkflowManager
+
+
+def _stub_manager(sequential: bool, calls: list) -> WorkflowManager:
+    """Build a WorkflowManager whose stages are fast, deterministic stubs."""
+    manager = WorkflowManager(sequential=sequential)
+    lock = threading.Lock()
+
+    def stage(name, value, delay=0.0):
+        def run(*args):
+            time.sleep(delay)
+            with lock:
+                calls.append(name)
+            return value
+        return run
+
+    manager._run_speculative_retrieval = stage("retrieval", None)
+    manager._run_summarizer = stage("summary", "Customer cannot connect to Wi-Fi.")
+    manager._run_action_extractor = stage("actions", "- Escalate to tier 2 network specialist")
+    manager._run_resolution_finder = stage("resolution", "Reset network permissions.", delay=0.2)
+    manager._run_time_estimator = stage("eta", "Under 4 hours", delay=0.2)
+    manager._run_escalation_router = stage("routing", "TechSupportTeam", delay=0.2)
+    manager._run_dispatcher = stage("response", '{"reply": "Please reset permissions.", "status": "continue"}')
+    return manager
+
+
+def test_parallel_matches_sequential():
+    sequential_calls, parallel_calls = [], []
+    sequential = _stub_manager(True, sequential_calls)
+    parallel = _stub_manager(False, parallel_calls)
+
+    start = time.perf_counter()
+    expected = sequential.process_customer_message("My app says no internet")
+    sequential_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = parallel.process_customer_message("My app says no internet")
+    parallel_elapsed = time.perf_counter() - start
+
+    assert result == expected
+    assert vars(parallel.state).keys() == vars(sequential.state).keys()
+    for field in ("current_summary", "current_actions", "current_resolution",
+                  "current_routing", "current_eta", "status"):
+        assert getattr(parallel.state, field) == getattr(sequential.state, field)
+    assert sorted(parallel_calls) == sorted(sequential_calls)
+    assert parallel_calls[-1] == "response"
+    # resolution, eta and routing overlap, so the turn costs one slow stage instead of three
+    assert parallel_elapsed < sequential_elapsed - 0.2
+
+
+def test_failed_stage_leaves_same_partial_state():
+    for sequential in (True, False):
+        manager = _stub_manager(sequential, [])
+
+        def fail(*args):
+            raise RuntimeError("LLM unavailable")
+
+        manager._run_resolution_finder = fail
+        result = manager.process_customer_message("My app says no internet")
+
+        assert result["status"] == "error"
+        assert manager.state.current_actions is not None
+        assert manager.state.current_resolution is None
+        # ETA finishes after the failed resolution stage in canonical order, so it is never committed
+        assert manager.state.current_eta is None
+
+
+def test_on_stage_reports_each_stage():
+    events = []
+    manager = _stub_manager(False, [])
+    manager.process_customer_message("My app says no internet", on_stage=lambda stage, value: events.append(stage))
+
+    assert sorted(events) == sorted(["summary", "actions", "resolution", "eta", "routing"])
+    assert events[:2] == ["summary", "actions"]
+
+
+def test_context_mode_injects_retrieved_passages(monkeypatch):
+    class FakeTool:
+        def search_many(self, queries):
+            self.queries = queries
+            return [[Document(page_content="Reset network permissions.")],
+                    [Document(page_content="Reset network permissions."),
+                     Document(page_content="Escalate to tier 2.")]]
+
+    tool = FakeTool()
+    monkeypatch.setattr(registry, "get_vector_tool", lambda: tool)
+    manager = WorkflowManager(sequential=True, resolution_retrieval="context")
+
+    context = manager._retrieve_context("Wi-Fi issue", "- Escalate")
+    assert tool.queries == ["Wi-Fi issue", "- Escalate"]
+    assert context == "[1] Reset network permissions.\n\n[2] Escalate to tier 2."
+
+
+def test_first_turn_reuses_speculative_hits(monkeypatch):
+    monkeypatch.setattr(registry, "get_vector_tool", lambda: None)
+    manager = WorkflowManager(sequential=True, resolution_retrieval="context")
+    manager.state.add_customer_message("My app says no internet")
+
+    speculative = [Document(page_content="Reset network permissions.")]
+    assert manager._retrieve_context("Wi-Fi issue", "- Escalate", speculative) == "[1] Reset network permissions."
+
+
+def test_kickoff_uses_configured_task_runner(monkeypatch):
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "0")
+    task = SimpleNamespace(description="Summarize", expected_output="A summary",
+                           agent=SimpleNamespace(role="Summarizer"))
+    registry.set_task_runner(lambda t: f"ran {t.agent.role}")
+    try:
+        assert WorkflowManager(sequential=True)._kickoff(task) == "ran Summarizer"
+    finally:
+        registry.set_task_runner(None)
+
+
+def test_llm_cache_key_follows_agent_definition_and_knowledge_base(tmp_path, monkeypatch):
+    cache = LLMResponseCache(str(tmp_path / "llm_cache.db"))
+    monkeypatch.setattr(registry, "get_llm_cache", lambda: cache)
+    monkeypatch.setenv("KB_PERSIST_DIRECTORY", str(tmp_path / "kb"))
+    calls = []
+    registry.set_task_runner(lambda task: calls.append(task) or f"answer {len(calls)}")
+
+    def task(backstory, tools=()):
+        agent = SimpleNamespace(role="Resolver", goal="Resolve", backstory=backstory, tools=list(tools), llm=None)
+        return SimpleNamespace(agent=agent, description="Fix Wi-Fi", expected_output="Steps")
+
+    try:
+        manager = WorkflowManager()
+        assert manager._kickoff(task("Wiki search engine")) == "answer 1"
+        assert manager._kickoff(task("Wiki search engine")) == "answer 1"
+        assert manager._kickoff(task("Network engineer")) == "answer 2"
+
+        tool = SimpleNamespace(name="VectorSearchTool")
+        assert manager._kickoff(task("Wiki search engine", [tool])) == "answer 3"
+        assert manager._kickoff(task("Wiki search engine", [tool])) == "answer 3"
+        registry.notify_knowledge_base_rebuilt(str(tmp_path / "kb"))
+        assert manager._kickoff(task("Wiki search engine", [tool])) == "answer 4"
+        # Agents without tools do not depend on the knowledge base
+        assert manager._kickoff(task("Wiki search engine")) == "answer 1"
+    finally:
+        registry.set_task_runner(None)
+
+
+def test_stage_failing_while_earlier_stages_run_matches_sequential_state():
+    states = []
+    for sequential in (True, False):
+        manager = _stub_manager(sequential, [])
+
+        def fail(*args):
+            raise RuntimeError("routing rules unavailable")
+
+        # Routing fails at once while the slower resolution and ETA stages are still running
+        manager._run_routing = fail
+        result = manager.process_customer_message("My app says no internet")
+
+        assert result["status"] == "error"
+        assert "routing rules unavailable" in str(result.get("error", result))
+        states.append({field: getattr(manager.state, field) for field in (
+            "current_summary", "current_actions", "current_resolution", "current_eta", "current_routing")})
+
+    assert states[0] == states[1]
+    assert states[1]["current_resolution"] == "Reset network permissions."
+    assert states[1]["current_eta"] == "Under 4 hours"
+    assert states[1]["current_routing"] is None
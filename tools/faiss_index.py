@@ -0,0 +1,301 @@
+# tools/faiss_index.py
+
+import json
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+
+from core import registry
+from tools.knowledge_base_loader import load_split_documents
+from tools.lexical_index import LexicalIndex
+from tools.ticket_documents import _ticket_conditions
+
+INDEX_FILE = "index.faiss"
+DOCUMENTS_FILE = "documents.jsonl"
+OFFSETS_FILE = "offsets.npy"
+FILTER_COLUMNS_FILE = "filter_columns.npz"
+CONFIG_FILE = "config.json"
+
+# Metadata keys the ticket filters test, stored column-wise for filtered search
+STRING_FILTER_KEYS = ("doc_type", "resolution_status", "issue_category", "priority")
+DATE_FILTER_KEY = "resolution_date"
+
+QUANTIZERS = {
+    "fp16": faiss.ScalarQuantizer.QT_fp16,
+    "int8": faiss.ScalarQuantizer.QT_8bit,
+}
+
+
+def _new_index(dim: int, count: int, mode: str, quantization: str):
+    """Create an (untrained) inner-product index for normalised vectors"""
+    metric = faiss.METRIC_INNER_PRODUCT
+    if quantization not in QUANTIZERS and quantization != "fp32":
+        raise ValueError(f"Unknown quantization: {quantization}")
+
+    if mode == "flat":
+        if quantization == "fp32":
+            return faiss.IndexFlatIP(dim)
+        return faiss.IndexScalarQuantizer(dim, QUANTIZERS[quantization], metric)
+    if mode == "hnsw":
+        if quantization == "fp32":
+            return faiss.IndexHNSWFlat(dim, 32, metric)
+        return faiss.IndexHNSWSQ(dim, QUANTIZERS[quantization], 32, metric)
+    if mode == "ivf":
+        # ~39 training points per list keeps k-means well conditioned
+        nlist = max(1, min(int(4 * np.sqrt(count)), count // 39))
+        coarse = faiss.IndexFlatIP(dim)
+        if quantization == "fp32":
+            return faiss.IndexIVFFlat(coarse, dim, nlist, metric)
+        return faiss.IndexIVFScalarQuantizer(coarse, dim, nlist, QUANTIZERS[quantization], metric)
+    raise ValueError(f"Unknown index mode: {mode}")
+
+
+def _filter_columns(metadatas: Iterable[dict]) -> Dict[str, np.ndarray]:
+    """
+    One array per filterable metadata key, indexed by document position.
+    Missing strings are empty and missing dates 0, so no condition matches them.
+    """
+    strings = {key: [] for key in STRING_FILTER_KEYS}
+    dates = []
+    for metadata in metadatas:
+        for key, values in strings.items():
+            values.append(str(metadata.get(key) or ""))
+        dates.append(metadata.get(DATE_FILTER_KEY) or 0)
+    columns = {key: np.array(values, dtype=str) for key, values in strings.items()}
+    columns[DATE_FILTER_KEY] = np.array(dates, dtype="int64")
+    return columns
+
+
+def _write_atomically(path: str, write: Callable[[str], None]):
+    """Write a file through ``write(tmp_path)`` and move it over ``path`` in one step"""
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def build_faiss_index(
+    index_directory: str = "embeddings/faiss_index",
+    conversations_dir: str = "data/conversations",
+    historical_csv: str = "data/historical/historical_tickets.csv",
+    kb_file: str = "data/knowledge_base/knowledge_base.txt",
+    mode: str = "flat",
+    quantization: str = "fp16"
+):
+    """
+    Build a FAISS index from the same documents as build_vector_db.
+
+    Args:
+        mode: 'flat' (exact), 'ivf' or 'hnsw' (approximate, for large corpora)
+        quantization: 'fp16', 'int8' or 'fp32' vector storage
+    """
+    os.makedirs(index_directory, exist_ok=True)
+    docs = load_split_documents(conversations_dir, historical_csv, kb_file)
+    if not docs:
+        raise ValueError("No documents to index")
+
+    vectors = np.asarray(
+        registry.get_embeddings().embed_documents([doc.page_content for doc in docs]),
+        dtype="float32"
+    )
+    faiss.normalize_L2(vectors)
+
+    index = _new_index(vectors.shape[1], len(docs), mode, quantization)
+    if not index.is_trained:
+        index.train(vectors)
+    index.add(vectors)
+
+    # Every file is written next to its target and swapped in with os.replace,
+    # so serving processes that have the old files mapped keep reading them
+    # intact; offsets and config go last
+    def write_index(tmp_path):
+        faiss.write_index(index, tmp_path)
+
+    # Documents are stored as JSON lines plus byte offsets so searches can read
+    # just the hits from a memory-mapped file
+    offsets = np.zeros(len(docs) + 1, dtype="int64")
+
+    def write_documents(tmp_path):
+        with open(tmp_path, "wb") as f:
+            for i, doc in enumerate(docs):
+                line = json.dumps({"text": doc.page_content, "metadata": doc.metadata}).encode("utf-8") + b"\n"
+                f.write(line)
+                offsets[i + 1] = offsets[i] + len(line)
+
+    def write_offsets(tmp_path):
+        with open(tmp_path, "wb") as f:
+            np.save(f, offsets)
+
+    def write_filter_columns(tmp_path):
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **_filter_columns(doc.metadata for doc in docs))
+
+    def write_config(tmp_path):
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"mode": mode, "quantization": quantization, "count": len(docs),
+                       "dim": int(vectors.shape[1])}, f, indent=2)
+
+    _write_atomically(os.path.join(index_directory, INDEX_FILE), write_index)
+    _write_atomically(os.path.join(index_directory, DOCUMENTS_FILE), write_documents)
+
+    lexical = LexicalIndex()
+    for i, doc in enumerate(docs):
+        lexical.add(str(i), doc.page_content, doc.metadata)
+    lexical.save(index_directory)
+
+    _write_atomically(os.path.join(index_directory, FILTER_COLUMNS_FILE), write_filter_columns)
+    _write_atomically(os.path.join(index_directory, OFFSETS_FILE), write_offsets)
+    _write_atomically(os.path.join(index_directory, CONFIG_FILE), write_config)
+
+    registry.notify_knowledge_base_rebuilt(index_directory)
+    print(f"✅ FAISS index ({mode}, {quantization}) with {len(docs)} chunks created at: {index_directory}")
+
+
+class FaissVectorStore:
+    """
+    Read-only FAISS index opened with memory mapping, so several worker
+    processes share one copy of the vectors and documents via the page cache.
+
+    Filtered searches evaluate the ticket filters against per-key metadata
+    columns written at build time, and keep the resulting ID selector for
+    the most recent filters, so a repeated filter costs nothing extra.
+    """
+
+    selector_cache_size = 32
+
+    def __init__(self, index_directory: str = "embeddings/faiss_index",
+                 nprobe: int = 8, ef_search: int = 64):
+        index_path = os.path.join(index_directory, INDEX_FILE)
+        try:
+            self.index = faiss.read_index(index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        except RuntimeError:
+            # Not every index type can be memory mapped by every FAISS build
+            self.index = faiss.read_index(index_path)
+        if hasattr(self.index, "nprobe"):
+            self.index.nprobe = nprobe
+        hnsw = getattr(self.index, "hnsw", None)
+        if hnsw is not None:
+            hnsw.efSearch = ef_search
+
+        self.offsets = np.load(os.path.join(index_directory, OFFSETS_FILE), mmap_mode="r")
+        self._documents_file = open(os.path.join(index_directory, DOCUMENTS_FILE), "rb")
+        self._documents = mmap.mmap(self._documents_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.index.ntotal != len(self.offsets) - 1 or int(self.offsets[-1]) != len(self._documents):
+            # Opened between the file swaps of a rebuild; the next access reopens it
+            self._documents.close()
+            self._documents_file.close()
+            raise RuntimeError(f"FAISS index in {index_directory} is being rebuilt, files do not match yet")
+        self.embeddings = registry.get_embeddings()
+        self._index_directory = index_directory
+        self._columns: Optional[Dict[str, np.ndarray]] = None
+        self._selectors: "OrderedDict[tuple, Tuple[int, object]]" = OrderedDict()
+        self._filter_lock = threading.Lock()
+
+    def _filter_columns(self) -> Dict[str, np.ndarray]:
+        if self._columns is None:
+            path = os.path.join(self._index_directory, FILTER_COLUMNS_FILE)
+            if not os.path.exists(path):
+                raise RuntimeError(
+                    f"FAISS index in {self._index_directory} has no {FILTER_COLUMNS_FILE}; "
+                    "rebuild the index to filter by metadata"
+                )
+            with np.load(path, allow_pickle=False) as data:
+                columns = {key: data[key] for key in data.files}
+            if len(columns[DATE_FILTER_KEY]) != self.index.ntotal:
+                raise RuntimeError(f"FAISS index in {self._index_directory} is being rebuilt, files do not match yet")
+            self._columns = columns
+        return self._columns
+
+    def _allowed_positions(self, filters: dict) -> np.ndarray:
+        """Positions of documents passing ``filters``, the vectorised form of ticket_documents.matches"""
+        columns = self._filter_columns()
+        is_ticket = columns["doc_type"] == "ticket"
+        mask = is_ticket.copy()
+        for key, (op, value) in _ticket_conditions(filters).items():
+            mask &= (columns[key] == value) if op == "$eq" else (columns[key] >= value)
+        if not filters.get("tickets_only"):
+            mask |= ~is_ticket
+        return np.flatnonzero(mask).astype("int64")
+
+    def _selector(self, filters: dict) -> Tuple[int, object]:
+        """``(allowed count, IDSelectorBatch)`` for ``filters``, cached per distinct filter"""
+        # Keyed by the resolved conditions, so max_age_days follows the calendar
+        key = (tuple(sorted(_ticket_conditions(filters).items())), bool(filters.get("tickets_only")))
+        with self._filter_lock:
+            cached = self._selectors.get(key)
+            if cached is not None:
+                self._selectors.move_to_end(key)
+                return cached
+            allowed = self._allowed_positions(filters)
+            cached = (len(allowed), faiss.IDSelectorBatch(allowed) if len(allowed) else None)
+            self._selectors[key] = cached
+            if len(self._selectors) > self.selector_cache_size:
+                self._selectors.popitem(last=False)
+        return cached
+
+    def _document(self, position: int) -> Document:
+        start, end = int(self.offsets[position]), int(self.offsets[position + 1])
+        record = json.loads(self._documents[start:end])
+        return Document(page_content=record["text"], metadata=record["metadata"])
+
+    def get_by_ids(self, ids: List[str]) -> List[Document]:
+        """Documents by ID; the IDs of this store (and its lexical index) are positions"""
+        return [self._document(int(doc_id)) for doc_id in ids]
+
+    def search_by_vectors(self, vectors, k: int = 3,
+                          filter: Optional[dict] = None) -> List[List[Tuple[Document, float]]]:
+        """
+        Search several query embeddings in one FAISS call; ``filter`` takes the
+        ticket filters of tools.ticket_documents
+        """
+        queries = np.asarray(vectors, dtype="float32").reshape(len(vectors), -1)
+        faiss.normalize_L2(queries)
+        if filter:
+            # Restrict the search to matching documents up front rather than post-filtering
+            count, selector = self._selector(filter)
+            if not count:
+                return [[] for _ in range(len(queries))]
+            params = faiss.SearchParameters(sel=selector)
+            scores, positions = self.index.search(queries, k, params=params)
+        else:
+            scores, positions = self.index.search(queries, k)
+        return [
+            [
+                (self._document(int(position)), float(score))
+                for score, position in zip(row_scores, row_positions)
+                if position >= 0
+            ]
+            for row_scores, row_positions in zip(scores, positions)
+        ]
+
+    def search_by_vector(self, vector, k: int = 3, filter: Optional[dict] = None) -> List[Tuple[Document, float]]:
+        """Search by embedding; ``filter`` takes the ticket filters of tools.ticket_documents"""
+        return self.search_by_vectors([vector], k, filter)[0]
+
+    def similarity_search_with_score(self, query: str, k: int = 3,
+                                     filter: Optional[dict] = None) -> List[Tuple[Document, float]]:
+        return self.search_by_vector(self.embeddings.embed_query(query), k, filter)
+
+    def similarity_search(self, query: str, k: int = 3, filter: Optional[dict] = None) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, filter)]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the FAISS knowledge base index")
+    parser.add_argument("--index-directory", default="embeddings/faiss_index")
+    parser.add_argument("--mode", choices=["flat", "ivf", "hnsw"], default="flat")
+    parser.add_argument("--quantization", choices=["fp16", "int8", "fp32"], default="fp16")
+    args = parser.parse_args()
+
+    build_faiss_index(index_directory=args.index_directory, mode=args.mode, quantization=args.quantization)
@@ -1,52 +1,271 @@
 # tools/knowledge_base_loader.py
 
+import hashlib
+import json
 import os
+from collections import Counter
+from typing import Dict, Iterator, List
 from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.document_loaders import TextLoader, CSVLoader
+from langchain_community.document_loaders import TextLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
+from core import registry
+from tools.lexical_index import LexicalIndex
+from tools.ticket_documents import iter_ticket_documents
+
+# Per-source content hashes and chunk IDs of what is currently in the vector DB
+MANIFEST_FILE = "kb_manifest.json"
+# Streamed sources keep their chunk IDs in a file here, one per line, instead
+# of inline in the manifest
+MANIFEST_CHUNKS_DIR = "kb_manifest_chunks"
 
-def build_vector_db(
-    persist_directory: str = "embeddings/chroma_db",
-    conversations_dir: str = "data/conversations",
-    historical_csv: str = "data/historical/historical_tickets.csv",
-    kb_file: str = "data/knowledge_base/knowledge_base.txt"
-):
-    documents = []
 
-    # Load and split KB file (if exists)
+def _discover_sources(conversations_dir: str, historical_csv: str, kb_file: str) -> List[str]:
+    """List every source document that belongs in the vector DB"""
+    sources = []
+
+    # KB file (if exists)
     if os.path.exists(kb_file):
-        print(f"🔍 Loading KB: {kb_file}")
-        documents += TextLoader(kb_file).load()
+        sources.append(kb_file)
 
-    # Load and split all sample conversations
-    for filename in os.listdir(conversations_dir):
+    # All sample conversations
+    for filename in sorted(os.listdir(conversations_dir)):
         if filename.endswith(".txt"):
-            path = os.path.join(conversations_dir, filename)
-            print(f"📄 Indexing: {filename}")
-            documents += TextLoader(path).load()
+            sources.append(os.path.join(conversations_dir, filename))
 
-    # Load historical ticket CSV (if exists)
+    # Historical ticket CSV (if exists)
     if os.path.exists(historical_csv):
-        print(f"📊 Loading historical tickets: {historical_csv}")
-        documents += CSVLoader(historical_csv).load()
+        sources.append(historical_csv)
+
+    return sources
+
+
+def _file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _load_and_split(source: str, splitter) -> list:
+    """
+    Load a source document and split it for embedding.
+    Historical tickets are kept as one document per row with typed metadata.
+    """
+    if source.endswith(".csv"):
+        print(f"📊 Loading historical tickets: {source}")
+        return list(iter_ticket_documents(source))
+    print(f"📄 Indexing: {source}")
+    documents = TextLoader(source).load()
+    for document in documents:
+        document.metadata["doc_type"] = "document"
+    return splitter.split_documents(documents)
+
+
+def load_split_documents(
+    conversations_dir: str = "data/conversations",
+    historical_csv: str = "data/historical/historical_tickets.csv",
+    kb_file: str = "data/knowledge_base/knowledge_base.txt"
+) -> list:
+    """Load and split every source document exactly as build_vector_db does"""
+    splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
+    docs = []
+    for source in _discover_sources(conversations_dir, historical_csv, kb_file):
+        docs += _load_and_split(source, splitter)
+    return docs
+
+
+def _chunk_ids(source: str, chunks: list) -> List[str]:
+    """
+    Content-addressed chunk IDs: an unchanged chunk keeps its ID across
+    rebuilds, so only new or edited chunks need embedding.
+    """
+    seen = Counter()
+    ids = []
+    for chunk in chunks:
+        text = chunk.page_content
+        seen[text] += 1
+        ids.append(_chunk_id(source, seen[text], text))
+    return ids
+
+
+def _chunk_id(source: str, occurrence: int, text: str) -> str:
+    """ID of the ``occurrence``-th chunk of ``source`` with this exact text"""
+    key = f"{source}\0{occurrence}\0{text}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _load_manifest(persist_directory: str) -> Dict[str, dict]:
+    path = os.path.join(persist_directory, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_manifest(persist_directory: str, manifest: Dict[str, dict]):
+    path = os.path.join(persist_directory, MANIFEST_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+    # Chunk files of sources that were removed or are now listed inline
+    chunks_dir = os.path.join(persist_directory, MANIFEST_CHUNKS_DIR)
+    if os.path.isdir(chunks_dir):
+        referenced = {entry.get("chunks_file") for entry in manifest.values()}
+        for name in os.listdir(chunks_dir):
+            if os.path.join(MANIFEST_CHUNKS_DIR, name) not in referenced:
+                os.remove(os.path.join(chunks_dir, name))
+
+
+def _chunks_file(source: str) -> str:
+    """Chunk ID file of a streamed source, relative to the persist directory"""
+    return os.path.join(MANIFEST_CHUNKS_DIR, hashlib.sha256(source.encode("utf-8")).hexdigest() + ".txt")
+
+
+def _manifest_chunks(persist_directory: str, entry: dict) -> Iterator[str]:
+    """Chunk IDs of a manifest entry, read lazily when they are kept in a file"""
+    if "chunks_file" not in entry:
+        yield from entry["chunks"]
+        return
+    with open(os.path.join(persist_directory, entry["chunks_file"]), "r", encoding="utf-8") as f:
+        for line in f:
+            yield line.rstrip("\n")
+
+
+def _stale_chunk_ids(persist_directory: str, previous: Dict[str, dict], manifest: Dict[str, dict]) -> List[str]:
+    """Chunk IDs listed in the ``previous`` manifest that ``manifest`` no longer has"""
+    current = {
+        chunk_id for entry in manifest.values() for chunk_id in _manifest_chunks(persist_directory, entry)
+    }
+    return [
+        chunk_id
+        for entry in previous.values()
+        for chunk_id in _manifest_chunks(persist_directory, entry)
+        if chunk_id not in current
+    ]
+
+
+def build_vector_db(
+    persist_directory: str = "embeddings/chroma_db",
+    conversations_dir: str = "data/conversations",
+    historical_csv: str = "data/historical/historical_tickets.csv",
+    kb_file: str = "data/knowledge_base/knowledge_base.txt",
+    incremental: bool = False
+):
+    """
+    Build the vector DB from the knowledge base, sample conversations and historical tickets.
+
+    With ``incremental=True`` the manifest of content hashes from the previous
+    build is used to skip unchanged files, embed only new or changed chunks and
+    delete chunks whose source disappeared or changed. A full rebuild into an
+    existing directory re-embeds everything and also deletes the chunks the
+    new build no longer has.
+    """
+    os.makedirs(persist_directory, exist_ok=True)
+    sources = _discover_sources(conversations_dir, historical_csv, kb_file)
 
     # Split for embedding
     splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-    docs = splitter.split_documents(documents)
 
     # Embeddings model
-    embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+    embeddings = registry.get_embeddings()
+
+    if not incremental:
+        previous = _load_manifest(persist_directory)
+        docs, ids, manifest = [], [], {}
+        lexical = LexicalIndex()
+        for source in sources:
+            chunks = _load_and_split(source, splitter)
+            chunk_ids = _chunk_ids(source, chunks)
+            docs += chunks
+            ids += chunk_ids
+            manifest[source] = {"hash": _file_hash(source), "chunks": chunk_ids}
+            for chunk, chunk_id in zip(chunks, chunk_ids):
+                lexical.add(chunk_id, chunk.page_content, chunk.metadata)
+
+        # Create vector DB (chunks with the same ID are overwritten in place)
+        vectorstore = Chroma.from_documents(
+            documents=docs,
+            embedding=embeddings,
+            ids=ids,
+            persist_directory=persist_directory
+        )
+        if previous:
+            stale_ids = _stale_chunk_ids(persist_directory, previous, manifest)
+        else:
+            # No manifest: the directory is new, or was built with random IDs
+            current = set(ids)
+            stale_ids = [chunk_id for chunk_id in vectorstore.get(include=[])["ids"] if chunk_id not in current]
+        if stale_ids:
+            print(f"🗑️ Removing {len(stale_ids)} chunks no longer in the sources")
+            vectorstore.delete(ids=stale_ids)
+        vectorstore.persist()
+    else:
+        manifest = _load_manifest(persist_directory)
+        vectorstore = Chroma(persist_directory=persist_directory, embedding_function=embeddings)
+        stale_ids, new_docs, new_ids = [], [], []
+        lexical = LexicalIndex.load(persist_directory)
+        # Older stores have no lexical index yet; tokenizing every source is cheap next to embedding
+        rebuild_lexical = lexical is None
+        if rebuild_lexical:
+            lexical = LexicalIndex()
+
+        # Sources that no longer exist
+        for source in set(manifest) - set(sources):
+            print(f"🗑️ Removing: {source}")
+            stale_ids += _manifest_chunks(persist_directory, manifest.pop(source))
+
+        for source in sources:
+            file_hash = _file_hash(source)
+            previous = manifest.get(source)
+            if previous is not None and previous["hash"] == file_hash:
+                if rebuild_lexical:
+                    chunks = _load_and_split(source, splitter)
+                    for chunk, chunk_id in zip(chunks, _chunk_ids(source, chunks)):
+                        lexical.add(chunk_id, chunk.page_content, chunk.metadata)
+                continue
 
-    # Create vector DB
-    Chroma.from_documents(
-        documents=docs,
-        embedding=embeddings,
-        persist_directory=persist_directory
-    ).persist()
+            chunks = _load_and_split(source, splitter)
+            chunk_ids = _chunk_ids(source, chunks)
+            known = set(_manifest_chunks(persist_directory, previous)) if previous else set()
+            current = set(chunk_ids)
+            stale_ids += [chunk_id for chunk_id in known if chunk_id not in current]
+            for chunk, chunk_id in zip(chunks, chunk_ids):
+                lexical.add(chunk_id, chunk.page_content, chunk.metadata)
+                if chunk_id not in known:
+                    new_docs.append(chunk)
+                    new_ids.append(chunk_id)
+            manifest[source] = {"hash": file_hash, "chunks": chunk_ids}
+
+        if not stale_ids and not new_docs and not rebuild_lexical:
+            print(f"✅ Vector DB already up to date: {persist_directory}")
+            return
+
+        for chunk_id in stale_ids:
+            lexical.remove(chunk_id)
+        if stale_ids:
+            vectorstore.delete(ids=stale_ids)
+        if new_docs:
+            vectorstore.add_documents(new_docs, ids=new_ids)
+        vectorstore.persist()
+        print(f"🔁 Embedded {len(new_docs)} new chunks, removed {len(stale_ids)} stale chunks")
+
+    _save_manifest(persist_directory, manifest)
+    lexical.save(persist_directory)
+
+    # Cached answers may reference the old knowledge base
+    registry.notify_knowledge_base_rebuilt(persist_directory)
 
     print(f"✅ Vector DB created at: {persist_directory}")
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the knowledge base vector DB")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only embed new or changed chunks and drop removed ones")
+    args = parser.parse_args()
+
     os.makedirs("embeddings/chroma_db", exist_ok=True)
-    build_vector_db()
+    build_vector_db(incremental=args.incremental)
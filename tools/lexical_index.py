@@ -0,0 +1,235 @@
+# tools/lexical_index.py
+
+import json
+import math
+import os
+import re
+import sqlite3
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+LEXICAL_INDEX_FILE = "lexical_index.json"
+
+# Keeps error codes and identifiers like "ERR_404" or "v2.1" together
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[._-][a-z0-9]+)*")
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from has have how i in is it its me my "
+    "no not of on or our so that the their this to was we what when with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class LexicalIndex:
+    """
+    BM25 inverted index over document chunks, built at ingest time next to the
+    embeddings and persisted as JSON so queries never re-tokenize the corpus.
+
+    Only postings, lengths and metadata are kept; the text of a hit is read
+    from the vector store by its ID, so every worker loading the index does
+    not hold a second copy of the corpus.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.documents: Dict[str, dict] = {}
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.total_length = 0
+        # doc_id -> terms, derived from the postings on the first removal
+        self._terms: Optional[Dict[str, List[str]]] = None
+
+    def add(self, doc_id: str, text: str, metadata: Optional[dict] = None):
+        if doc_id in self.documents:
+            self.remove(doc_id)
+        counts = Counter(tokenize(text))
+        length = sum(counts.values())
+        self.documents[doc_id] = {"metadata": metadata or {}, "length": length}
+        self.total_length += length
+        for term, tf in counts.items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+        if self._terms is not None:
+            self._terms[doc_id] = list(counts)
+
+    def remove(self, doc_id: str):
+        doc = self.documents.pop(doc_id, None)
+        if doc is None:
+            return
+        self.total_length -= doc["length"]
+        for term in self._doc_terms().pop(doc_id, ()):
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self.postings[term]
+
+    def _doc_terms(self) -> Dict[str, List[str]]:
+        if self._terms is None:
+            terms: Dict[str, List[str]] = {doc_id: [] for doc_id in self.documents}
+            for term, postings in self.postings.items():
+                for doc_id in postings:
+                    terms.setdefault(doc_id, []).append(term)
+            self._terms = terms
+        return self._terms
+
+    def search(self, query: str, k: int = 10,
+               predicate: Optional[Callable[[dict], bool]] = None) -> List[Tuple[str, float, float]]:
+        """
+        Return up to ``k`` ``(doc_id, bm25_score, coverage)`` tuples, best first.
+        ``coverage`` is the fraction of distinct query terms the document contains.
+        Documents whose metadata fails ``predicate`` are skipped before scoring.
+        """
+        terms = set(tokenize(query))
+        if not terms or not self.documents:
+            return []
+        n = len(self.documents)
+        avg_length = self.total_length / n
+        scores: Dict[str, float] = {}
+        matched: Counter = Counter()
+        allowed: Dict[str, bool] = {}
+        for term in terms:
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings.items():
+                if predicate is not None:
+                    if doc_id not in allowed:
+                        allowed[doc_id] = predicate(self.documents[doc_id]["metadata"])
+                    if not allowed[doc_id]:
+                        continue
+                length = self.documents[doc_id]["length"]
+                norm = tf + self.k1 * (1 - self.b + self.b * length / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+                matched[doc_id] += 1
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(doc_id, score, matched[doc_id] / len(terms)) for doc_id, score in ranked]
+
+    def save(self, directory: str):
+        path = os.path.join(directory, LEXICAL_INDEX_FILE)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "k1": self.k1,
+                "b": self.b,
+                "documents": self.documents,
+                "postings": self.postings,
+                "total_length": self.total_length,
+            }, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["LexicalIndex"]:
+        """Load the index saved in ``directory``, or None if there is none"""
+        path = os.path.join(directory, LEXICAL_INDEX_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        index = cls(k1=data["k1"], b=data["b"])
+        index.documents = data["documents"]
+        index.postings = data["postings"]
+        index.total_length = data["total_length"]
+        return index
+
+
+class LexicalIndexBuilder:
+    """
+    LexicalIndex under construction whose documents and postings are spilled
+    to a scratch SQLite file as they are added, for corpora too large to index
+    in memory. ``save`` streams them into the same JSON file LexicalIndex
+    loads, and ``close`` deletes the scratch file.
+    """
+
+    def __init__(self, path: str, k1: float = 1.5, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        if os.path.exists(path):
+            os.remove(path)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=OFF")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute(
+            "CREATE TABLE documents (doc_id TEXT PRIMARY KEY, metadata TEXT NOT NULL, length INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE postings (term TEXT NOT NULL, doc_id TEXT NOT NULL, tf INTEGER NOT NULL, "
+            "PRIMARY KEY (term, doc_id))"
+        )
+        self._conn.execute("CREATE INDEX idx_postings_doc_id ON postings (doc_id)")
+
+    def add(self, doc_id: str, text: str, metadata: Optional[dict] = None):
+        self.remove(doc_id)
+        counts = Counter(tokenize(text))
+        self._conn.execute(
+            "INSERT INTO documents (doc_id, metadata, length) VALUES (?, ?, ?)",
+            (doc_id, json.dumps(metadata or {}), sum(counts.values()))
+        )
+        self._conn.executemany(
+            "INSERT INTO postings (term, doc_id, tf) VALUES (?, ?, ?)",
+            [(term, doc_id, tf) for term, tf in counts.items()]
+        )
+
+    def add_index(self, index: LexicalIndex):
+        """Start from the contents of an existing index"""
+        self.k1, self.b = index.k1, index.b
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO documents (doc_id, metadata, length) VALUES (?, ?, ?)",
+            ((doc_id, json.dumps(doc["metadata"]), doc["length"]) for doc_id, doc in index.documents.items())
+        )
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO postings (term, doc_id, tf) VALUES (?, ?, ?)",
+            ((term, doc_id, tf) for term, postings in index.postings.items() for doc_id, tf in postings.items())
+        )
+
+    def remove(self, doc_id: str):
+        self._conn.execute("DELETE FROM documents WHERE doc_id = ?", (doc_id,))
+        self._conn.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+
+    def commit(self):
+        self._conn.commit()
+
+    def save(self, directory: str):
+        """Write the index in LexicalIndex's format without loading it into memory"""
+        self.commit()
+        (total_length,) = self._conn.execute("SELECT COALESCE(SUM(length), 0) FROM documents").fetchone()
+        path = os.path.join(directory, LEXICAL_INDEX_FILE)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(f'{{"k1": {json.dumps(self.k1)}, "b": {json.dumps(self.b)}, '
+                    f'"total_length": {total_length}, "documents": {{')
+            rows = self._conn.execute("SELECT doc_id, metadata, length FROM documents ORDER BY doc_id")
+            for i, (doc_id, metadata, length) in enumerate(rows):
+                f.write(f'{", " if i else ""}{json.dumps(doc_id)}: {{"metadata": {metadata}, "length": {length}}}')
+            f.write('}, "postings": {')
+            current = None
+            rows = self._conn.execute("SELECT term, doc_id, tf FROM postings ORDER BY term")
+            for term, doc_id, tf in rows:
+                if term != current:
+                    f.write(("}, " if current is not None else "") + json.dumps(term) + ": {")
+                    current = term
+                else:
+                    f.write(", ")
+                f.write(f"{json.dumps(doc_id)}: {tf}")
+            f.write(("}" if current is not None else "") + "}}")
+        os.replace(tmp_path, path)
+
+    def close(self):
+        self._conn.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def reciprocal_rank_fusion(rankings: List[Tuple[List[str], float]], rrf_k: int = 60) -> List[str]:
+    """
+    Fuse several ranked lists of keys. Each ranking comes with a weight; a key
+    scores ``sum(weight / (rrf_k + rank))`` over the lists it appears in.
+    """
+    scores: Dict[str, float] = {}
+    for keys, weight in rankings:
+        for rank, key in enumerate(keys, start=1):
+            scores[key] = scores.get(key, 0.0) + weight / (rrf_k + rank)
+    return sorted(scores, key=scores.get, reverse=True)
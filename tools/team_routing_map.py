@@ -1,26 +1,237 @@
 from crewai.tools import tool
 import json
 import os
+import re
+import threading
+import time
+import warnings
+from collections import deque
+from typing import Dict, Iterator, List, NamedTuple, Tuple
+
+from core import tracing
+
+DEFAULT_TEAM = "General Support"
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def _normalize(text: str) -> str:
+    """Lowercase and collapse punctuation/underscores, so 'technical_issue' matches 'technical issue'"""
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+class RouteMatch(NamedTuple):
+    team: str
+    score: float
+    # Share of the matched rule weight that went to the chosen team (0 when nothing matched)
+    confidence: float
+    keywords: Tuple[str, ...]
+
+
+class _Rule(NamedTuple):
+    keyword: str
+    team: str
+    weight: float
+    priority: int
+    word_boundary: bool
+    order: int
+
+
+class _Automaton:
+    """Aho-Corasick automaton: one pass over the text finds every keyword, whatever the table size"""
+
+    def __init__(self, patterns: List[str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[List[int]] = [[]]
+        for pattern_id, pattern in enumerate(patterns):
+            state = 0
+            for ch in pattern:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                    self.goto[state][ch] = nxt
+                state = nxt
+            self.out[state].append(pattern_id)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(ch, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield ``(end_index, pattern_id)`` for every occurrence, end index inclusive"""
+        goto, fail, out = self.goto, self.fail, self.out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for pattern_id in out[state]:
+                yield i, pattern_id
+
 
 class TeamRoutingMap:
-    def __init__(self, rules_path: str = "data/team_routing_rules.json"):
+    """
+    Keyword-based routing of action items to internal teams.
+
+    The rules file maps keywords to teams, either ``{"billing": "FinanceTeam"}``
+    or with per-rule options::
+
+        {"rules": {"refund": {"team": "FinanceTeam", "weight": 2, "priority": 1,
+                              "word_boundary": true}},
+         "default_team": "General Support", "word_boundary": false}
+
+    Keywords are compiled into an Aho-Corasick automaton, so matching costs one
+    pass over the action item regardless of the number of rules. A flat file
+    keeps first-match semantics: the earliest matching keyword in the file wins.
+    With ``"rules"`` (or ``"strategy": "weighted"``), every matched keyword adds
+    its weight to its team, and the highest priority, then the highest score,
+    then the earliest rule wins; ``"strategy": "first_match"`` opts out. The
+    file is reloaded when it changes on disk (checked at most every
+    ``reload_interval`` seconds); a failed reload keeps the previous rules,
+    warns, and is kept in ``reload_error``.
+    """
+
+    def __init__(self, rules_path: str = "data/team_routing_rules.json", reload_interval: float = 2.0):
         if not os.path.exists(rules_path):
             raise FileNotFoundError(f"Missing team routing config: {rules_path}")
-        with open(rules_path, "r") as file:
-            self.routing_rules = json.load(file)
+        self.rules_path = rules_path
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._next_check = 0.0
+        self.reload_error = None
+        self._load()
+
+    def _load(self):
+        mtime = os.path.getmtime(self.rules_path)
+        with open(self.rules_path, "r") as file:
+            data = json.load(file)
+
+        structured = isinstance(data.get("rules"), (dict, list))
+        options = data if structured else {"rules": data}
+        strategy = options.get("strategy", "weighted" if structured else "first_match")
+        if strategy not in ("weighted", "first_match"):
+            raise ValueError(f"Unknown routing strategy: {strategy}")
+        default_boundary = bool(options.get("word_boundary", False))
+        entries = options["rules"]
+        if isinstance(entries, dict):
+            entries = [
+                dict(spec, keyword=keyword) if isinstance(spec, dict) else {"keyword": keyword, "team": spec}
+                for keyword, spec in entries.items()
+            ]
+
+        rules: List[_Rule] = []
+        for entry in entries:
+            keywords = entry.get("keywords") or [entry["keyword"]]
+            for keyword in keywords:
+                normalized = _normalize(keyword)
+                if not normalized:
+                    continue
+                rules.append(_Rule(
+                    keyword=normalized,
+                    team=entry["team"],
+                    weight=float(entry.get("weight", 1.0)),
+                    priority=int(entry.get("priority", 0)),
+                    word_boundary=bool(entry.get("word_boundary", default_boundary)),
+                    order=len(rules),
+                ))
+
+        # Rules, automaton and strategy are swapped in as one tuple so concurrent readers never mix tables
+        self._compiled = (rules, _Automaton([rule.keyword for rule in rules]), strategy == "first_match")
+        self.routing_rules = data
+        self.default_team = options.get("default_team", DEFAULT_TEAM)
+        self._mtime = mtime
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        with self._lock:
+            if now < self._next_check:
+                return
+            self._next_check = now + self.reload_interval
+            try:
+                if os.path.getmtime(self.rules_path) != self._mtime:
+                    self._load()
+            except (OSError, ValueError, KeyError) as e:
+                # A half-written or broken file keeps the previous rules in service
+                self.reload_error = e
+                warnings.warn(f"Keeping previous routing rules, could not reload {self.rules_path}: {e}",
+                              RuntimeWarning, stacklevel=3)
+            else:
+                self.reload_error = None
+
+    def _decide(self, hits: List[_Rule], first_match: bool) -> RouteMatch:
+        if not hits:
+            return RouteMatch(self.default_team, 0.0, 0.0, ())
+        scores: Dict[str, float] = {}
+        best: Dict[str, Tuple[int, int]] = {}
+        for rule in hits:
+            scores[rule.team] = scores.get(rule.team, 0.0) + rule.weight
+            priority, order = best.get(rule.team, (rule.priority, rule.order))
+            best[rule.team] = (max(priority, rule.priority), min(order, rule.order))
+        if first_match:
+            team = min(hits, key=lambda rule: rule.order).team
+        else:
+            team = max(scores, key=lambda t: (best[t][0], scores[t], -best[t][1]))
+        total = sum(scores.values())
+        keywords = tuple(rule.keyword for rule in hits if rule.team == team)
+        return RouteMatch(team, scores[team], scores[team] / total if total else 0.0, keywords)
+
+    def _scan(self, text: str, compiled) -> Iterator[Tuple[int, _Rule]]:
+        """Yield ``(start_index, rule)`` for keyword occurrences in normalized text"""
+        rules, automaton, _ = compiled
+        for end, rule_id in automaton.iter_matches(text):
+            rule = rules[rule_id]
+            start = end - len(rule.keyword) + 1
+            if rule.word_boundary:
+                if start > 0 and text[start - 1] != " ":
+                    continue
+                if end + 1 < len(text) and text[end + 1] != " ":
+                    continue
+            yield start, rule
+
+    def _match(self, action_item: str, compiled) -> RouteMatch:
+        seen = {}
+        for _, rule in self._scan(_normalize(action_item), compiled):
+            seen.setdefault(rule.order, rule)
+        return self._decide(list(seen.values()), compiled[2])
+
+    def match(self, action_item: str) -> RouteMatch:
+        """Route one action item, with its score and confidence"""
+        self._maybe_reload()
+        return self._match(action_item, self._compiled)
+
+    def match_bulk(self, action_items: List[str]) -> List[RouteMatch]:
+        """
+        Route many action items against one snapshot of the rules, so a reload
+        never splits a batch. Returns one RouteMatch per item, in order.
+        """
+        self._maybe_reload()
+        compiled = self._compiled
+        return [self._match(item, compiled) for item in action_items]
 
     def get_team_for_action(self, action_item: str) -> str:
-        for keyword, team in self.routing_rules.items():
-            if keyword.lower() in action_item.lower():
-                return team
-        return "General Support"
+        return self.match(action_item).team
 
     def route_bulk(self, action_items: list) -> dict:
-        return {item: self.get_team_for_action(item) for item in action_items}
+        return {item: match.team for item, match in zip(action_items, self.match_bulk(action_items))}
 
     @tool("TeamRouter")
     def route(self, query: str) -> str:
         """
         Routes a single escalation action to the correct internal team using a routing map.
         """
-        return self.get_team_for_action(query)
+        with tracing.span("TeamRouter", "tool", query=query):
+            return self.get_team_for_action(query)
@@ -0,0 +1,110 @@
+# tools/ticket_documents.py
+
+import csv
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, Optional
+
+from langchain_core.documents import Document
+
+# Historical ticket CSV column -> metadata key
+TICKET_COLUMNS = {
+    "Ticket ID": "ticket_id",
+    "Issue Category": "issue_category",
+    "Sentiment": "sentiment",
+    "Priority": "priority",
+    "Resolution Status": "resolution_status",
+}
+DATE_COLUMN = "Date of Resolution"
+
+
+def _date_to_int(value) -> Optional[int]:
+    """Dates are stored as YYYYMMDD integers so vector stores can range-filter them"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        return value.year * 10000 + value.month * 100 + value.day
+    try:
+        return _date_to_int(date.fromisoformat(str(value).strip()))
+    except ValueError:
+        return None
+
+
+def ticket_row_to_document(row: Dict[str, str], source: str, row_number: int) -> Document:
+    """Turn one historical ticket CSV row into a single document with typed metadata"""
+    clean = {(key or "").strip().lstrip("\ufeff"): (value or "").strip() for key, value in row.items()}
+    metadata: Dict[str, Any] = {"source": source, "row": row_number, "doc_type": "ticket"}
+    for column, key in TICKET_COLUMNS.items():
+        if clean.get(column):
+            metadata[key] = clean[column]
+    resolution_date = _date_to_int(clean.get(DATE_COLUMN))
+    if resolution_date is not None:
+        metadata["resolution_date"] = resolution_date
+    page_content = "\n".join(f"{key}: {value}" for key, value in clean.items())
+    return Document(page_content=page_content, metadata=metadata)
+
+
+def iter_ticket_documents(csv_path: str, start_row: int = 0) -> Iterator[Document]:
+    """Stream one document per ticket row without loading the whole file"""
+    with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
+        for row_number, row in enumerate(csv.DictReader(f)):
+            if row_number >= start_row:
+                yield ticket_row_to_document(row, csv_path, row_number)
+
+
+def _ticket_conditions(filters: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalise a filter dict into ``metadata key -> (operator, value)`` conditions"""
+    conditions = {}
+    if filters.get("status"):
+        conditions["resolution_status"] = ("$eq", filters["status"])
+    if filters.get("category"):
+        conditions["issue_category"] = ("$eq", filters["category"])
+    if filters.get("priority"):
+        conditions["priority"] = ("$eq", filters["priority"])
+    since = filters.get("since")
+    if filters.get("max_age_days"):
+        cutoff = date.today() - timedelta(days=int(filters["max_age_days"]))
+        since = max(filter(None, [_date_to_int(since), _date_to_int(cutoff)]))
+    if since:
+        conditions["resolution_date"] = ("$gte", _date_to_int(since))
+    return conditions
+
+
+def build_where(filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Translate ticket filters into a Chroma ``where`` clause.
+
+    Supported filters: ``status``, ``category``, ``priority``, ``since`` (ISO
+    date) and ``max_age_days`` constrain historical tickets. Other documents
+    (knowledge base, sample conversations) still match unless ``tickets_only``
+    is set.
+    """
+    if not filters:
+        return None
+    clauses = [{key: {op: value}} for key, (op, value) in _ticket_conditions(filters).items()]
+    if filters.get("tickets_only") or clauses:
+        clauses.insert(0, {"doc_type": {"$eq": "ticket"}})
+    if not clauses:
+        return None
+    ticket_clause = clauses[0] if len(clauses) == 1 else {"$and": clauses}
+    if filters.get("tickets_only"):
+        return ticket_clause
+    return {"$or": [{"doc_type": {"$ne": "ticket"}}, ticket_clause]}
+
+
+def matches(metadata: Dict[str, Any], filters: Optional[Dict[str, Any]]) -> bool:
+    """Evaluate the same filters as build_where against a metadata dict"""
+    if not filters:
+        return True
+    if metadata.get("doc_type") != "ticket":
+        return not filters.get("tickets_only")
+    for key, (op, value) in _ticket_conditions(filters).items():
+        actual = metadata.get(key)
+        if actual is None:
+            return False
+        if op == "$eq" and actual != value:
+            return False
+        if op == "$gte" and actual < value:
+            return False
+    return True
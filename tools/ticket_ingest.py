@@ -0,0 +1,330 @@
+# tools/ticket_ingest.py
+
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from core import registry
+from tools.knowledge_base_loader import (
+    _chunk_id, _chunks_file, _file_hash, _load_manifest, _manifest_chunks, _save_manifest
+)
+from tools.lexical_index import LexicalIndex, LexicalIndexBuilder
+from tools.ticket_documents import iter_ticket_documents
+
+# Sentinel telling embedding workers there is no more work
+_DONE = object()
+
+JOURNAL_FILE = "ticket_ingest_journal.db"
+LEXICAL_BUILD_FILE = "ticket_ingest_lexical.db"
+
+
+class _Journal:
+    """
+    Per-run scratch SQLite file holding everything that grows with the number
+    of rows: occurrence counts of row texts (keyed by a 16-byte digest) and
+    the chunk IDs in file order.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.exists(path):
+            os.remove(path)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=OFF")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute("CREATE TABLE seen (digest BLOB PRIMARY KEY, count INTEGER NOT NULL)")
+        self._conn.execute("CREATE TABLE chunks (position INTEGER PRIMARY KEY, id TEXT NOT NULL UNIQUE)")
+
+    def occurrence(self, text: str) -> int:
+        """How many rows so far, this one included, had exactly this text"""
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        self._conn.execute(
+            "INSERT INTO seen (digest, count) VALUES (?, 1) "
+            "ON CONFLICT (digest) DO UPDATE SET count = count + 1",
+            (digest,)
+        )
+        return self._conn.execute("SELECT count FROM seen WHERE digest = ?", (digest,)).fetchone()[0]
+
+    def add_chunk(self, doc_id: str):
+        self._conn.execute("INSERT INTO chunks (id) VALUES (?)", (doc_id,))
+
+    def commit(self):
+        self._conn.commit()
+
+    def missing(self, ids: Iterable[str], batch_size: int) -> Iterator[List[str]]:
+        """Stream the IDs of ``ids`` this run did not see, a batch at a time"""
+        ids = iter(ids)
+        while True:
+            batch = list(islice(ids, batch_size))
+            if not batch:
+                return
+            placeholders = ",".join("?" * len(batch))
+            found = {row[0] for row in self._conn.execute(
+                f"SELECT id FROM chunks WHERE id IN ({placeholders})", batch
+            )}
+            stale = [doc_id for doc_id in batch if doc_id not in found]
+            if stale:
+                yield stale
+
+    def write_chunk_ids(self, path: str):
+        """Write the chunk IDs in file order, one per line, replacing ``path`` atomically"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for (doc_id,) in self._conn.execute("SELECT id FROM chunks ORDER BY position"):
+                f.write(doc_id + "\n")
+        os.replace(tmp_path, path)
+
+    def close(self):
+        self._conn.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _read_batches(
+    csv_path: str,
+    batch_size: int,
+    start_row: int,
+    occurrence: Callable[[str], int],
+    on_document: Callable[[str, Document], None]
+) -> Iterator[Tuple[int, List[Document], List[str]]]:
+    """
+    Stream ``(end_row, documents, ids)`` batches from a CSV file without
+    loading it into memory. Rows before ``start_row`` are not batched, but
+    every row is read and passed to ``on_document(id, document)``: IDs number
+    repeated texts like build_vector_db does, so they depend on earlier rows.
+    """
+    documents, ids = [], []
+    end_row = start_row
+    for document in iter_ticket_documents(csv_path):
+        text = document.page_content
+        # The loader's content IDs: re-ingesting a batch after a crash, or
+        # building the whole knowledge base later, upserts the same rows
+        doc_id = _chunk_id(csv_path, occurrence(text), text)
+        on_document(doc_id, document)
+        row_number = document.metadata["row"]
+        if row_number < start_row:
+            continue
+        documents.append(document)
+        ids.append(doc_id)
+        end_row = row_number + 1
+        if len(documents) == batch_size:
+            yield end_row, documents, ids
+            documents, ids = [], []
+    if documents:
+        yield end_row, documents, ids
+
+
+class _Checkpoint:
+    """
+    Highest row such that every row before it is safely stored, persisted
+    atomically. Only valid for the exact file contents it was written for.
+    """
+
+    def __init__(self, path: Optional[str], csv_path: str, csv_hash: str):
+        self.path = path
+        self.csv_path = csv_path
+        self.csv_hash = csv_hash
+        self.rows_done = 0
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("csv_path") == csv_path and data.get("csv_hash") == csv_hash:
+                self.rows_done = data.get("rows_done", 0)
+
+    def save(self, rows_done: int):
+        self.rows_done = rows_done
+        if not self.path:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"csv_path": self.csv_path, "csv_hash": self.csv_hash,
+                       "rows_done": rows_done, "updated": time.time()}, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def ingest_tickets_streaming(
+    csv_path: str = "data/historical/historical_tickets.csv",
+    persist_directory: str = "embeddings/chroma_db",
+    batch_size: int = 256,
+    workers: int = 2,
+    queue_size: int = 8,
+    checkpoint_path: Optional[str] = None,
+    resume: bool = True,
+    report_every: float = 5.0
+) -> Dict[str, float]:
+    """
+    Stream a (potentially huge) historical ticket CSV into the vector DB.
+
+    The calling thread parses the CSV in batches of ``batch_size`` rows and feeds
+    a bounded queue; ``workers`` threads embed each batch in one call and
+    upsert it into Chroma. Completed rows are checkpointed so an interrupted
+    run of the same file resumes where it stopped. Chunk IDs, the manifest and
+    the BM25 index are shared with build_vector_db, so either path can update
+    what the other ingested.
+
+    Memory does not grow with the number of rows: in flight there are at most
+    ``queue_size`` batches, while duplicate-row numbering, the chunk IDs and
+    the BM25 postings are written to scratch SQLite files in the persist
+    directory one batch at a time. The file's chunk IDs are kept in a manifest
+    side file, and rows dropped since the last ingest are found by streaming
+    the previous IDs against that run's IDs. The one step whose memory follows
+    the corpus is loading the existing BM25 index, the same index every
+    serving worker holds.
+
+    Returns:
+        Dict with rows, chunks, seconds and rows_per_second for this run
+    """
+    os.makedirs(persist_directory, exist_ok=True)
+    if checkpoint_path is None:
+        checkpoint_path = os.path.join(persist_directory, "ticket_ingest_checkpoint.json")
+    csv_hash = _file_hash(csv_path)
+    checkpoint = _Checkpoint(checkpoint_path, csv_path, csv_hash)
+    start_row = checkpoint.rows_done if resume else 0
+    if start_row:
+        print(f"⏩ Resuming from row {start_row}")
+
+    vectorstore = registry.get_vectorstore(persist_directory)
+    journal = _Journal(os.path.join(persist_directory, JOURNAL_FILE))
+    # Streamed tickets join the BM25 index and the manifest like any other source
+    lexical = LexicalIndexBuilder(os.path.join(persist_directory, LEXICAL_BUILD_FILE))
+    existing = LexicalIndex.load(persist_directory)
+    if existing is not None:
+        lexical.add_index(existing)
+        del existing
+
+    def on_document(doc_id: str, document: Document):
+        journal.add_chunk(doc_id)
+        lexical.add(doc_id, document.page_content, document.metadata)
+
+    batches: "queue.Queue" = queue.Queue(maxsize=queue_size)
+    lock = threading.Lock()
+    errors: List[BaseException] = []
+    # Batches finish out of order; the checkpoint only advances over a contiguous prefix
+    finished: Dict[int, int] = {}
+    progress = {"rows": 0, "chunks": 0, "committed": start_row}
+
+    def worker():
+        while True:
+            item = batches.get()
+            if item is _DONE:
+                return
+            batch_start, end_row, documents, ids = item
+            try:
+                vectorstore.add_documents(documents, ids=ids)
+            except BaseException as e:
+                with lock:
+                    errors.append(e)
+                continue
+            with lock:
+                finished[batch_start] = end_row
+                progress["rows"] += end_row - batch_start
+                progress["chunks"] += len(documents)
+                committed = progress["committed"]
+                while committed in finished:
+                    committed = finished.pop(committed)
+                if committed != progress["committed"]:
+                    progress["committed"] = committed
+                    checkpoint.save(committed)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(max(1, workers))]
+    for thread in threads:
+        thread.start()
+
+    started = last_report = time.perf_counter()
+    batch_start = start_row
+    try:
+        for end_row, documents, ids in _read_batches(
+            csv_path, batch_size, start_row, journal.occurrence, on_document
+        ):
+            if errors:
+                break
+            journal.commit()
+            lexical.commit()
+            batches.put((batch_start, end_row, documents, ids))
+            batch_start = end_row
+            now = time.perf_counter()
+            if now - last_report >= report_every:
+                last_report = now
+                with lock:
+                    rows, chunks = progress["rows"], progress["chunks"]
+                elapsed = now - started
+                print(f"📈 {rows} rows / {chunks} chunks ingested "
+                      f"({rows / elapsed:.0f} rows/s, {chunks / elapsed:.0f} chunks/s)")
+    finally:
+        for _ in threads:
+            batches.put(_DONE)
+        for thread in threads:
+            thread.join()
+
+    try:
+        if errors:
+            raise RuntimeError(
+                f"Ingestion stopped after row {progress['committed']}; rerun to resume"
+            ) from errors[0]
+
+        # Rows dropped from the file since it was last ingested
+        journal.commit()
+        manifest = _load_manifest(persist_directory)
+        previous = manifest.get(csv_path)
+        if previous:
+            for stale_ids in journal.missing(_manifest_chunks(persist_directory, previous), batch_size):
+                vectorstore.delete(ids=stale_ids)
+                for doc_id in stale_ids:
+                    lexical.remove(doc_id)
+        vectorstore.persist()
+        chunks_file = _chunks_file(csv_path)
+        journal.write_chunk_ids(os.path.join(persist_directory, chunks_file))
+        manifest[csv_path] = {"hash": csv_hash, "chunks_file": chunks_file}
+        _save_manifest(persist_directory, manifest)
+        lexical.save(persist_directory)
+        checkpoint.clear()
+    finally:
+        journal.close()
+        lexical.close()
+
+    elapsed = time.perf_counter() - started
+    registry.notify_knowledge_base_rebuilt(persist_directory)
+    print(f"✅ Ingested {progress['rows']} rows ({progress['chunks']} chunks) in {elapsed:.1f}s")
+    return {
+        "rows": progress["rows"],
+        "chunks": progress["chunks"],
+        "seconds": elapsed,
+        "rows_per_second": progress["rows"] / elapsed if elapsed else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Stream a historical ticket CSV into the vector DB")
+    parser.add_argument("--csv", default="data/historical/historical_tickets.csv")
+    parser.add_argument("--persist-directory", default="embeddings/chroma_db")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--queue-size", type=int, default=8)
+    parser.add_argument("--checkpoint", default=None, help="Checkpoint file (default: inside the persist directory)")
+    parser.add_argument("--restart", action="store_true", help="Ignore any existing checkpoint")
+    args = parser.parse_args()
+
+    ingest_tickets_streaming(
+        csv_path=args.csv,
+        persist_directory=args.persist_directory,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        queue_size=args.queue_size,
+        checkpoint_path=args.checkpoint,
+        resume=not args.restart
+    )
@@ -1,22 +1,216 @@
 # tools/vector_search_tool.py
 
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import HuggingFaceEmbeddings
+import time
+from typing import Dict, List, Optional
 from crewai.tools import tool  # ✅ Decorator for BaseTool-compatible tools
+from langchain_core.documents import Document
+from core import metrics, registry, tracing
+from tools.lexical_index import reciprocal_rank_fusion
+from tools.ticket_documents import build_where, matches
+
+
+def merge_passages(rankings: List[List[Document]], max_passages: int = 5, max_chars: int = 4000) -> List[str]:
+    """
+    Interleave several ranked result lists into one list of distinct passages.
+    Stops after ``max_passages`` passages or ``max_chars`` characters, trimming
+    the last passage to fit the budget.
+    """
+    passages, seen, used = [], set(), 0
+    for rank in range(max((len(docs) for docs in rankings), default=0)):
+        for docs in rankings:
+            if rank >= len(docs):
+                continue
+            text = docs[rank].page_content.strip()
+            key = " ".join(text.split()).lower()
+            if not text or key in seen:
+                continue
+            seen.add(key)
+            remaining = max_chars - used
+            if len(text) > remaining:
+                # A fragment of a few words is noise rather than context
+                if remaining >= 200:
+                    passages.append(text[:remaining].rstrip() + "...")
+                return passages
+            passages.append(text)
+            used += len(text)
+            if len(passages) >= max_passages:
+                return passages
+    return passages
 
 
 class VectorSearchTool:
-    def __init__(self, persist_directory: str = "embeddings/chroma_db"):
-        self.vectorstore = Chroma(
-            persist_directory=persist_directory,
-            embedding_function=HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+    def __init__(self, persist_directory: str = "embeddings/chroma_db", backend: str = "chroma",
+                 faiss_directory: str = registry.DEFAULT_FAISS_DIRECTORY, mode: str = "dense",
+                 k: int = 3, candidates: int = 10, dense_weight: float = 1.0,
+                 lexical_weight: float = 1.0, rrf_k: int = 60, exact_match_shortcut: bool = True,
+                 filters: Optional[dict] = None):
+        """
+        Args:
+            persist_directory: Chroma store used by the 'chroma' backend
+            backend: 'chroma' or 'faiss' (memory-mapped index built by tools/faiss_index.py)
+            faiss_directory: FAISS index used by the 'faiss' backend
+            mode: 'dense', or 'hybrid' to fuse BM25 and dense rankings with
+                reciprocal rank fusion (falls back to dense if no lexical index was built)
+            k: Number of passages returned
+            candidates: Passages taken from each ranking before fusion
+            dense_weight, lexical_weight: Weights of each ranking in the fusion
+            rrf_k: Reciprocal rank fusion constant
+            exact_match_shortcut: In hybrid mode, skip dense search when at least
+                ``k`` passages contain every query term
+            filters: Default historical ticket filters, e.g. ``{"status": "Resolved",
+                "category": "Network Connectivity Issue", "since": "2025-01-01"}``
+                (see tools/ticket_documents.py); applied before the similarity search
+        """
+        # Embedding model and vector store handles are shared process-wide
+        self.faiss_directory = faiss_directory
+        if backend == "faiss":
+            self._vectorstore = None
+        elif backend == "chroma":
+            self._vectorstore = registry.get_vectorstore(persist_directory)
+        else:
+            raise ValueError(f"Unknown vector backend: {backend}")
+        self.backend = backend
+        self.embedding_cache = registry.get_query_embedding_cache()
+        self.k = k
+        self.candidates = max(k, candidates)
+        self.dense_weight = dense_weight
+        self.lexical_weight = lexical_weight
+        self.rrf_k = rrf_k
+        self.exact_match_shortcut = exact_match_shortcut
+        self.filters = filters
+        self.lexical_index = None
+        if mode == "hybrid":
+            index_directory = faiss_directory if backend == "faiss" else persist_directory
+            self.lexical_index = registry.get_lexical_index(index_directory)
+        elif mode != "dense":
+            raise ValueError(f"Unknown retrieval mode: {mode}")
+        # Effective mode: hybrid without a lexical index searches dense only
+        self.mode = "hybrid" if self.lexical_index is not None else "dense"
+
+    @property
+    def vectorstore(self):
+        # The FAISS store is looked up on each search so a rebuilt index is picked up
+        if self.backend == "faiss":
+            return registry.get_faiss_store(self.faiss_directory)
+        return self._vectorstore
+
+    def _dense_search_many(self, vectors: List[List[float]], k: int,
+                           filters: Optional[dict]) -> List[List[Document]]:
+        """Dense search for several query embeddings with one vector store call"""
+        if self.backend == "faiss":
+            return [
+                [doc for doc, _ in hits]
+                for hits in self.vectorstore.search_by_vectors(vectors, k, filters or None)
+            ]
+        query = {"query_embeddings": vectors, "n_results": k}
+        where = build_where(filters)
+        if where:
+            query["where"] = where
+        results = self.vectorstore._collection.query(**query)
+        return [
+            [Document(page_content=text, metadata=metadata or {}) for text, metadata in zip(texts, metadatas)]
+            for texts, metadatas in zip(results["documents"], results["metadatas"])
+        ]
+
+    def _documents_by_id(self, doc_ids: List[str]) -> Dict[str, Document]:
+        """Text of lexical hits, read from the vector store in one call (the BM25 index keeps no text)"""
+        if not doc_ids:
+            return {}
+        if self.backend == "faiss":
+            return dict(zip(doc_ids, self.vectorstore.get_by_ids(doc_ids)))
+        found = self.vectorstore._collection.get(ids=doc_ids, include=["documents", "metadatas"])
+        return {
+            doc_id: Document(page_content=text, metadata=metadata or {})
+            for doc_id, text, metadata in zip(found["ids"], found["documents"], found["metadatas"])
+        }
+
+    def _fuse(self, lexical_docs: List[Document], dense_docs: List[Document]) -> List[Document]:
+        by_text = {}
+        lexical_keys = []
+        for doc in lexical_docs:
+            by_text.setdefault(doc.page_content, doc)
+            lexical_keys.append(doc.page_content)
+        dense_keys = []
+        for doc in dense_docs:
+            by_text.setdefault(doc.page_content, doc)
+            dense_keys.append(doc.page_content)
+
+        fused = reciprocal_rank_fusion(
+            [(dense_keys, self.dense_weight), (lexical_keys, self.lexical_weight)], self.rrf_k
         )
-        self.retriever = self.vectorstore.as_retriever(search_kwargs={"k": 3})
+        return [by_text[key] for key in fused[:self.k]]
+
+    def search_many(self, queries: List[str], filters: Optional[dict] = None) -> List[List[Document]]:
+        """
+        Return the top ``k`` documents for each query.
+
+        Queries that still need dense search are embedded together, through
+        the shared query-embedding cache, and searched in one vector store call.
+        ``filters`` overrides the tool's default ticket filters.
+        """
+        start = time.perf_counter()
+        try:
+            with tracing.span("retrieval", "retrieval", backend=self.backend, mode=self.mode, queries=len(queries)):
+                return self._search_many(queries, filters)
+        except Exception:
+            metrics.RETRIEVAL_ERRORS.inc(self.backend, self.mode)
+            raise
+        finally:
+            metrics.RETRIEVAL_DURATION.observe(time.perf_counter() - start, self.backend, self.mode)
+            metrics.RETRIEVAL_QUERIES.inc(self.backend, self.mode, amount=len(queries))
+
+    def _search_many(self, queries: List[str], filters: Optional[dict] = None) -> List[List[Document]]:
+        filters = self.filters if filters is None else filters
+        results: List[Optional[List[Document]]] = [None] * len(queries)
+        lexical_ids: Dict[int, List[str]] = {}
+        shortcuts = set()
+        if self.lexical_index is not None:
+            predicate = (lambda metadata: matches(metadata, filters)) if filters else None
+            for i, query in enumerate(queries):
+                hits = self.lexical_index.search(query, self.candidates, predicate)
+                lexical_ids[i] = [doc_id for doc_id, _, _ in hits]
+                if self.exact_match_shortcut:
+                    # Exact-term hits (error codes, product names, categories) are precise enough on their own
+                    exact = [doc_id for doc_id, _, coverage in hits if coverage == 1.0]
+                    if len(exact) >= self.k:
+                        lexical_ids[i] = exact[:self.k]
+                        shortcuts.add(i)
+                        metrics.RETRIEVAL_SHORTCUTS.inc()
+        if lexical_ids:
+            by_id = self._documents_by_id(list({doc_id for ids in lexical_ids.values() for doc_id in ids}))
+            lexical_docs = {
+                i: [by_id[doc_id] for doc_id in ids if doc_id in by_id] for i, ids in lexical_ids.items()
+            }
+            for i in shortcuts:
+                results[i] = lexical_docs[i]
+
+        pending = [i for i, docs in enumerate(results) if docs is None]
+        if pending:
+            vectors = self.embedding_cache.embed_many([queries[i] for i in pending])
+            k = self.k if self.lexical_index is None else self.candidates
+            for i, dense_docs in zip(pending, self._dense_search_many(vectors, k, filters)):
+                if self.lexical_index is None:
+                    results[i] = dense_docs
+                else:
+                    results[i] = self._fuse(lexical_docs[i], dense_docs)
+        return results
+
+    def search(self, query: str, filters: Optional[dict] = None) -> List[Document]:
+        """
+        Return the top ``k`` documents for a query.
+        ``filters`` overrides the tool's default ticket filters.
+        """
+        return self.search_many([query], filters)[0]
+
+    def retrieve_many(self, queries: List[str]) -> List[str]:
+        """Batch counterpart of ``retrieve``: one joined passage string per query"""
+        return ["\n\n".join(doc.page_content for doc in docs) for docs in self.search_many(queries)]
 
     @tool("VectorSearchTool")
     def retrieve(self, query: str) -> str:
         """
         Retrieves relevant documents from past tickets or knowledge base based on a query.
         """
-        docs = self.retriever.get_relevant_documents(query)
+        with tracing.span("VectorSearchTool", "tool", query=query):
+            docs = self.search(query)
         return "\n\n".join([doc.page_content for doc in docs])
\ No newline at end of file
@@ -1,6 +1,9 @@
 # workflows/support_workflow.py
 
-from typing import Dict, Any, Optional
+import asyncio
+import threading
+from typing import Dict, Any, Optional, Callable
+from core import registry, tracing
 from core.workflow_manager import WorkflowManager
 
 class SupportWorkflow:
@@ -9,20 +12,75 @@ class SupportWorkflow:
     Provides a simple interface for processing customer messages and managing the conversation.
     """
     
-    def __init__(self):
-        self.workflow_manager = WorkflowManager()
+    def __init__(self, sequential: Optional[bool] = None, conversation_id: Optional[str] = None):
+        self.workflow_manager = WorkflowManager(sequential=sequential)
+        # Tags this conversation's traces
+        self.conversation_id = conversation_id
+        # Turns of the same conversation must not interleave
+        self._turn_lock = threading.Lock()
+        # Async callers queue here instead, so a waiting turn holds no pipeline thread
+        self._async_turn_lock = asyncio.Lock()
     
-    def process_message(self, message: str) -> Dict[str, Any]:
+    def process_message(
+        self,
+        message: str,
+        on_stage: Optional[Callable[[str, Any], None]] = None
+    ) -> Dict[str, Any]:
         """
         Process a customer message and return the response.
         
         Args:
             message: The customer's message
+            on_stage: Optional callback receiving each stage result as it completes
             
         Returns:
             Dict containing the response and status
         """
-        return self.workflow_manager.process_customer_message(message)
+        with self._turn_lock, tracing.start_trace("turn", self.conversation_id) as turn:
+            # First turns are often near-duplicates of earlier ones
+            first_turn = not self.workflow_manager.state.conversation_history
+            cache = registry.get_semantic_cache() if first_turn else None
+            if cache is not None:
+                with tracing.span("semantic_cache", "cache") as span:
+                    cached = cache.lookup(message)
+                    span.set(hit=cached is not None)
+                if cached is not None:
+                    turn.set(status=cached.get("status"), cached=True)
+                    return self.workflow_manager.apply_cached_result(message, cached, on_stage)
+            
+            result = self.workflow_manager.process_customer_message(message, on_stage)
+            turn.set(status=result.get("status"))
+            if cache is not None and result.get("status") != "error":
+                cache.add(message, result)
+            return result
+    
+    async def aprocess_message(
+        self,
+        message: str,
+        on_stage: Optional[Callable[[str, Any], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Async variant of process_message for use from an event loop.
+        
+        The blocking pipeline runs on the shared pipeline executor, so the
+        event loop stays free to serve other requests while LLM calls are in
+        flight. Concurrency is capped by MAX_CONCURRENT_PIPELINES. Turns of
+        the same conversation wait for each other on the event loop before
+        taking a pipeline thread, so they cannot fill the pool while blocked.
+        
+        Args:
+            message: The customer's message
+            on_stage: Optional callback receiving each stage result as it
+                completes; it is called from a worker thread
+            
+        Returns:
+            Dict containing the response and status
+        """
+        loop = asyncio.get_running_loop()
+        async with self._async_turn_lock:
+            return await loop.run_in_executor(
+                registry.get_pipeline_executor(), self.process_message, message, on_stage
+            )
     
     def get_conversation_state(self):
         """Get the current conversation state"""